@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 
 # === Base directories ===
@@ -9,65 +10,83 @@ GOLD_DIR = os.path.join(BASE_DIR, "gold")
 os.makedirs(PROMPTS_DIR, exist_ok=True)
 os.makedirs(GOLD_DIR, exist_ok=True)
 
+sys.path.append(os.path.dirname(os.path.dirname(BASE_DIR)))
+from warehouse.goldcheck import GoldCheckError, verify_golds
+
 # === Generate 100 identical structured tasks ===
-for i in range(1, 101):
-    task_id = f"s1_case{i:03}"
+def main():
+    for i in range(1, 101):
+        task_id = f"s1_case{i:03}"
+
+        description = (
+            "Robot moves the red box from Shelf.red.slot to RedBin.slot via Worktable.slot."
+        )
+
+        # === Natural-language prompt with Level 1 implicit structure hint ===
+        prompt = (
+            f"Task: {description}\n\n"
+            "You are a high-level planner for a robot in a small warehouse.\n"
+            "The robot must complete the following sequence:\n"
+            "- Pick up the red box from Shelf.red.slot.\n"
+            "- Place it temporarily on Worktable.slot.\n"
+            "- Then pick it up again from Worktable.slot and place it on RedBin.slot.\n\n"
+            "Environment symbols:\n"
+            "- Object: redbox\n"
+            "- Slots: Shelf.red.slot, Worktable.slot, RedBin.slot\n"
+            "- Poses/docks: Shelf.front.dock, Worktable.dock, RedBin.dock\n\n"
+            "Available high-level actions (you MUST only use these):\n"
+            "- base.goto(target)\n"
+            "- arm.pick(object, from)\n"
+            "- arm.place(object, to)\n\n"
+            "Action step formats (examples with placeholders):\n"
+            "- {\"action\": \"base.goto\", \"target\": \"<pose_name>\"}\n"
+            "- {\"action\": \"arm.pick\", \"object\": \"<object_name>\", \"from\": \"<slot_name>\"}\n"
+            "- {\"action\": \"arm.place\", \"object\": \"<object_name>\", \"to\": \"<slot_name>\"}\n\n"
+            "Output format (STRICT JSON):\n"
+            "- You MUST output ONLY a single JSON object with the structure:\n"
+            "  {\"steps\": [ STEP_1, STEP_2, ... ]}\n"
+            "- Do NOT include any explanations, comments, or extra text.\n"
+            "- Use only: actions (base.goto, arm.pick, arm.place), object name (redbox),\n"
+            "  the given slots and poses.\n"
+        )
+
+        # === Gold plan ===
+        gold = {
+            "task_id": task_id,
+            "description": description,
+            "goal": {
+                "RedBin.slot": "redbox",
+            },
+            "steps": [
+                {"action": "base.goto", "target": "Shelf.front.dock"},
+                {"action": "arm.pick", "object": "redbox", "from": "Shelf.red.slot"},
+                {"action": "base.goto", "target": "Worktable.dock"},
+                {"action": "arm.place", "object": "redbox", "to": "Worktable.slot"},
+                {"action": "base.goto", "target": "Worktable.dock"},
+                {"action": "arm.pick", "object": "redbox", "from": "Worktable.slot"},
+                {"action": "base.goto", "target": "RedBin.dock"},
+                {"action": "arm.place", "object": "redbox", "to": "RedBin.slot"},
+            ],
+        }
 
-    description = (
-        "Robot moves the red box from Shelf.red.slot to RedBin.slot via Worktable.slot."
-    )
+        # === Save prompt and gold ===
+        with open(os.path.join(PROMPTS_DIR, f"{task_id}.txt"), "w", encoding="utf-8") as f:
+            f.write(prompt)
+        with open(os.path.join(GOLD_DIR, f"{task_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(gold, f, indent=2)
 
-    # === Natural-language prompt with Level 1 implicit structure hint ===
-    prompt = (
-        f"Task: {description}\n\n"
-        "You are a high-level planner for a robot in a small warehouse.\n"
-        "The robot must complete the following sequence:\n"
-        "- Pick up the red box from Shelf.red.slot.\n"
-        "- Place it temporarily on Worktable.slot.\n"
-        "- Then pick it up again from Worktable.slot and place it on RedBin.slot.\n\n"
-        "Environment symbols:\n"
-        "- Object: redbox\n"
-        "- Slots: Shelf.red.slot, Worktable.slot, RedBin.slot\n"
-        "- Poses/docks: Shelf.front.dock, Worktable.dock, RedBin.dock\n\n"
-        "Available high-level actions (you MUST only use these):\n"
-        "- base.goto(target)\n"
-        "- arm.pick(object, from)\n"
-        "- arm.place(object, to)\n\n"
-        "Action step formats (examples with placeholders):\n"
-        "- {\"action\": \"base.goto\", \"target\": \"<pose_name>\"}\n"
-        "- {\"action\": \"arm.pick\", \"object\": \"<object_name>\", \"from\": \"<slot_name>\"}\n"
-        "- {\"action\": \"arm.place\", \"object\": \"<object_name>\", \"to\": \"<slot_name>\"}\n\n"
-        "Output format (STRICT JSON):\n"
-        "- You MUST output ONLY a single JSON object with the structure:\n"
-        "  {\"steps\": [ STEP_1, STEP_2, ... ]}\n"
-        "- Do NOT include any explanations, comments, or extra text.\n"
-        "- Use only: actions (base.goto, arm.pick, arm.place), object name (redbox),\n"
-        "  the given slots and poses.\n"
-    )
+    print("All 100 S1 single-robot tasks generated successfully with Level 1 structured prompts.")
 
-    # === Gold plan ===
-    gold = {
-        "task_id": task_id,
-        "description": description,
-        "goal": {
-            "RedBin.slot": "redbox",
-        },
-        "steps": [
-            {"action": "base.goto", "target": "Shelf.front.dock"},
-            {"action": "arm.pick", "object": "redbox", "from": "Shelf.red.slot"},
-            {"action": "base.goto", "target": "Worktable.dock"},
-            {"action": "arm.place", "object": "redbox", "to": "Worktable.slot"},
-            {"action": "base.goto", "target": "Worktable.dock"},
-            {"action": "arm.pick", "object": "redbox", "from": "Worktable.slot"},
-            {"action": "base.goto", "target": "RedBin.dock"},
-            {"action": "arm.place", "object": "redbox", "to": "RedBin.slot"},
-        ],
-    }
+    # === Verify every gold plan against the S1 validator (only changed files are re-checked) ===
+    try:
+        report = verify_golds("S1", GOLD_DIR)
+    except GoldCheckError as e:
+        for err in e.errors:
+            print(f"[ERROR] {err['file']}: {err['code']}: {err['message']}")
+        sys.exit(f"{e.stage}: {len(e.errors)} gold plan(s) fail their validator, dataset build failed")
+    print(f"All {report['files']} S1 gold plans pass the validator "
+          f"({report['verified']} verified, {report['cached']} unchanged).")
 
-    # === Save prompt and gold ===
-    with open(os.path.join(PROMPTS_DIR, f"{task_id}.txt"), "w", encoding="utf-8") as f:
-        f.write(prompt)
-    with open(os.path.join(GOLD_DIR, f"{task_id}.json"), "w", encoding="utf-8") as f:
-        json.dump(gold, f, indent=2)
 
-print("All 100 S1 single-robot tasks generated successfully with Level 1 structured prompts.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,36 @@ def create_box(half_extents, pose, color):
     )
 
 
+def symbolic_world():
+    """S1 world without the PyBullet scene: slots, poses, initial occupancy."""
+    # --- Slot positions (final unified naming) ---
+    slots = {
+        "Shelf.red.slot":     [0.0, 0.6, 0.55],
+        "Worktable.slot":     [0.8, 0.0, 0.55],
+        "RedBin.slot":        [0.0, -0.7, 0.35],
+    }
+
+    poses = {
+        "Shelf.front.dock",
+        "Worktable.dock",
+        "RedBin.dock",
+    }
+
+    world = {
+        "slots": slots,
+        "objects": {"redbox": None},   # PyBullet body id, set by make_world
+        "robot": None,                 # PyBullet body id, set by make_world
+        "state": {"occupancy": {"Shelf.red.slot": "redbox"}},
+        "reachability_map": {
+            "Shelf.red.slot": "Shelf.front.dock",
+            "Worktable.slot": "Worktable.dock",
+            "RedBin.slot": "RedBin.dock",
+        },
+        "poses": poses,
+    }
+    return world
+
+
 def make_world(gui=False):
     """S1 visual world (Shelf → Worktable → RedBin)."""
     cid = p.connect(p.GUI if gui else p.DIRECT)
@@ -44,12 +74,8 @@ def make_world(gui=False):
     create_box([0.4, 0.2, 0.25], [0.8, 0.0, 0.25, 0, 0, 0, 1], RGB["table"])    # Worktable
     create_box([0.2, 0.2, 0.15], [0.0, -0.7, 0.15, 0, 0, 0, 1], RGB["redbin"])  # RedBin
 
-    # --- Slot positions (final unified naming) ---
-    slots = {
-        "Shelf.red.slot":     [0.0, 0.6, 0.55],
-        "Worktable.slot":     [0.8, 0.0, 0.55],
-        "RedBin.slot":        [0.0, -0.7, 0.35],
-    }
+    world = symbolic_world()
+    slots = world["slots"]
 
     # --- Movable box (redbox) ---
     col = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04])
@@ -66,27 +92,9 @@ def make_world(gui=False):
     robot_id = p.loadURDF("cube_small.urdf", [0.2, 0.6, 0.05], useFixedBase=False)
     p.changeVisualShape(robot_id, -1, rgbaColor=RGB["robot"])
 
-    # --- World dict ---
-
-    poses = {
-        "Shelf.front.dock",
-        "Worktable.dock",
-        "RedBin.dock",
-    }
-
-    world = {
-        "client": cid,
-        "slots": slots,
-        "objects": {"redbox": redbox},
-        "robot": robot_id,
-        "state": {"occupancy": {"Shelf.red.slot": "redbox"}},
-        "reachability_map": {
-            "Shelf.red.slot": "Shelf.front.dock",
-            "Worktable.slot": "Worktable.dock",
-            "RedBin.slot": "RedBin.dock",
-        },
-        "poses": poses,
-    }
+    world["client"] = cid
+    world["objects"] = {"redbox": redbox}
+    world["robot"] = robot_id
     return world
 
 
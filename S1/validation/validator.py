@@ -1,23 +1,190 @@
-import fnmatch
-from copy import deepcopy
 import sys, os
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from env.actions_spec import ACTIONS, ACTION_SCHEMA
+try:   # imported as S*.validation.validator from the repository root (warehouse/stages.py)
+    from ..env.actions_spec import ACTIONS, ACTION_SCHEMA
+except ImportError:   # imported as validation.validator by the stage scripts
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    from env.actions_spec import ACTIONS, ACTION_SCHEMA
+from warehouse.constraints import compile_constraints, place_allowed
+from warehouse.failures import Failure
+from warehouse.zobrist import ZobristKeys
 
 
-def _pattern_any(name, patterns):
-    """Check if a given name matches any pattern."""
-    return any(fnmatch.fnmatch(name, pat) for pat in patterns)
+class _WorldIndex:
+    """Integer ids for the slots and objects of one world."""
+    __slots__ = ("slots", "slot_id", "objects", "object_id", "zobrist")
+
+    def __init__(self, world):
+        occupancy = world["state"].get("occupancy", {})
+        self.slots = list(dict.fromkeys([*world["slots"], *occupancy]))
+        self.slot_id = {s: i for i, s in enumerate(self.slots)}
+        self.objects = list(dict.fromkeys([*world["objects"], *(o for o in occupancy.values() if o)]))
+        self.object_id = {o: i for i, o in enumerate(self.objects)}
+        self.zobrist = ZobristKeys(self.slots, ["robot"])
+
+    def covers(self, world):
+        """False once slots or objects were added to the world."""
+        return (all(s in self.slot_id for s in world["state"].get("occupancy", {}))
+                and all(o in self.object_id for o in world["objects"]))
+
+
+_WORLD_INDEX = {}  # id(world) → (world, _WorldIndex)
+
+
+def _world_index(world):
+    """Return the index of `world`, building it on first use."""
+    cached = _WORLD_INDEX.get(id(world))
+    if cached is None or cached[0] is not world or not cached[1].covers(world):
+        if len(_WORLD_INDEX) >= 64:
+            _WORLD_INDEX.clear()
+        cached = _WORLD_INDEX[id(world)] = (world, _WorldIndex(world))
+    return cached[1]
+
+
+class SymbolicState:
+    """
+    Compact symbolic state of one plan execution for the single robot.
+
+    Occupancy and the object index are lists indexed by the slot and object
+    ids of the world's cached _WorldIndex, and the slots each object visited
+    form one bitmask (bit = slot id) per object. Mutations go through
+    _set/_set_attr, which record the old value in an undo log once
+    snapshot() has been called, so search code can branch with
+    snapshot()/rollback(mark) instead of deep copies. zhash is the Zobrist
+    hash of occupancy, holding and position (warehouse/zobrist.py), kept up
+    to date by the effects through _set_hashed/_set_attr_hashed.
+
+    st["occ"], st["visited"], ... return read-only dict views for callers
+    written against the former dictionary state.
+    """
+    __slots__ = ("index", "occ", "holding", "agent_at", "visited",
+                 "obj_loc", "obj_count", "dup_count", "zhash", "log")
+
+    _VIEW_KEYS = ("occ", "holding", "agent_at", "visited", "obj_loc", "obj_count", "dup_count")
+
+    def __init__(self, world):
+        index = self.index = _world_index(world)
+        self.occ = [None] * len(index.slots)               # slot id → object
+        self.holding = None                                # object currently held
+        self.agent_at = None                               # current dock/pose of the agent
+        self.visited = [0] * len(index.objects)            # object id → bitmask of visited slot ids
+        self.obj_loc = [None] * len(index.objects)         # object id → slot, or 0 while held
+        self.obj_count = [0] * len(index.objects)          # object id → number of places it appears in
+        self.dup_count = 0                                 # objects currently appearing in more than one place
+        self.log = None                                    # undo log, started by snapshot()
+        for slot, obj in world["state"].get("occupancy", {}).items():
+            self.occ[index.slot_id[slot]] = obj
+            if obj:
+                _index_add(self, obj, slot)
+        self.zhash = index.zobrist.initial_hash(self.occ)
+
+    def occ_of(self, slot):
+        """Object in `slot`, or None (also for slots the world does not have)."""
+        i = self.index.slot_id.get(slot)
+        return None if i is None else self.occ[i]
+
+    def _set(self, array, i, value):
+        if self.log is not None:
+            self.log.append((array, i, array[i]))
+        array[i] = value
+
+    def _set_attr(self, name, value):
+        if self.log is not None:
+            self.log.append((self, name, getattr(self, name)))
+        setattr(self, name, value)
+
+    def _set_hashed(self, component, array, i, value):
+        """_set for occupancy, also updating zhash (undone by rollback like any change)."""
+        old, keys = array[i], self.index.zobrist.tables[component][i]
+        if self.log is not None:
+            self.log.append((self, "zhash", self.zhash))
+            self.log.append((array, i, old))
+        self.zhash ^= keys[old] ^ keys[value]
+        array[i] = value
+
+    def _set_attr_hashed(self, name, value):
+        """_set_attr for holding/agent_at, also updating zhash."""
+        old, keys = getattr(self, name), self.index.zobrist.tables[name][0]
+        if self.log is not None:
+            self.log.append((self, "zhash", self.zhash))
+            self.log.append((self, name, old))
+        self.zhash ^= keys[old] ^ keys[value]
+        setattr(self, name, value)
+
+    def snapshot(self):
+        """Start (or continue) recording changes; returns a mark for rollback()."""
+        if self.log is None:
+            self.log = []
+        return len(self.log)
+
+    def rollback(self, mark):
+        """Undo every change recorded since snapshot() returned `mark`."""
+        log = self.log
+        while len(log) > mark:
+            target, key, old = log.pop()
+            if target is self:
+                setattr(self, key, old)
+            else:
+                target[key] = old
+
+    def __deepcopy__(self, memo):
+        """Copy the per-plan lists (all flat); the world index is shared."""
+        new = SymbolicState.__new__(SymbolicState)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(new, name, value[:] if type(value) is list else value)
+        new.log = None
+        return new
+
+    def __getitem__(self, key):
+        index = self.index
+        if key == "occ":
+            return dict(zip(index.slots, self.occ))
+        if key == "visited":
+            return {o: {s for i, s in enumerate(index.slots) if mask >> i & 1}
+                    for o, mask in zip(index.objects, self.visited)}
+        if key in ("obj_loc", "obj_count"):
+            return dict(zip(index.objects, getattr(self, key)))
+        if key in self._VIEW_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def keys(self):
+        return self._VIEW_KEYS
+
+    def as_dict(self):
+        return {k: self[k] for k in self._VIEW_KEYS}
+
+
+def _index_add(st, obj, where):
+    """Record that `obj` now also appears at `where` (a slot or a holder)."""
+    o = st.index.object_id[obj]
+    n = st.obj_count[o] + 1
+    st._set(st.obj_count, o, n)
+    st._set(st.obj_loc, o, where)
+    if n == 2:
+        st._set_attr("dup_count", st.dup_count + 1)
+
+
+def _index_remove(st, obj):
+    """Record that `obj` left one of the places it appeared in."""
+    o = st.index.object_id[obj]
+    n = st.obj_count[o] - 1
+    st._set(st.obj_count, o, n)
+    if n == 0:
+        st._set(st.obj_loc, o, None)
+    elif n == 1:
+        st._set_attr("dup_count", st.dup_count - 1)
+
+
+def state_hash(st):
+    """64-bit hash of occupancy, holding and position(s), maintained incrementally; O(1)."""
+    return st.zhash
 
 
 def init_symbolic_state(world):
     """Initialize the symbolic world state for a single robot agent."""
-    return {
-        "occ": deepcopy(world["state"].get("occupancy", {})),  # slot → object occupancy
-        "holding": None,                                       # object currently held
-        "agent_at": None,                                      # current dock/pose of the agent
-        "visited": {obj: set() for obj in world["objects"].keys()},  # record visited slots
-    }
+    return SymbolicState(world)
 
 
 def check_step_schema(action, step):
@@ -35,7 +202,9 @@ def check_step_schema(action, step):
 
 def check_step_names_and_types(action, step, world):
     """Validate that referenced objects, slots, and poses exist in the world."""
-    errs = []
+    errs = [f"field '{k}' is not a string: {v!r}" for k, v in step.items() if not isinstance(v, str)]
+    if errs:   # names index sets and dicts below; lists/objects from LLM output would raise
+        return errs
     if action == "base.goto":
         if step["target"] not in world["poses"]:
             errs.append(f"unknown pose '{step['target']}'")
@@ -55,44 +224,62 @@ def check_step_names_and_types(action, step, world):
 def check_predicate(pred, args, st, world):
     """Evaluate preconditions symbolically."""
     if pred == "is_pose":
-        target = args["target"]
-        return target in world["poses"], f"unknown pose '{target}'"
+        return args["target"] in world["poses"]
     if pred == "holding_is":
-        want = args.get("value", args.get("object", None))
-        return (st["holding"] == want), f"holding={st['holding']} != {want}"
+        return st.holding == args.get("value", args.get("object", None))
     if pred == "slot_has":
-        slot, obj = args["slot"], args["object"]
-        if slot not in world["slots"]:
-            return False, f"unknown slot '{slot}'"
-        return st["occ"].get(slot) == obj, f"{slot} has {st['occ'].get(slot)} not {obj}"
+        slot = args["slot"]
+        return slot in world["slots"] and st.occ_of(slot) == args["object"]
     if pred == "slot_free":
         slot = args["slot"]
-        if slot not in world["slots"]:
-            return False, f"unknown slot '{slot}'"
-        return st["occ"].get(slot) in (None, ""), f"{slot} occupied by {st['occ'].get(slot)}"
+        return slot in world["slots"] and st.occ_of(slot) in (None, "")
     if pred == "at_reach":
-        slot = args["slot"]
-        want_dock = world["reachability_map"][slot]
-        return st["agent_at"] == want_dock, f"not at dock '{want_dock}' (at={st['agent_at']})"
-    return False, f"unknown predicate '{pred}'"
+        return st.agent_at == world["reachability_map"][args["slot"]]
+    return False
+
+
+def _observe(pred, args, st, world):
+    """State values behind a failed predicate, kept in the Failure record."""
+    slot = args.get("slot")
+    if pred in ("slot_has", "slot_free") and slot not in world["slots"]:
+        return {"unknown_slot": slot}
+    if pred == "holding_is":
+        return {"holding": st.holding}
+    if pred in ("slot_has", "slot_free"):
+        return {"found": st.occ_of(slot)}
+    if pred == "at_reach":
+        return {"dock": world["reachability_map"][slot], "at": st.agent_at}
+    if pred != "is_pose":
+        return {"reason": f"unknown predicate '{pred}'"}
+    return {}
 
 
 def apply_effect(eff, args, st, world):
     """Apply the symbolic effects of an action."""
     if eff == "set_at":
-        st["agent_at"] = args["target"]
+        st._set_attr_hashed("agent_at", args["target"])
         return
     if eff == "holding_set":
-        st["holding"] = args.get("value", args.get("object", None))
+        val = args.get("value", args.get("object", None))
+        if st.holding:
+            _index_remove(st, st.holding)
+        st._set_attr_hashed("holding", val)
+        if val:
+            _index_add(st, val, 0)
         return
     if eff == "slot_set":
         slot = args["slot"]
         val = args.get("value", args.get("object", None))
-        st["occ"][slot] = val
+        s = st.index.slot_id[slot]
+        if st.occ[s]:
+            _index_remove(st, st.occ[s])
+        st._set_hashed("occ", st.occ, s, val)
+        if val:
+            _index_add(st, val, slot)
         return
     if eff == "mark_visited":
-        obj, slot = args["object"], args["slot"]
-        st["visited"][obj].add(slot)
+        o, s = st.index.object_id[args["object"]], st.index.slot_id[args["slot"]]
+        st._set(st.visited, o, st.visited[o] | (1 << s))
         return
     raise ValueError(f"unknown effect '{eff}'")
 
@@ -128,17 +315,33 @@ def _materialize(spec_entry, step):
     return name, args
 
 
-def check_invariants(st):
-    """Ensure each object appears in exactly one place (no duplication)."""
+def _recount(st):
+    """Count object appearances from scratch (debug cross-check of the index)."""
     counts = {}
-    for v in st["occ"].values():
+    for v in st.occ:
         if v:
             counts[v] = counts.get(v, 0) + 1
-    if st["holding"]:
-        counts[st["holding"]] = counts.get(st["holding"], 0) + 1
-    dup = [o for o, c in counts.items() if c > 1]
-    if dup:
+    if st.holding:
+        counts[st.holding] = counts.get(st.holding, 0) + 1
+    return counts
+
+
+def check_invariants(st, debug=False):
+    """
+    Ensure each object appears in exactly one place (no duplication).
+    Uses the object index maintained by apply_effect, so the check is O(1)
+    per step; with debug=True the index is cross-checked by a full recount.
+    """
+    objects = st.index.objects
+    if st.dup_count:
+        dup = [objects[o] for o, c in enumerate(st.obj_count) if c > 1]
         return False, f"objects appear in multiple places: {dup}"
+    if debug:
+        indexed = {objects[o]: c for o, c in enumerate(st.obj_count) if c}
+        if _recount(st) != indexed:
+            return False, f"object index out of sync with state: {indexed}"
+        if st.zhash != st.index.zobrist.hash_state(st.occ, [st.holding], [st.agent_at]):
+            return False, "state hash out of sync with state"
     return True, ""
 
 
@@ -147,74 +350,84 @@ def check_goal(st, goal):
     if not goal:
         return True, ""
     for obj, slot in goal.items():
-        if st["occ"].get(slot) != obj:
-            return False, f"goal not satisfied: {obj} not in {slot} (in={st['occ'].get(slot)})"
+        if st.occ_of(slot) != obj:
+            return False, f"goal not satisfied: {obj} not in {slot} (in={st.occ_of(slot)})"
     return True, ""
 
 
-def validate(world, plan, actions, constraints, goal=None):
+def goal_failure(st, goal, n_steps):
+    """Failure record for an unsatisfied goal after `n_steps` steps, or None."""
+    ok, why = check_goal(st, goal)
+    return None if ok else Failure("goal_unsatisfied", n_steps, predicate="goal", observed={"reason": why})
+
+
+def execute_step(st, i, step, world, actions, constraints, debug=False):
+    """
+    Check and apply plan step `i` on the symbolic state `st`.
+    Returns a Failure record on failure (the state is then left partially
+    updated), or None once the step's effects are applied and invariants hold.
+    """
+    if not isinstance(step, dict):
+        return Failure("schema_error", i, observed={"errors": ["step is not an object"]})
+    a = step.get("action")
+    if not isinstance(a, str) or a not in actions:
+        return Failure("unknown_action", i, None, args={"action": a})
+
+    errs = check_step_schema(a, step) or check_step_names_and_types(a, step, world)
+    if errs:
+        return Failure("schema_error", i, None, observed={"errors": errs})
+
+    # Preconditions
+    for pre in actions[a].get("pre", []):
+        pred, args = _materialize(pre, step)
+        if not check_predicate(pred, args, st, world):
+            return Failure("precondition_failed", i, None, pred, args, _observe(pred, args, st, world))
+
+    # Effects
+    for eff in actions[a].get("eff", []):
+        name, args = _materialize(eff, step)
+        apply_effect(name, args, st, world)
+
+    # Constraints
+    if a == "arm.place":
+        slot, obj = step["to"], step["object"]
+        allowed = constraints.get("allowed_targets")
+        if allowed and not place_allowed(allowed, slot, obj):
+            return Failure("constraint_violation", i, None, "allowed_targets", {"object": obj, "slot": slot})
+
+    # Invariants
+    ok_inv, why_inv = check_invariants(st, debug)
+    if not ok_inv:
+        return Failure("invariant_broken", i, None, "invariants", observed={"reason": why_inv})
+
+    return None
+
+
+def validate(world, plan, actions, constraints, goal=None, debug=False):
     """
     Validate a symbolic task plan.
     Checks preconditions, effects, constraints, and goal satisfaction.
     Returns only the essential evaluation fields for clarity.
+    Returns {"logic_ok", "goal_ok", "failure"}, where "failure" is the
+    first Failure record (see warehouse/failures.py) or None.
     """
-    errors = []
     st = init_symbolic_state(world)
-    steps = plan.get("steps", None)
+    steps = plan.get("steps", None) if isinstance(plan, dict) else None
 
     if not isinstance(steps, list):
-        return {"logic_ok": False, "goal_ok": False}
+        return {"logic_ok": False, "goal_ok": False, "failure": Failure("malformed_plan")}
 
+    constraints = compile_constraints(constraints)
     for i, step in enumerate(steps):
-        a = step.get("action")
-        if a not in actions:
-            errors.append(f"[{i}] unknown_action '{a}'")
-            break
-
-        errs = check_step_schema(a, step) + check_step_names_and_types(a, step, world)
-        if errs:
-            errors.append(f"[{i}] schema/type errors: " + " ; ".join(errs))
-            return {"logic_ok": False, "goal_ok": False}
-
-        # Preconditions
-        for pre in actions[a].get("pre", []):
-            pred, args = _materialize(pre, step)
-            ok, why = check_predicate(pred, args, st, world)
-            if not ok:
-                errors.append(f"[{i}] precondition_failed: {pred} -> {why}")
-                return {"logic_ok": False, "goal_ok": False}
-
-        # Effects
-        for eff in actions[a].get("eff", []):
-            name, args = _materialize(eff, step)
-            apply_effect(name, args, st, world)
-
-        # Constraints
-        if a == "arm.place":
-            slot, obj = step["to"], step["object"]
-            allowed = constraints.get("allowed_targets", {})
-            if slot in allowed and not _pattern_any(obj, allowed[slot]):
-                errors.append(f"[{i}] constraint_violation: '{obj}' not allowed in '{slot}'")
-                return {"logic_ok": False, "goal_ok": False}
-
-        # Invariants
-        ok_inv, why_inv = check_invariants(st)
-        if not ok_inv:
-            errors.append(f"[{i}] invariant_broken: {why_inv}")
-            return {"logic_ok": False, "goal_ok": False}
-
-    # --- Up to this point, 'errors' only contains logic execution errors ---
-    logic_ok = len(errors) == 0
-
-    # --- Then, separately check the goal ---
-    ok_goal, why_goal = check_goal(st, goal)
-    goal_ok = ok_goal
-    if not ok_goal and goal:
-        errors.append(f"goal_unsatisfied: {why_goal}")
-
-    goal_ok = logic_ok and goal_ok
+        failure = execute_step(st, i, step, world, actions, constraints, debug)
+        if failure:
+            return {"logic_ok": False, "goal_ok": False, "failure": failure}
+
+    # --- All steps executed: logic is valid, then separately check the goal ---
+    failure = goal_failure(st, goal, len(steps))
 
     return {
-        "logic_ok": logic_ok,
-        "goal_ok": goal_ok,
+        "logic_ok": True,
+        "goal_ok": failure is None,
+        "failure": failure,
     }
@@ -24,27 +24,8 @@ def create_box(half_extents, pose, color):
     )
 
 
-def make_world(gui=False):
-    """S2 visual world — same scale and color style as S3/S4."""
-    cid = p.connect(p.GUI if gui else p.DIRECT)
-    p.setAdditionalSearchPath(pybullet_data.getDataPath())
-    p.resetSimulation()
-    p.setGravity(0, 0, -9.8)
-    p.loadURDF("plane.urdf")
-
-    # --- Clean visuals (disable PyBullet overlays) ---
-    p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_WIREFRAME, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 1)
-
-    # --- Static objects (aligned to S3 layout, no inspection area in S2) ---
-    create_box([0.4, 0.15, 0.3], [0.0, 0.6, 0.3, 0, 0, 0, 1], RGB["shelf"])
-    create_box([0.2, 0.2, 0.15], [0.0, -0.7, 0.15, 0, 0, 0, 1], RGB["redbin"])
-    create_box([0.2, 0.2, 0.15], [0.6, -0.7, 0.15, 0, 0, 0, 1], RGB["bluebin"])
-
+def symbolic_world():
+    """S2 world without the PyBullet scene: slots, poses, robots, initial occupancy."""
     # --- Slots (simpler: no inspection slot in S2) ---
     slots = {
         "Shelf.red.slot": [0.0, 0.6, 0.55],
@@ -53,19 +34,6 @@ def make_world(gui=False):
         "BlueBin.slot": [0.6, -0.7, 0.35],
     }
 
-    # --- Boxes (same size as S3/S4) ---
-    col = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04])
-    vis_red = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["redbox"])
-    vis_blue = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["bluebox"])
-    redbox = p.createMultiBody(0.2, col, vis_red, basePosition=slots["Shelf.red.slot"])
-    bluebox = p.createMultiBody(0.2, col, vis_blue, basePosition=slots["Shelf.blue.slot"])
-
-    # --- Robots (same position + color scheme as S3) ---
-    robotA = p.loadURDF("cube_small.urdf", [0.15, 0.6, 0.05], useFixedBase=False)
-    robotB = p.loadURDF("cube_small.urdf", [-0.05, 0.6, 0.05], useFixedBase=False)
-    p.changeVisualShape(robotA, -1, rgbaColor=RGB["robotA"])
-    p.changeVisualShape(robotB, -1, rgbaColor=RGB["robotB"])
-
     # ========= symbolic occupancy 状态 =========
     occupancy = {
         "Shelf.red.slot": "redbox",
@@ -84,10 +52,9 @@ def make_world(gui=False):
 
     # --- Return world dictionary ---
     world = {
-        "client": cid,
         "slots": slots,
-        "objects": {"redbox": redbox, "bluebox": bluebox},
-        "robots": {"robotA": robotA, "robotB": robotB},
+        "objects": {"redbox": None, "bluebox": None},   # PyBullet body ids, set by make_world
+        "robots": {"robotA": None, "robotB": None},     # PyBullet body ids, set by make_world
         # Add reachability_map mapping for validator compatibility
         "reachability_map": {
             "Shelf.red.slot": "Shelf.front.dock",
@@ -95,12 +62,55 @@ def make_world(gui=False):
             "RedBin.slot": "RedBin.dock",
             "BlueBin.slot": "BlueBin.dock",
         },
-        "state": {"occupancy": occupancy},  
-        "poses": poses,                    
+        "state": {"occupancy": occupancy},
+        "poses": poses,
     }
     return world
 
 
+def make_world(gui=False):
+    """S2 visual world — same scale and color style as S3/S4."""
+    cid = p.connect(p.GUI if gui else p.DIRECT)
+    p.setAdditionalSearchPath(pybullet_data.getDataPath())
+    p.resetSimulation()
+    p.setGravity(0, 0, -9.8)
+    p.loadURDF("plane.urdf")
+
+    # --- Clean visuals (disable PyBullet overlays) ---
+    p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_WIREFRAME, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 1)
+
+    # --- Static objects (aligned to S3 layout, no inspection area in S2) ---
+    create_box([0.4, 0.15, 0.3], [0.0, 0.6, 0.3, 0, 0, 0, 1], RGB["shelf"])
+    create_box([0.2, 0.2, 0.15], [0.0, -0.7, 0.15, 0, 0, 0, 1], RGB["redbin"])
+    create_box([0.2, 0.2, 0.15], [0.6, -0.7, 0.15, 0, 0, 0, 1], RGB["bluebin"])
+
+    world = symbolic_world()
+    slots = world["slots"]
+
+    # --- Boxes (same size as S3/S4) ---
+    col = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04])
+    vis_red = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["redbox"])
+    vis_blue = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["bluebox"])
+    redbox = p.createMultiBody(0.2, col, vis_red, basePosition=slots["Shelf.red.slot"])
+    bluebox = p.createMultiBody(0.2, col, vis_blue, basePosition=slots["Shelf.blue.slot"])
+
+    # --- Robots (same position + color scheme as S3) ---
+    robotA = p.loadURDF("cube_small.urdf", [0.15, 0.6, 0.05], useFixedBase=False)
+    robotB = p.loadURDF("cube_small.urdf", [-0.05, 0.6, 0.05], useFixedBase=False)
+    p.changeVisualShape(robotA, -1, rgbaColor=RGB["robotA"])
+    p.changeVisualShape(robotB, -1, rgbaColor=RGB["robotB"])
+
+    world["client"] = cid
+    world["objects"] = {"redbox": redbox, "bluebox": bluebox}
+    world["robots"] = {"robotA": robotA, "robotB": robotB}
+    return world
+
+
 if __name__ == "__main__":
     make_world(gui=True)
     input("Press Enter to exit...")
\ No newline at end of file
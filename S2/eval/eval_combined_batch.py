@@ -8,13 +8,21 @@ Output file: eval/eval_combined_results.json
 Author: Yixin
 """
 
+import argparse
 import json
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))  # repo root: warehouse/
 from difflib import SequenceMatcher
+from validation import validator
 from validation.validator import validate
 from env.actions_spec import ACTIONS
 from env.make_world import make_world
+from warehouse.grounding import ground_steps
+from warehouse.packed import PackReader
+from warehouse.peephole import optimize_plan
+from warehouse.repair import repair_distance
+from warehouse.simulation import simulate
 
 
 # === Paths ===
@@ -22,6 +30,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 DATASET_DIR = os.path.join(BASE_DIR, "dataset")
 GOLD_DIR = os.path.join(DATASET_DIR, "gold")
 LLM_DIR = os.path.join(DATASET_DIR, "llm_outputs")
+PACK_PATH = os.path.join(DATASET_DIR, "dataset.pack")  # python -m warehouse.packed pack dataset dataset/dataset.pack
 
 EVAL_DIR = os.path.join(BASE_DIR, "eval")
 os.makedirs(EVAL_DIR, exist_ok=True)
@@ -31,11 +40,29 @@ MODELS = ["small", "middle", "large"]
 
 
 # === Utility Functions ===
-def load_json(path):
+def _pack_key(path):
+    return os.path.relpath(path, DATASET_DIR).replace(os.sep, "/")
+
+
+def load_json(path, pack=None):
+    """Load a dataset file; with `pack`, from the packed dataset (warehouse/packed.py) instead of the file."""
+    if pack is not None:
+        return pack.json(_pack_key(path))
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def exists(path, pack=None):
+    if pack is not None:
+        key = _pack_key(path)
+        return key in pack or bool(pack.keys(key + "/"))
+    return os.path.exists(path)
+
+
+def listdir(path, pack=None):
+    return pack.listdir(_pack_key(path)) if pack is not None else os.listdir(path)
+
+
 def compare_plans(gold, llm):
     """Compute normalized plan similarity (PS)."""
     gold_text = json.dumps(gold.get("steps", []), sort_keys=True)
@@ -43,34 +70,55 @@ def compare_plans(gold, llm):
     return SequenceMatcher(None, gold_text, llm_text).ratio()
 
 
+def _empty_result(model):
+    """Result of a model with no evaluated cases; evaluate_model fills in the metrics it computed."""
+    return {"model": model, "TSR": 0, "LVR": 0, "PS": 0, "failures": {}, "RD": 0, "RD_timeouts": 0, "repairs": {},
+            "opt_steps": 0, "opt_makespan": 0}
+
+
+def _repair_order(item):
+    """Sort key of a (distance, count) repairs entry: proven distances by value, then timeouts (">=n")."""
+    key = item[0]
+    return key.startswith(">="), float(key.lstrip(">="))
+
+
 # === Evaluation per Model ===
-def evaluate_model(model):
+def evaluate_model(model, pack=None, peephole=False, repair=False):
     model_dir = os.path.join(LLM_DIR, model)
-    if not os.path.exists(model_dir):
+    if not exists(model_dir, pack):
         print(f"[WARN] Model folder not found: {model_dir}")
-        return {"model": model, "TSR": 0, "LVR": 0, "PS": 0}
+        return _empty_result(model)
 
     world = make_world()  # 默认DIRECT模式，不会开启GUI
+    candidates = ground_steps(world, ACTIONS, validator.ACTION_SCHEMA) if repair else None
     total_cases, success_cases, valid_cases = 0, 0, 0
     sims = []
+    failures = {}  # failure code → number of plans
+    repairs = {}   # repair distance (">=n" if the budget ran out) → number of plans
+    distances = []  # proven repair distances; searches that ran out of budget are only counted in repairs
+    savings = []   # (steps removed, makespan saved) by the peephole optimizer, per executable plan
 
-    for fname in os.listdir(model_dir):
+    for fname in listdir(model_dir, pack):
         if not fname.endswith(".json"):
             continue
 
         case_id = os.path.splitext(fname)[0]
         gold_path = os.path.join(GOLD_DIR, f"{case_id}.json")
         llm_path = os.path.join(model_dir, fname)
-        if not os.path.exists(gold_path):
+        if not exists(gold_path, pack):
             print(f"[WARN] Missing gold file for {case_id}")
             continue
 
-        gold = load_json(gold_path)
-        plan = load_json(llm_path)
+        gold = load_json(gold_path, pack)
+        plan = load_json(llm_path, pack)
         goal = {obj: slot for slot, obj in gold.get("goal", {}).items()} if "goal" in gold else None
+        constraints = gold.get("constraints") or {}   # the case's rules, for every check below
 
         # === Symbolic Validation ===
-        result = validate(world, plan, ACTIONS, {}, goal)
+        result = validate(world, plan, ACTIONS, constraints, goal)
+        if result.get("failure"):
+            code = result["failure"].code
+            failures[code] = failures.get(code, 0) + 1
 
         total_cases += 1
         # First, check if the logic passes
@@ -81,28 +129,67 @@ def evaluate_model(model):
             if result.get("goal_ok"):
                 success_cases += 1
 
+        # === Peephole Optimization (--peephole) ===
+        if peephole and result.get("logic_ok"):
+            opt = optimize_plan(validator, world, plan, ACTIONS, constraints, goal)
+            before = simulate(validator, world, plan, ACTIONS, constraints)["makespan"]
+            after = simulate(validator, world, {"steps": opt["steps"]}, ACTIONS, constraints)["makespan"]
+            savings.append((opt["before"] - opt["after"], before - after))
+
+        # === Repair Distance (--repair) ===
+        if repair:
+            rd = repair_distance(validator, world, plan, ACTIONS, constraints, goal,
+                                 reference=gold.get("steps"), candidates=candidates)
+            key = str(rd["distance"]) if not rd["timeout"] else f">={rd['lower_bound']}"
+            repairs[key] = repairs.get(key, 0) + 1
+            if not rd["timeout"]:
+                distances.append(rd["distance"])
+
         # === Plan Similarity ===
         sims.append(compare_plans(gold, plan))
 
     if total_cases == 0:
-        return {"model": model, "TSR": 0, "LVR": 0, "PS": 0}
+        return _empty_result(model)
 
     TSR = round(success_cases / total_cases, 2)
     LVR = round(valid_cases / total_cases, 2)
     PS = round(sum(sims) / len(sims), 2) if sims else 0.0
+    RD = round(sum(distances) / len(distances), 2) if distances else 0.0
+    RD_timeouts = sum(v for k, v in repairs.items() if k.startswith(">="))
+    opt_steps, opt_makespan = (round(sum(col) / len(col), 2) for col in zip(*savings)) if savings else (0, 0)
 
-    return {"model": model, "TSR": TSR, "LVR": LVR, "PS": PS}
+    res = _empty_result(model)
+    res.update({"TSR": TSR, "LVR": LVR, "PS": PS, "failures": failures,
+                "RD": RD, "RD_timeouts": RD_timeouts, "repairs": repairs,
+                "opt_steps": opt_steps, "opt_makespan": opt_makespan})
+    return res
 
 
 # === Entrypoint ===
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pack", nargs="?", const=PACK_PATH, default=None,
+                        help=f"read gold and LLM outputs from a packed dataset (default {PACK_PATH})")
+    parser.add_argument("--peephole", action="store_true",
+                        help="also report what the peephole optimizer removes from each executable plan")
+    parser.add_argument("--repair", action="store_true",
+                        help="also compute the repair distance RD (an A* search per plan, up to 1 s each)")
+    args = parser.parse_args()
+    pack = PackReader(args.pack) if args.pack else None
     print("\n=== Unified Evaluation for All Models (S2 Sequential Cooperation) ===\n")
     results = []
 
     for model in MODELS:
-        res = evaluate_model(model)
+        res = evaluate_model(model, pack, peephole=args.peephole, repair=args.repair)
         results.append(res)
         print(f"[{model}] TSR={res['TSR']:.2f} | LVR={res['LVR']:.2f} | PS={res['PS']:.2f}")
+        if args.peephole:
+            print(f"         peephole: -{res['opt_steps']:.2f} steps, -{res['opt_makespan']:.2f}s makespan per executable plan")
+        if args.repair:
+            print(f"         RD={res['RD']:.2f} over proven distances, {res['RD_timeouts']} timed out | repair distances: "
+                  + ", ".join(f"{k}={v}" for k, v in sorted(res["repairs"].items(), key=_repair_order)))
+        if res["failures"]:
+            print("         failures: " + ", ".join(f"{k}={v}" for k, v in sorted(res["failures"].items())))
 
     with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
         json.dump(results, f, indent=2)
@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import time
 import argparse
@@ -8,7 +9,13 @@ import subprocess
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATASET_DIR = os.path.join(BASE_DIR, "dataset")
 PROMPT_DIR = os.path.join(DATASET_DIR, "prompts")
+GOLD_DIR = os.path.join(DATASET_DIR, "gold")
 LLM_OUTPUTS_DIR = os.path.join(DATASET_DIR, "llm_outputs")
+LIBRARY_PATH = os.path.join(DATASET_DIR, "plan_library_{model}.json")   # one library per model
+
+sys.path.append(os.path.dirname(BASE_DIR))
+from warehouse.library import PlanLibrary, requirements_of
+from warehouse.stages import load_stage
 
 # === Model configuration ===
 MODEL_CONFIGS = {
@@ -30,6 +37,12 @@ def extract_json(text):
         text = text.split("```")[0]
     return text.strip()
 
+def library_task(case_id):
+    """(goal, requirements) of a case from its gold file, to look it up in the plan library."""
+    with open(os.path.join(GOLD_DIR, f"{case_id}.json"), "r", encoding="utf-8") as f:
+        gold = json.load(f)
+    return {obj: slot for slot, obj in gold["goal"].items()}, requirements_of(gold)
+
 def call_llm(prompt_path, model_name):
     """Call Ollama model using subprocess and return raw output."""
     with open(prompt_path, "r", encoding="utf-8") as f:
@@ -46,6 +59,9 @@ def call_llm(prompt_path, model_name):
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--model", type=str, choices=["small", "middle", "large"], required=True)
+    parser.add_argument("--library", nargs="?", const=LIBRARY_PATH, default=None,
+                        help="serve known tasks from this model's validated-plan library "
+                             "(default: dataset/plan_library_<model>.json)")
     args = parser.parse_args()
 
     cfg = MODEL_CONFIGS[args.model]
@@ -53,6 +69,8 @@ def main():
 
     output_dir = os.path.join(LLM_OUTPUTS_DIR, args.model)
     ensure_dir(output_dir)
+    library = PlanLibrary(args.library.replace("{model}", args.model)) if args.library else None
+    stage = load_stage("S2") if library else None
 
     prompts = [f for f in os.listdir(PROMPT_DIR) if f.endswith(".txt")]
     total, success, skipped, failed = len(prompts), 0, 0, []
@@ -69,6 +87,16 @@ def main():
             skipped += 1
             continue
 
+        if library is not None:
+            goal, requirements = library_task(case_id)
+            steps = library.lookup(stage.name, stage.world, goal, requirements=requirements)
+            if steps is not None:
+                with open(output_path, "w", encoding="utf-8") as f:
+                    json.dump({"steps": steps, "source": "plan_library"}, f, indent=2)
+                print(f"[{idx}/{total}] Library hit: {case_id}")
+                success += 1
+                continue
+
         print(f"[{idx}/{total}] Generating {case_id} ...")
         raw = call_llm(prompt_path, model_name)
         if not raw:
@@ -86,11 +114,19 @@ def main():
         with open(output_path, "w", encoding="utf-8") as f:
             json.dump(parsed, f, indent=2)
         success += 1
+        if library is not None and isinstance(parsed, dict):
+            library.store(stage.name, stage.world, goal, parsed, stage.validator, stage.ACTIONS,
+                          requirements=requirements)
         time.sleep(1)
 
     print("\n=== Summary ===")
     print(f"Model: {model_name}")
     print(f"Total: {total}, Success: {success}, Skipped: {skipped}, Failed: {len(failed)}")
+    if library is not None:
+        library.save()
+        st = library.stats()
+        print(f"Library: {st['hits']} hits, {st['misses']} misses ({st['hit_rate']:.0%}), "
+              f"{st['stores']} plans stored, {st['rejected']} rejected, {st['entries']} entries")
 
 if __name__ == "__main__":
     main()
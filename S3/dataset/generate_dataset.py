@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 
 # === Base directories ===
@@ -9,6 +10,9 @@ GOLD_DIR = os.path.join(BASE_DIR, "gold")
 os.makedirs(PROMPTS_DIR, exist_ok=True)
 os.makedirs(GOLD_DIR, exist_ok=True)
 
+sys.path.append(os.path.dirname(os.path.dirname(BASE_DIR)))
+from warehouse.goldcheck import GoldCheckError, verify_golds
+
 A_FIRST_PROMPT = """\
 Task: Two robots (robotA, robotB) must each move their own box through a shared inspection area.
 
@@ -203,28 +207,43 @@ def make_gold_steps(order: str):
         ]
 
 # === Generate 100 tasks (1..50 A-first, 51..100 B-first) ===
-for i in range(1, 101):
-    task_id = f"s3_case{i:03}"
-    order = "A-first" if i <= 50 else "B-first"
-
-    # Prompt text (strongly guided but still general)
-    prompt_text = A_FIRST_PROMPT if order == "A-first" else B_FIRST_PROMPT
-
-    # Gold steps consistent with validator semantics (no true waiting, mutual exclusion enforced)
-    gold = {
-        "task_id": task_id,
-        "description": f"Near-concurrent cooperation via Inspection (order={order}).",
-        "goal": {
-            "RedBin.slot": "redbox",
-            "BlueBin.slot": "bluebox",
-        },
-        "steps": make_gold_steps(order),
-    }
-
-    # Write files
-    with open(os.path.join(PROMPTS_DIR, f"{task_id}.txt"), "w", encoding="utf-8") as f:
-        f.write(prompt_text)
-    with open(os.path.join(GOLD_DIR, f"{task_id}.json"), "w", encoding="utf-8") as f:
-        json.dump(gold, f, indent=2)
-
-print("All 100 S3 prompts and gold plans generated successfully.")
\ No newline at end of file
+def main():
+    for i in range(1, 101):
+        task_id = f"s3_case{i:03}"
+        order = "A-first" if i <= 50 else "B-first"
+
+        # Prompt text (strongly guided but still general)
+        prompt_text = A_FIRST_PROMPT if order == "A-first" else B_FIRST_PROMPT
+
+        # Gold steps consistent with validator semantics (no true waiting, mutual exclusion enforced)
+        gold = {
+            "task_id": task_id,
+            "description": f"Near-concurrent cooperation via Inspection (order={order}).",
+            "goal": {
+                "RedBin.slot": "redbox",
+                "BlueBin.slot": "bluebox",
+            },
+            "steps": make_gold_steps(order),
+        }
+
+        # Write files
+        with open(os.path.join(PROMPTS_DIR, f"{task_id}.txt"), "w", encoding="utf-8") as f:
+            f.write(prompt_text)
+        with open(os.path.join(GOLD_DIR, f"{task_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(gold, f, indent=2)
+
+    print("All 100 S3 prompts and gold plans generated successfully.")
+
+    # === Verify every gold plan against the S3 validator (only changed files are re-checked) ===
+    try:
+        report = verify_golds("S3", GOLD_DIR)
+    except GoldCheckError as e:
+        for err in e.errors:
+            print(f"[ERROR] {err['file']}: {err['code']}: {err['message']}")
+        sys.exit(f"{e.stage}: {len(e.errors)} gold plan(s) fail their validator, dataset build failed")
+    print(f"All {report['files']} S3 gold plans pass the validator "
+          f"({report['verified']} verified, {report['cached']} unchanged).")
+
+
+if __name__ == "__main__":
+    main()
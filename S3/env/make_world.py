@@ -23,28 +23,8 @@ def create_box(half_extents, pose, color):
         baseOrientation=pose[3:],
     )
 
-def make_world(gui=False):
-    """S3 visual world (aligned with S4 scale and colors)."""
-    cid = p.connect(p.GUI if gui else p.DIRECT)
-    p.setAdditionalSearchPath(pybullet_data.getDataPath())
-    p.resetSimulation()
-    p.setGravity(0, 0, -9.8)
-    p.loadURDF("plane.urdf")
-
-    # Disable GUI overlays for clean visuals
-    p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_WIREFRAME, 0)
-    # The coordinate frame flag was removed in some PyBullet versions; skip safely.
-
-    # --- Static objects (same dimensions as S4) ---
-    create_box([0.4, 0.15, 0.3], [0.0, 0.6, 0.3, 0, 0, 0, 1], RGB["shelf"])
-    create_box([0.3, 0.2, 0.2], [0.3, -0.2, 0.2, 0, 0, 0, 1], RGB["inspection"])
-    create_box([0.2, 0.2, 0.15], [0.0, -0.7, 0.15, 0, 0, 0, 1], RGB["redbin"])
-    create_box([0.2, 0.2, 0.15], [0.6, -0.7, 0.15, 0, 0, 0, 1], RGB["bluebin"])
-
+def symbolic_world():
+    """S3 world without the PyBullet scene: slots, poses, robots, stations, initial occupancy."""
     # --- Object placement slots ---
     slots = {
         "Shelf.red.slot": [0.0, 0.6, 0.55],
@@ -54,20 +34,7 @@ def make_world(gui=False):
         "BlueBin.slot": [0.6, -0.7, 0.35],
     }
 
-    # --- Movable boxes ---
-    col = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04])
-    vis_red = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["redbox"])
-    vis_blue = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["bluebox"])
-    redbox = p.createMultiBody(0.2, col, vis_red, basePosition=slots["Shelf.red.slot"])
-    bluebox = p.createMultiBody(0.2, col, vis_blue, basePosition=slots["Shelf.blue.slot"])
-
-    # --- Robots ---
-    robotA = p.loadURDF("cube_small.urdf", [0.15, 0.6, 0.05], useFixedBase=False)
-    robotB = p.loadURDF("cube_small.urdf", [-0.05, 0.6, 0.05], useFixedBase=False)
-    p.changeVisualShape(robotA, -1, rgbaColor=RGB["robotA"])
-    p.changeVisualShape(robotB, -1, rgbaColor=RGB["robotB"])
-
-    # ========= Added: object occupancy status ========= 
+    # ========= Added: object occupancy status =========
     occupancy = {
         "Shelf.red.slot": "redbox",
         "Shelf.blue.slot": "bluebox",
@@ -95,12 +62,58 @@ def make_world(gui=False):
 
     # --- Return world dictionary ---
     world = {
-        "client": cid,
         "slots": slots,
-        "objects": {"redbox": redbox, "bluebox": bluebox},
-        "robots": {"robotA": robotA, "robotB": robotB},
-        "state": {"occupancy": occupancy},     
-        "reachability_map": reachability_map,  
-        "poses": poses,                       
+        "objects": {"redbox": None, "bluebox": None},      # PyBullet body ids, set by make_world
+        "robots": {"robotA": None, "robotB": None},        # PyBullet body ids, set by make_world
+        "state": {"occupancy": occupancy},
+        "reachability_map": reachability_map,
+        "poses": poses,
+        "resources": {                         # shared stations, see warehouse/resources.py
+            "Inspection": {"slots": ["Inspection.slot"], "capacity": 1},
+        },
     }
-    return world
\ No newline at end of file
+    return world
+
+
+def make_world(gui=False):
+    """S3 visual world (aligned with S4 scale and colors)."""
+    cid = p.connect(p.GUI if gui else p.DIRECT)
+    p.setAdditionalSearchPath(pybullet_data.getDataPath())
+    p.resetSimulation()
+    p.setGravity(0, 0, -9.8)
+    p.loadURDF("plane.urdf")
+
+    # Disable GUI overlays for clean visuals
+    p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_WIREFRAME, 0)
+    # The coordinate frame flag was removed in some PyBullet versions; skip safely.
+
+    # --- Static objects (same dimensions as S4) ---
+    create_box([0.4, 0.15, 0.3], [0.0, 0.6, 0.3, 0, 0, 0, 1], RGB["shelf"])
+    create_box([0.3, 0.2, 0.2], [0.3, -0.2, 0.2, 0, 0, 0, 1], RGB["inspection"])
+    create_box([0.2, 0.2, 0.15], [0.0, -0.7, 0.15, 0, 0, 0, 1], RGB["redbin"])
+    create_box([0.2, 0.2, 0.15], [0.6, -0.7, 0.15, 0, 0, 0, 1], RGB["bluebin"])
+
+    world = symbolic_world()
+    slots = world["slots"]
+
+    # --- Movable boxes ---
+    col = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04])
+    vis_red = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["redbox"])
+    vis_blue = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["bluebox"])
+    redbox = p.createMultiBody(0.2, col, vis_red, basePosition=slots["Shelf.red.slot"])
+    bluebox = p.createMultiBody(0.2, col, vis_blue, basePosition=slots["Shelf.blue.slot"])
+
+    # --- Robots ---
+    robotA = p.loadURDF("cube_small.urdf", [0.15, 0.6, 0.05], useFixedBase=False)
+    robotB = p.loadURDF("cube_small.urdf", [-0.05, 0.6, 0.05], useFixedBase=False)
+    p.changeVisualShape(robotA, -1, rgbaColor=RGB["robotA"])
+    p.changeVisualShape(robotB, -1, rgbaColor=RGB["robotB"])
+
+    world["client"] = cid
+    world["objects"] = {"redbox": redbox, "bluebox": bluebox}
+    world["robots"] = {"robotA": robotA, "robotB": robotB}
+    return world
@@ -24,28 +24,8 @@ def create_box(half_extents, pose, color):
     )
 
 
-def make_world(gui=False):
-    """构建 S4 仿真世界：Shelf + Inspection + RedBin + BlueBin + 四机器人"""
-    cid = p.connect(p.GUI if gui else p.DIRECT)
-    p.setAdditionalSearchPath(pybullet_data.getDataPath())
-    p.resetSimulation()
-    p.setGravity(0, 0, -9.8)
-    p.loadURDF("plane.urdf")
-
-    # --- Clean visual layout ---
-    p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_WIREFRAME, 0)
-    p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 1)
-
-    # --- Static structures ---
-    create_box([0.4, 0.15, 0.3], [0.0, 0.6, 0.3, 0, 0, 0, 1], RGB["soft_gray"])    # Shelf
-    create_box([0.3, 0.2, 0.2], [0.3, -0.2, 0.2, 0, 0, 0, 1], RGB["mint"])        # Inspection
-    create_box([0.2, 0.2, 0.15], [0.0, -0.7, 0.15, 0, 0, 0, 1], RGB["salmon"])    # RedBin
-    create_box([0.2, 0.2, 0.15], [0.6, -0.7, 0.15, 0, 0, 0, 1], RGB["light_blue"])  # BlueBin
-
+def symbolic_world():
+    """S4 world without the PyBullet scene: slots, poses, robots, stations, initial occupancy."""
     # --- Slot positions (最终命名) ---
     slots = {
         "Shelf.red.slot": [0.0, 0.6, 0.55],
@@ -63,19 +43,11 @@ def make_world(gui=False):
         "BlueBin.dock",
     }
 
-    # --- Boxes ---
-    col = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04])
-    vis_r = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["red"])
-    vis_b = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["blue"])
-    redbox = p.createMultiBody(0.2, col, vis_r, basePosition=slots["Shelf.red.slot"])
-    bluebox = p.createMultiBody(0.2, col, vis_b, basePosition=slots["Shelf.blue.slot"])
-
     # --- World structure ---
     world = {
-        "client": cid,
         "slots": slots,
         "poses": poses,
-        "objects": {"redbox": redbox, "bluebox": bluebox},
+        "objects": {"redbox": None, "bluebox": None},   # PyBullet body ids, set by make_world
         "robots": {
             "robotA": {"holding": None, "dock": "Shelf.dock"},
             "robotB": {"holding": None, "dock": "Shelf.dock"},
@@ -83,13 +55,16 @@ def make_world(gui=False):
             "robotD": {"holding": None, "dock": "BlueBin.dock"},
         },
         "state": {"occupancy": {k: None for k in slots.keys()}},
-        "reachability_map": {    
+        "reachability_map": {
             "Shelf.red.slot": "Shelf.front.dock",
             "Shelf.blue.slot": "Shelf.front.dock",
             "RedBin.slot": "RedBin.dock",
             "BlueBin.slot": "BlueBin.dock",
             "Inspection.slot": "Inspection.dock"
         },
+        "resources": {    # shared stations, see warehouse/resources.py
+            "Inspection": {"slots": ["Inspection.slot"], "capacity": 1},
+        },
     }
 
     # --- Initial occupancy ---
@@ -99,6 +74,43 @@ def make_world(gui=False):
     return world
 
 
+def make_world(gui=False):
+    """构建 S4 仿真世界：Shelf + Inspection + RedBin + BlueBin + 四机器人"""
+    cid = p.connect(p.GUI if gui else p.DIRECT)
+    p.setAdditionalSearchPath(pybullet_data.getDataPath())
+    p.resetSimulation()
+    p.setGravity(0, 0, -9.8)
+    p.loadURDF("plane.urdf")
+
+    # --- Clean visual layout ---
+    p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_WIREFRAME, 0)
+    p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 1)
+
+    # --- Static structures ---
+    create_box([0.4, 0.15, 0.3], [0.0, 0.6, 0.3, 0, 0, 0, 1], RGB["soft_gray"])    # Shelf
+    create_box([0.3, 0.2, 0.2], [0.3, -0.2, 0.2, 0, 0, 0, 1], RGB["mint"])        # Inspection
+    create_box([0.2, 0.2, 0.15], [0.0, -0.7, 0.15, 0, 0, 0, 1], RGB["salmon"])    # RedBin
+    create_box([0.2, 0.2, 0.15], [0.6, -0.7, 0.15, 0, 0, 0, 1], RGB["light_blue"])  # BlueBin
+
+    world = symbolic_world()
+    slots = world["slots"]
+
+    # --- Boxes ---
+    col = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04])
+    vis_r = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["red"])
+    vis_b = p.createVisualShape(p.GEOM_BOX, halfExtents=[0.04, 0.04, 0.04], rgbaColor=RGB["blue"])
+    redbox = p.createMultiBody(0.2, col, vis_r, basePosition=slots["Shelf.red.slot"])
+    bluebox = p.createMultiBody(0.2, col, vis_b, basePosition=slots["Shelf.blue.slot"])
+
+    world["client"] = cid
+    world["objects"] = {"redbox": redbox, "bluebox": bluebox}
+    return world
+
+
 if __name__ == "__main__":
     make_world(gui=True)
     input("Press Enter to exit...")
\ No newline at end of file
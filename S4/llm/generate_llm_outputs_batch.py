@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import argparse
 import subprocess
@@ -7,8 +8,14 @@ import subprocess
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 PROMPT_DIR = os.path.join(BASE_DIR, "dataset", "prompts")
 OUTPUT_DIR = os.path.join(BASE_DIR, "dataset", "llm_outputs")
+GOLD_DIR = os.path.join(BASE_DIR, "dataset", "gold")
+LIBRARY_PATH = os.path.join(BASE_DIR, "dataset", "plan_library_{model}.json")   # one library per model
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+sys.path.append(os.path.dirname(os.path.abspath(BASE_DIR)))
+from warehouse.library import PlanLibrary, requirements_of
+from warehouse.stages import load_stage
+
 # === Model Mapping ===
 MODEL_MAP = {
     "small": "llama3.2:1b",
@@ -16,6 +23,13 @@ MODEL_MAP = {
     "large": "qwen3:8b"
 }
 
+# === Plan Library ===
+def library_task(case_id):
+    """(goal, requirements) of a case from its gold file, to look it up in the plan library."""
+    with open(os.path.join(GOLD_DIR, f"{case_id}.json"), "r", encoding="utf-8") as f:
+        gold = json.load(f)
+    return {obj: slot for slot, obj in gold["goal"].items()}, requirements_of(gold)
+
 # === LLM Caller ===
 def call_llm(prompt_text: str, model_name: str):
     """
@@ -36,12 +50,17 @@ def main():
     parser.add_argument("--model", type=str, required=True,
                         choices=["small", "middle", "large"],
                         help="Select which LLM model to use")
+    parser.add_argument("--library", nargs="?", const=LIBRARY_PATH, default=None,
+                        help="Serve known tasks from this model's validated-plan library "
+                             "(default: dataset/plan_library_<model>.json)")
     args = parser.parse_args()
 
     model_key = args.model
     model_name = MODEL_MAP[model_key]
     model_dir = os.path.join(OUTPUT_DIR, model_key)
     os.makedirs(model_dir, exist_ok=True)
+    library = PlanLibrary(args.library.replace("{model}", args.model)) if args.library else None
+    stage = load_stage("S4") if library else None
 
     print(f"=== Generating S4 outputs using {model_name} ({model_key}) ===")
 
@@ -57,6 +76,17 @@ def main():
         with open(prompt_path, "r", encoding="utf-8") as f:
             prompt_text = f.read()
 
+        # === Known task: serve it from the library ===
+        if library is not None:
+            goal, requirements = library_task(case_id)
+            steps = library.lookup(stage.name, stage.world, goal, requirements=requirements)
+            if steps is not None:
+                with open(output_path, "w", encoding="utf-8") as f:
+                    json.dump({"steps": steps, "source": "plan_library"}, f, indent=2)
+                print(f"[{idx}/{len(prompt_files)}] Library hit: {case_id}")
+                success += 1
+                continue
+
         print(f"[{idx}/{len(prompt_files)}] Generating {case_id}...")
 
         # === Call the LLM ===
@@ -68,6 +98,9 @@ def main():
             with open(output_path, "w", encoding="utf-8") as f:
                 json.dump(parsed, f, indent=2)
             success += 1
+            if library is not None and isinstance(parsed, dict):
+                library.store(stage.name, stage.world, goal, parsed, stage.validator, stage.ACTIONS,
+                              requirements=requirements)
         except Exception:
             failed += 1
             print(f"[Error] JSON parse failed: {case_id}")
@@ -77,6 +110,11 @@ def main():
     print(f"Model: {model_name}")
     print(f"Total: {len(prompt_files)}, Success: {success}, Failed: {failed}")
     print(f"Results saved to: {model_dir}")
+    if library is not None:
+        library.save()
+        st = library.stats()
+        print(f"Library: {st['hits']} hits, {st['misses']} misses ({st['hit_rate']:.0%}), "
+              f"{st['stores']} plans stored, {st['rejected']} rejected, {st['entries']} entries")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
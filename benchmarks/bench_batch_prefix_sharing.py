@@ -0,0 +1,104 @@
+"""
+Prefix-sharing batch validation on the real plan corpora of one stage.
+
+Plans are grouped by prompt text (identical prompts, e.g. all 50 A-first S3
+cases, form one group), each group is validated with
+warehouse.batch.validate_batch, results are checked against plan-by-plan
+validate, and the fraction of validator steps skipped is reported.
+
+The corpus is every gold plan plus every file under
+dataset/llm_outputs/<model>/ (all model tiers and repeated runs found).
+
+Usage:
+    python benchmarks/bench_batch_prefix_sharing.py --stage S3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.batch import validate_batch
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_corpus(stage_dir):
+    """Return {prompt text: (goal, [plan, ...])} for gold and LLM plans."""
+    dataset_dir = os.path.join(stage_dir, "dataset")
+    prompts_dir = os.path.join(dataset_dir, "prompts")
+    gold_dir = os.path.join(dataset_dir, "gold")
+    llm_dir = os.path.join(dataset_dir, "llm_outputs")
+
+    sources = [gold_dir]
+    if os.path.isdir(llm_dir):
+        for root, _, files in os.walk(llm_dir):
+            if any(f.endswith(".json") for f in files):
+                sources.append(root)
+    else:
+        print(f"[WARN] No LLM outputs found under {llm_dir}; using gold plans only")
+
+    groups = {}
+    for src in sources:
+        for fname in sorted(os.listdir(src)):
+            if not fname.endswith(".json"):
+                continue
+            case_id = os.path.splitext(fname)[0]
+            prompt_path = os.path.join(prompts_dir, f"{case_id}.txt")
+            gold_path = os.path.join(gold_dir, f"{case_id}.json")
+            if not (os.path.exists(prompt_path) and os.path.exists(gold_path)):
+                continue
+            with open(prompt_path, "r", encoding="utf-8") as f:
+                prompt = f.read()
+            gold = load_json(gold_path)
+            goal = {obj: slot for slot, obj in gold.get("goal", {}).items()} if "goal" in gold else None
+            _, plans = groups.setdefault(prompt, (goal, []))
+            plans.append(load_json(os.path.join(src, fname)))
+    return groups
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S1", "S2", "S3", "S4"], required=True)
+    args = parser.parse_args()
+
+    stage_dir = os.path.join(BASE_DIR, args.stage)
+    sys.path.append(stage_dir)
+    from validation import validator
+    from env.actions_spec import ACTIONS
+    from env.make_world import make_world
+
+    world = make_world()
+    groups = load_corpus(stage_dir)
+
+    print(f"\n=== Prefix-sharing batch validation ({args.stage}) ===\n")
+    seq_total, exec_total, n_plans = 0, 0, 0
+    t_single, t_batch = 0.0, 0.0
+    for n, (goal, plans) in enumerate(groups.values(), start=1):
+        t0 = time.perf_counter()
+        expected = [validator.validate(world, p, ACTIONS, {}, goal) for p in plans]
+        t1 = time.perf_counter()
+        results, stats = validate_batch(validator, world, plans, ACTIONS, {}, goal)
+        t2 = time.perf_counter()
+        assert results == expected, f"batch results differ from validate in prompt group {n}"
+
+        t_single += t1 - t0
+        t_batch += t2 - t1
+        seq_total += stats["sequential_steps"]
+        exec_total += stats["executed_steps"]
+        n_plans += stats["plans"]
+        print(f"[group {n}] plans={stats['plans']} steps={stats['sequential_steps']} "
+              f"executed={stats['executed_steps']} skipped={stats['skipped_fraction']:.1%}")
+
+    skipped = (1 - exec_total / seq_total) if seq_total else 0.0
+    print(f"\nPlans: {n_plans} | steps: {seq_total} | executed: {exec_total} | skipped: {skipped:.1%}")
+    print(f"Time: plan-by-plan {t_single * 1e3:.1f} ms | batch {t_batch * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
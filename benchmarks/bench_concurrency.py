@@ -0,0 +1,164 @@
+"""
+Concurrency-aware validation (warehouse.concurrency) on S3/S4.
+
+1. Gold plans: literal validate() against the exists/forall verdicts.
+2. Reinterleaved gold plans: the per-agent sequences of every gold plan
+   merged in random orders. The literal validator rejects most of them;
+   the exists verdict must not change, since the sequences are the same.
+3. Scaling on synthetic worlds: explored states and time of the search,
+   with and without partial-order reduction, against the naive number of
+   interleavings. "transfer" robots share nothing; "station" robots share
+   one capacity-1 station per pair; "contended" robots all share one.
+4. Wait-for analysis (check_waits): outcome of gold plans with one step
+   moved elsewhere in the plan, and time per step against plan length on
+   contended station plans, where most robots block at every round.
+
+Usage:
+    python benchmarks/bench_concurrency.py --stage S4
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import make_synthetic_world, make_transfer_plan, add_stations, make_station_plan
+from warehouse.concurrency import validate_concurrent, split_by_agent, check_waits
+
+N_SHUFFLES = 20
+UNREDUCED_MAX_AGENTS = 4   # the search without reduction grows too fast beyond this
+N_MOVES = 20
+WAIT_TASKS = [250, 1000, 4000, 16000]
+
+
+def magnitude(n):
+    return f"1e{len(str(n)) - 1}"
+
+
+def reinterleave(world, steps, rng):
+    """Random merge of the per-agent sequences of `steps`."""
+    _, seqs = split_by_agent(world, {"steps": steps})
+    pcs = [0] * len(seqs)
+    out = []
+    while len(out) < len(steps):
+        a = rng.choice([a for a in range(len(seqs)) if pcs[a] < len(seqs[a])])
+        out.append(seqs[a][pcs[a]][1])
+        pcs[a] += 1
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S3", "S4"], required=True)
+    args = parser.parse_args()
+
+    stage_dir = os.path.join(BASE_DIR, args.stage)
+    sys.path.append(stage_dir)
+    from validation import validator
+    from env.actions_spec import ACTIONS
+    from env.make_world import make_world
+
+    world = make_world()
+    gold_dir = os.path.join(stage_dir, "dataset", "gold")
+    cases = []
+    for fname in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        cases.append((gold["steps"], {o: s for s, o in gold["goal"].items()}))
+
+    # === Gold plans ===
+    counts = {"literal": 0, "exists": 0, "forall": 0}
+    explored = 0
+    for steps, goal in cases:
+        plan = {"steps": steps}
+        counts["literal"] += validator.validate(world, plan, ACTIONS, {}, goal)["goal_ok"]
+        for mode in ("exists", "forall"):
+            r = validate_concurrent(validator, world, plan, ACTIONS, {}, goal, mode)
+            counts[mode] += r["goal_ok"]
+            explored = max(explored, r["stats"]["explored_states"])
+    naive = r["stats"]["naive_interleavings"]
+    print(f"\n=== Gold plans ({args.stage}, {len(cases)} plans) ===\n")
+    print(f"goal_ok  literal {counts['literal']}  exists {counts['exists']}  forall {counts['forall']}")
+    print(f"explored states <= {explored} (naive interleavings {naive:,})")
+
+    # === Reinterleaved gold plans ===
+    rng = random.Random(0)
+    literal_ok = exists_ok = total = 0
+    for steps, goal in cases:
+        for _ in range(N_SHUFFLES):
+            plan = {"steps": reinterleave(world, steps, rng)}
+            literal_ok += validator.validate(world, plan, ACTIONS, {}, goal)["goal_ok"]
+            exists_ok += validate_concurrent(validator, world, plan, ACTIONS, {}, goal)["goal_ok"]
+            total += 1
+    print(f"\n=== Reinterleaved gold plans ({total} plans) ===\n")
+    print(f"goal_ok  literal {literal_ok}/{total}  exists {exists_ok}/{total}")
+
+    # === Scaling ===
+    print("\n=== Scaling (synthetic worlds, 2 tasks per robot) ===\n")
+    print(f"{'world':<10} {'robots':>6} {'steps':>6} {'naive':>8} {'mode':>7} "
+          f"{'states':>8} {'ms':>8} {'unreduced':>10} {'ms':>8}")
+    for kind, sizes in (("transfer", (4, 8, 16, 32)), ("station", (4, 8, 16, 32)), ("contended", (2, 3, 4))):
+        for n in sizes:
+            syn = make_synthetic_world(n, 4 * n)
+            if kind == "transfer":
+                plan, goal = make_transfer_plan(syn, 2 * n)
+            else:
+                add_stations(syn, max(1, n // 2) if kind == "station" else 1)
+                plan, goal = make_station_plan(syn, 2 * n)
+            for mode in ("exists", "forall"):
+                row = []
+                for reduction in (True, False):
+                    if not reduction and n > UNREDUCED_MAX_AGENTS:
+                        row += ["-", "-"]
+                        continue
+                    t0 = time.perf_counter()
+                    r = validate_concurrent(validator, syn, plan, ACTIONS, {}, goal, mode, reduction)
+                    ms = (time.perf_counter() - t0) * 1e3
+                    assert r["goal_ok"], r["failure"]
+                    row += [r["stats"]["explored_states"], f"{ms:.1f}"]
+                print(f"{kind:<10} {n:>6} {len(plan['steps']):>6} "
+                      f"{magnitude(r['stats']['naive_interleavings']):>8} {mode:>7} "
+                      f"{row[0]:>8} {row[1]:>8} {row[2]:>10} {row[3]:>8}")
+
+    # === Wait-for analysis ===
+    robots = list(world["robots"])
+    outcomes = {}
+    for steps, goal in cases:
+        for _ in range(N_MOVES):
+            changed = list(steps)
+            if rng.random() < 0.5:
+                changed.insert(rng.randrange(len(changed)), changed.pop(rng.randrange(len(changed))))
+            else:
+                changed.insert(rng.randrange(len(changed)), {"agent": rng.choice(robots), "action": "wait_until_free",
+                                                             "target": rng.choice(list(world["slots"]))})
+            r = check_waits(validator, world, {"steps": changed}, ACTIONS, {}, goal)
+            code = r["failure"].code if r["failure"] else "ok"
+            outcomes[code] = outcomes.get(code, 0) + 1
+    print(f"\n=== Wait-for analysis ({len(cases) * N_MOVES} gold plans, one step moved or one wait added) ===\n")
+    print(", ".join(f"{k}={v}" for k, v in sorted(outcomes.items())))
+
+    print("\n8 robots; 'free' has a station per robot, 'contended' one station for all\n")
+    print(f"{'steps':>8} {'validate free':>14} {'check_waits free':>17} {'contended':>10} {'parks':>7}   (us/step)")
+    for n_tasks in WAIT_TASKS:
+        row = []
+        for n_stations in (8, 1):
+            syn = make_synthetic_world(8, 2 * n_tasks)
+            add_stations(syn, n_stations)
+            plan, goal = make_station_plan(syn, n_tasks)
+            n = len(plan["steps"])
+            if n_stations == 8:
+                t0 = time.perf_counter()
+                validator.validate(syn, plan, ACTIONS, {}, goal)
+                row.append((time.perf_counter() - t0) / n * 1e6)
+            t0 = time.perf_counter()
+            r = check_waits(validator, syn, plan, ACTIONS, {}, goal)
+            row.append((time.perf_counter() - t0) / n * 1e6)
+            assert r["goal_ok"], r["failure"]
+        print(f"{n:>8} {row[0]:>14.2f} {row[1]:>17.2f} {row[2]:>10.2f} {r['parks']:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+allowed_targets matching (warehouse/constraints.py) on a large warehouse.
+
+World: synthetic, 10k slots (5000 shelves, 5000 bins). Two tables of 1k
+rules each:
+    flat          1000 exact Bin.k.slot keys, each with a few SKU globs
+                  (what the validators supported before)
+    hierarchical  zone "Bin.d*" -> aisle "Bin.de*" -> slot "Bin.k.slot"
+                  keys; the most specific rule applies
+
+1. Lookup cost per arm.place check over random (slot, object) pairs: the
+   old per-call fnmatch scan (flat table), a naive most-specific scan over
+   all keys (hierarchical), and place_allowed, cold and warm. Answers are
+   checked against the naive reference.
+2. validate() of a 5000-task transfer plan with and without each table.
+
+Usage:
+    python benchmarks/bench_constraints.py [--stage S4] [--lookups 20000]
+"""
+import argparse
+import fnmatch
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import make_synthetic_world, make_transfer_plan
+from warehouse.constraints import _literal_prefix, compile_targets, place_allowed
+
+N_SLOTS = 10000
+N_RULES = 1000
+
+
+def flat_table(rng, n_shelves):
+    ks = rng.sample(range(n_shelves), N_RULES)
+    return {f"Bin.{k}.slot": [f"box{k}", f"box{k}?", f"box{k % 100}*", "crate*"] for k in ks}
+
+
+def hierarchical_table(rng, n_shelves):
+    table = {f"Bin.{d}*": [f"box{d}*"] for d in range(1, 10)}
+    table.update({f"Bin.{d}{e}*": [f"box{d}{e}*", "crate*"] for d in range(1, 10) for e in range(10)})
+    for k in rng.sample(range(n_shelves), N_RULES - len(table)):
+        table[f"Bin.{k}.slot"] = [f"box{k}", "crate*"]
+    return table
+
+
+def old_allowed(table, slot, obj):
+    """The validators' previous check: exact slot key, fnmatch over its patterns."""
+    patterns = table.get(slot)
+    return not patterns or any(fnmatch.fnmatch(obj, p) for p in patterns)
+
+
+def naive_allowed(table, slot, obj):
+    """Reference semantics: exact key, else the matching key with the longest literal prefix (then length)."""
+    patterns = table.get(slot)
+    if patterns is None:
+        keys = [k for k in table if k != slot and fnmatch.fnmatchcase(slot, k)]
+        if not keys:
+            return True
+        patterns = table[max(keys, key=lambda k: (len(_literal_prefix(k)), len(k)))]
+    return any(fnmatch.fnmatchcase(obj, p) for p in patterns)
+
+
+def per_call(fn, table, pairs):
+    t0 = time.perf_counter()
+    for slot, obj in pairs:
+        fn(table, slot, obj)
+    return (time.perf_counter() - t0) / len(pairs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S2", "S3", "S4"], default="S4")
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    sys.path.append(os.path.join(BASE_DIR, args.stage))
+    from validation import validator
+    from env.actions_spec import ACTIONS
+
+    world = make_synthetic_world(8, N_SLOTS)
+    n_shelves = N_SLOTS // 2
+    tables = {"flat": flat_table(rng, n_shelves), "hierarchical": hierarchical_table(rng, n_shelves)}
+    slots = [f"Bin.{k}.slot" for k in range(n_shelves)]
+    objects = [f"box{k}" for k in range(n_shelves)] + [f"crate{k}" for k in range(50)]
+    pairs = [(rng.choice(slots), rng.choice(objects)) for _ in range(args.lookups)]
+
+    # === Lookups ===
+    print(f"\n=== Lookup per place check ({N_SLOTS} slots, {N_RULES} rules, {len(pairs)} random pairs) ===\n")
+    print(f"{'table':<13} {'reference us':>13} {'compile ms':>11} {'cold us':>8} {'warm us':>8} {'allowed':>8}")
+    for name, table in tables.items():
+        reference = old_allowed if name == "flat" else naive_allowed
+        want = [reference(table, s, o) for s, o in pairs]
+        if name == "flat":
+            assert want == [naive_allowed(table, s, o) for s, o in pairs]
+        t0 = time.perf_counter()
+        targets = compile_targets(table)   # what validate() does once per plan
+        compile_ms = (time.perf_counter() - t0) * 1e3
+        cold = per_call(place_allowed, targets, pairs)
+        warm = per_call(place_allowed, targets, pairs)
+        assert [place_allowed(targets, s, o) for s, o in pairs] == want, name
+        edited = {key: list(objects) for key, objects in table.items()}
+        key = sorted(edited, key=len)[-1]  # an exact slot key of either table
+        before = compile_targets(edited)
+        edited[key].clear()                # edited in place: must not be answered from the old compilation
+        assert compile_targets(edited) is not before and not place_allowed(edited, key, "crate0"), name
+        ref_us = per_call(reference, table, pairs[:2000] if name == "hierarchical" else pairs)
+        print(f"{name:<13} {ref_us:>13.2f} {compile_ms:>11.2f} {cold:>8.2f} {warm:>8.3f} "
+              f"{sum(want) / len(want):>8.2f}")
+
+    # === validate() ===
+    plan, goal = make_transfer_plan(world, n_shelves)
+    print(f"\n=== validate() of a {n_shelves}-task transfer plan ({len(plan['steps'])} steps, {args.stage}) ===\n")
+    print(f"{'constraints':<13} {'first ms':>9} {'repeat ms':>10} {'logic_ok':>9}")
+    for name, table in (("none", None),) + tuple(tables.items()):
+        constraints = {"allowed_targets": table} if table else {}
+        times = []
+        for _ in range(3):
+            t0 = time.perf_counter()
+            r = validator.validate(world, plan, ACTIONS, constraints, goal)
+            times.append((time.perf_counter() - t0) * 1e3)
+        print(f"{name:<13} {times[0]:>9.1f} {min(times[1:]):>10.1f} {str(r['logic_ok']):>9}")
+
+
+if __name__ == "__main__":
+    main()
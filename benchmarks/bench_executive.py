@@ -0,0 +1,82 @@
+"""
+Asyncio executive (warehouse/executive.py).
+
+1. Stage gold plans (S1-S4), run ordered (conflicting steps in plan
+   order) and first come, first served: realized makespan against
+   simulate(), contention waits and throughput.
+2. Hundreds of robots in one process on synthetic worlds:
+   transfer   independent tasks, one robot each
+   station    every box passes a capacity-1 station, four robots per
+              station. As a total order the plan is invalid (a round
+              places four boxes into one station before any is picked
+              up): run ordered it deadlocks, run first come, first served
+              the robots queue at the stations and finish.
+
+Usage:
+    python benchmarks/bench_executive.py [--robots 64 256 512]
+"""
+import argparse
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import add_stations, make_station_plan, make_synthetic_world, make_transfer_plan
+from warehouse.executive import execute
+from warehouse.simulation import simulate
+from warehouse.stages import STAGES, load_stage
+
+TASKS_PER_ROBOT = 4
+ROBOTS_PER_STATION = 4
+
+
+def row(name, mode, r, sim_makespan=None):
+    n = len(r["waits"]) or 1
+    sim = f"{sim_makespan:.2f}" if sim_makespan is not None else "-"
+    verdict = "ok" if r["goal_ok"] else (r["failure"].code if r["failure"] else "goal")
+    print(f"{name:<16} {mode:<8} {verdict:<9} {r['makespan']:>9.2f} {sim:>9} {sum(r['waits'].values()) / n:>8.2f} "
+          f"{sum(r['blocked'].values()):>8} {r['throughput']['goals_per_min']:>9.1f} {r['wall'] * 1e3:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--robots", type=int, nargs="+", default=[64, 256, 512])
+    args = parser.parse_args()
+    header = (f"{'plan':<16} {'mode':<8} {'verdict':<9} {'makespan':>9} {'simulate':>9} {'wait/rb':>8} "
+              f"{'blocked':>8} {'goals/min':>9} {'wall ms':>9}")
+
+    # === Stage gold plans ===
+    print("\n=== Stage gold plans (first case) ===\n")
+    print(header)
+    for stage in STAGES:
+        s = load_stage(stage)
+        with open(os.path.join(BASE_DIR, stage, "dataset", "gold", f"{stage.lower()}_case001.json"), "r",
+                  encoding="utf-8") as f:
+            gold = json.load(f)
+        goal = {obj: slot for slot, obj in gold["goal"].items()}
+        sim = simulate(s.validator, s.world, gold, s.ACTIONS)["makespan"]
+        for ordered in (True, False):
+            row(stage, "ordered" if ordered else "fcfs",
+                execute(s.validator, s.world, gold, s.ACTIONS, goal=goal, ordered=ordered), sim)
+
+    # === Many robots ===
+    print(f"\n=== Synthetic plans, {TASKS_PER_ROBOT} tasks per robot (S4 validator) ===\n")
+    print(header)
+    s = load_stage("S4")
+    for robots in args.robots:
+        tasks = TASKS_PER_ROBOT * robots
+        world = make_synthetic_world(robots, 2 * tasks)
+        plan, goal = make_transfer_plan(world, tasks)
+        row(f"transfer {robots}", "ordered", execute(s.validator, world, plan, s.ACTIONS, goal=goal),
+            simulate(s.validator, world, plan, s.ACTIONS)["makespan"])
+        world = add_stations(make_synthetic_world(robots, 2 * tasks), robots // ROBOTS_PER_STATION)
+        plan, goal = make_station_plan(world, tasks)
+        for ordered in (True, False):
+            row(f"station {robots}", "ordered" if ordered else "fcfs",
+                execute(s.validator, world, plan, s.ACTIONS, goal=goal, ordered=ordered))
+
+
+if __name__ == "__main__":
+    main()
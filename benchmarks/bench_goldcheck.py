@@ -0,0 +1,99 @@
+"""
+Gold-plan verification (warehouse/goldcheck.py) on large generated datasets.
+
+Writes N gold files per stage (the stage's 100 golds repeated under new
+task ids), then times verify_golds:
+
+    serial    no cache, one process
+    pool      no cache, a process pool (--workers, default CPU count)
+    rebuild   cache present, nothing changed
+    1% edit   cache present, 1% of the files rewritten (a different but
+              valid plan: the gold of another case of the same stage)
+
+and checks that a broken gold (a step dropped) is reported with its
+Failure fields even when all other verdicts come from the cache.
+
+Usage:
+    python benchmarks/bench_goldcheck.py [--files 10000] [--workers N] [--out /tmp/goldcheck]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.goldcheck import GoldCheckError, verify_golds
+from warehouse.stages import STAGES
+
+
+def write_golds(stage, gold_dir, n_files):
+    src = os.path.join(BASE_DIR, stage, "dataset", "gold")
+    golds = [json.load(open(os.path.join(src, f), encoding="utf-8")) for f in sorted(os.listdir(src))]
+    os.makedirs(gold_dir)
+    for k in range(n_files):
+        gold = dict(golds[k % len(golds)], task_id=f"{stage.lower()}_gen{k:06d}")
+        with open(os.path.join(gold_dir, f"{gold['task_id']}.json"), "w", encoding="utf-8") as f:
+            json.dump(gold, f, indent=2)
+    return golds
+
+
+def timed(**kwargs):
+    t0 = time.perf_counter()
+    report = verify_golds(**kwargs)
+    return report, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="/tmp/goldcheck")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"\n{'stage':<5} {'files':>6} | {'serial s':>9} {'pool s':>7} {'x':>5} | {'rebuild s':>10} "
+          f"{'1% edit s':>10} {'verified':>9} | {'broken':>7}")
+    for stage in STAGES:
+        root = os.path.join(args.out, stage)
+        shutil.rmtree(root, ignore_errors=True)
+        gold_dir = os.path.join(root, "gold")
+        golds = write_golds(stage, gold_dir, args.files)
+        cache = os.path.join(root, "gold_check.json")
+        common = {"stage": stage, "gold_dir": gold_dir, "cache_path": cache}
+
+        _, serial = timed(**common, workers=1, use_cache=False)
+        _, pool = timed(**common, workers=args.workers, use_cache=False)
+        verify_golds(**common, workers=args.workers)                     # fills the cache
+        report, rebuild = timed(**common, workers=args.workers)
+        assert report["verified"] == 0 and report["cached"] == args.files
+
+        names = sorted(os.listdir(gold_dir))
+        for fname in rng.sample(names, args.files // 100):
+            k = int(fname[-11:-5])
+            gold = dict(golds[(k + 1) % len(golds)], task_id=fname[:-5])
+            if gold == dict(golds[k % len(golds)], task_id=fname[:-5]):
+                gold["description"] = gold.get("description", "") + " (edited)"
+            with open(os.path.join(gold_dir, fname), "w", encoding="utf-8") as f:
+                json.dump(gold, f, indent=2)
+        report, edit = timed(**common, workers=args.workers)
+
+        broken = dict(golds[0], task_id=names[0][:-5])
+        broken["steps"] = broken["steps"][:1] + broken["steps"][2:]
+        with open(os.path.join(gold_dir, names[0]), "w", encoding="utf-8") as f:
+            json.dump(broken, f, indent=2)
+        try:
+            verify_golds(**common, workers=args.workers)
+            caught = "MISSED"
+        except GoldCheckError as e:
+            caught = e.errors[0]["code"] if [x["file"] for x in e.errors] == [names[0]] else "WRONG"
+        print(f"{stage:<5} {args.files:>6} | {serial:>9.2f} {pool:>7.2f} {serial / pool:>4.1f}x | {rebuild:>10.2f} "
+              f"{edit:>10.2f} {report['verified']:>9} | {caught}")
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
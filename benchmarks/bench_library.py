@@ -0,0 +1,92 @@
+"""
+Validated-plan library (warehouse/library.py) on the stage datasets.
+
+Each stage's 100 cases are served in order, as the generation scripts do
+with --library: a case is looked up by (world, goal, requirements read
+off its gold); on a miss the gold stands in for the LLM's answer and is
+stored. Reports the distinct task signatures, hits and misses, and the
+time per lookup against a validate() call. Every plan served is checked
+with the validator.
+
+Renaming: the same S3/S4 worlds with the boxes renamed (a fresh name per
+case) must hit the plans stored under the original names, with the steps
+renamed back.
+
+Usage:
+    python benchmarks/bench_library.py
+"""
+import copy
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.library import PlanLibrary, requirements_of, task_signature
+from warehouse.stages import STAGES, load_stage
+
+
+def load_cases(stage):
+    gold_dir = os.path.join(BASE_DIR, stage, "dataset", "gold")
+    cases = []
+    for fname in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        cases.append((gold, {obj: slot for slot, obj in gold["goal"].items()}, requirements_of(gold)))
+    return cases
+
+
+def renamed(world, gold, goal, requirements, k):
+    """World, gold, goal and requirements with every box renamed to <name>_v<k>."""
+    names = {obj: f"{obj}_v{k}" for obj in world["objects"]}
+    world = copy.deepcopy(world)
+    world["objects"] = {names[o]: v for o, v in world["objects"].items()}
+    occ = world["state"]["occupancy"]
+    for slot, obj in occ.items():
+        occ[slot] = names.get(obj, obj)
+    steps = [{**s, "object": names[s["object"]]} if "object" in s else s for s in gold["steps"]]
+    req = None if requirements is None else {"via": {names[o]: v for o, v in requirements["via"].items()},
+                                             "order": [names[o] for o in requirements["order"]]}
+    return world, steps, {names[o]: slot for o, slot in goal.items()}, req
+
+
+def main():
+    print(f"\n{'stage':<5} {'cases':>6} {'tasks':>6} {'hits':>5} {'misses':>7} {'hit rate':>9} "
+          f"{'lookup us':>10} {'validate us':>12} {'renamed hits':>13}")
+    for stage in STAGES:
+        s = load_stage(stage)
+        cases = load_cases(stage)
+        library = PlanLibrary()
+        signatures = set()
+        lookup_s = validate_s = 0.0
+        for gold, goal, req in cases:
+            signatures.add(task_signature(stage, s.world, goal, requirements=req)[0])
+            t0 = time.perf_counter()
+            steps = library.lookup(stage, s.world, goal, requirements=req)
+            lookup_s += time.perf_counter() - t0
+            if steps is None:
+                library.store(stage, s.world, goal, gold, s.validator, s.ACTIONS, requirements=req)
+                steps = gold["steps"]
+            t0 = time.perf_counter()
+            r = s.validate({"steps": steps}, goal=goal)
+            validate_s += time.perf_counter() - t0
+            assert r["goal_ok"] and requirements_of({"steps": steps}) == req, (stage, r["failure"])
+        stats = library.stats()
+
+        renamed_hits = 0
+        for k, (gold, goal, req) in enumerate(cases):
+            world, steps, goal2, req2 = renamed(s.world, gold, goal, req, k)
+            served = library.lookup(stage, world, goal2, requirements=req2)
+            if served is not None:
+                r = s.validator.validate(world, {"steps": served}, s.ACTIONS, {}, goal2)
+                assert r["goal_ok"], r["failure"]
+                renamed_hits += 1
+        n = len(cases)
+        print(f"{stage:<5} {n:>6} {len(signatures):>6} {stats['hits']:>5} {stats['misses']:>7} "
+              f"{stats['hit_rate']:>9.2f} {lookup_s / n * 1e6:>10.1f} {validate_s / n * 1e6:>12.1f} "
+              f"{renamed_hits:>10}/{n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Makespan-optimal reference plans (warehouse/makespan.py).
+
+1. Stage tasks (S2-S4): simulated makespan of the hand-written gold, of
+   the shortest plan (warehouse.planner) and of plan_makespan, both for
+   the bare goal and along the gold's relay route through Inspection.slot.
+2. Synthetic station tasks: boxes relayed through capacity-1 stations by
+   up to 16 robots; the round-robin plan of synthetic_world against the
+   best plan found in the budget, with its proven lower bound.
+
+Every plan_makespan result is checked with validate() and re-timed with
+simulate(), which must give the same makespan.
+
+Usage:
+    python benchmarks/bench_makespan.py [--budget 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import add_stations, make_station_plan, make_synthetic_world
+from warehouse.makespan import plan_makespan, routes_of
+from warehouse.simulation import simulate
+from warehouse.stages import load_stage
+
+SYNTHETIC = [(2, 8, 4), (4, 8, 2), (3, 10, 5), (8, 8, 2), (8, 16, 4), (8, 16, 8), (12, 24, 6), (16, 32, 8)]   # robots, boxes, stations
+
+
+def checked(validator, world, actions, goal, result):
+    """plan_makespan result, after checking it validates and simulates to the same makespan."""
+    plan = {"steps": result["steps"]}
+    v = validator.validate(world, plan, actions, {}, goal)
+    assert v["logic_ok"] and v["goal_ok"], v["failure"]
+    sim = simulate(validator, world, plan, actions)
+    assert abs(sim["makespan"] - result["makespan"]) < 1e-6, (sim["makespan"], result["makespan"])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=5.0, help="seconds per task")
+    args = parser.parse_args()
+
+    # === Stage tasks ===
+    print("\n=== Stage tasks: simulated makespan (s) ===\n")
+    print(f"{'stage':<5} {'gold':>6} {'shortest':>9} {'optimal':>8} {'relay gold':>11} {'relay opt':>10} {'proven':>7} {'ms':>6}")
+    for stage in ("S2", "S3", "S4"):
+        s = load_stage(stage)
+        with open(os.path.join(BASE_DIR, stage, "dataset", "gold", f"{stage.lower()}_case001.json"), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        goal = {o: slot for slot, o in gold["goal"].items()}
+        gold_ms = simulate(s.validator, s.world, {"steps": gold["steps"]}, s.ACTIONS)["makespan"]
+        shortest = simulate(s.validator, s.world, {"steps": s.find_plan(goal)["steps"]}, s.ACTIONS)["makespan"]
+        direct = checked(s.validator, s.world, s.ACTIONS, goal,
+                         plan_makespan(s.validator, s.world, goal, s.ACTIONS, budget=args.budget))
+        t0 = time.perf_counter()
+        relay = checked(s.validator, s.world, s.ACTIONS, goal,
+                        plan_makespan(s.validator, s.world, goal, s.ACTIONS, via=routes_of(gold), waits=True,
+                                      budget=args.budget))
+        ms = (time.perf_counter() - t0) * 1e3
+        relay_gold = gold_ms if routes_of(gold) else float("nan")
+        print(f"{stage:<5} {gold_ms:>6.2f} {shortest:>9.2f} {direct['makespan']:>8.2f} {relay_gold:>11.2f} "
+              f"{relay['makespan']:>10.2f} {str(direct['optimal'] and relay['optimal']):>7} {ms:>6.1f}")
+
+    # === Synthetic station tasks ===
+    print(f"\n=== Synthetic station relays (budget {args.budget:.0f} s) ===\n")
+    print(f"{'robots':>6} {'boxes':>6} {'stations':>8} {'round-robin':>12} {'best':>6} {'lower bound':>12} "
+          f"{'proven':>7} {'nodes':>7} {'s':>6}")
+    for robots, boxes, stations in SYNTHETIC:
+        s = load_stage("S4")
+        world = add_stations(make_synthetic_world(robots, 2 * boxes), stations)
+        plan, goal = make_station_plan(world, boxes)
+        base = simulate(s.validator, world, plan, s.ACTIONS)
+        t0 = time.perf_counter()
+        r = checked(s.validator, world, s.ACTIONS, goal,
+                    plan_makespan(s.validator, world, goal, s.ACTIONS, via=routes_of(plan), waits=True,
+                                  budget=args.budget))
+        secs = time.perf_counter() - t0
+        base_ms = f"{base['makespan']:.1f}" if base["logic_ok"] else "invalid"
+        print(f"{robots:>6} {boxes:>6} {stations:>8} {base_ms:>12} {r['makespan']:>6.1f} {r['lower_bound']:>12.1f} "
+              f"{str(r['optimal']):>7} {r['expanded']:>7} {secs:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Packed dataset container (warehouse/packed.py) against the directory layout.
+
+Builds a synthetic stage dataset of N cases: prompts/*.txt, gold/*.json
+and llm_outputs/<model>/*.json for three models (5 files per case, the
+contents of the S3 cases repeated), packs it, and times the access pattern
+of eval_combined_batch.py, which lists each model directory and reads the
+LLM output and gold file of every case:
+
+    files   os.listdir + os.path.exists + open/read per file
+    pack    PackReader open + listdir + `in` + get per key (mmap)
+
+once for raw bytes and once with json.loads, plus random single-key reads.
+The pack is checked to hold exactly the files of the tree, and unpacking
+it must reproduce them byte for byte. Pages stay in the OS cache between
+runs, so this measures metadata and syscall overhead, not disk reads.
+
+Usage:
+    python benchmarks/bench_packed.py [--cases 1000 10000] [--out /tmp/packed]
+"""
+import argparse
+import filecmp
+import json
+import os
+import random
+import shutil
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.packed import PackReader, pack_dir, unpack_dir
+
+MODELS = ["small", "middle", "large"]
+
+
+def build_tree(root, n_cases):
+    src = os.path.join(BASE_DIR, "S3", "dataset")
+    golds = sorted(os.listdir(os.path.join(src, "gold")))
+    for sub in ["prompts", "gold"] + [os.path.join("llm_outputs", m) for m in MODELS]:
+        os.makedirs(os.path.join(root, sub), exist_ok=True)
+    for k in range(n_cases):
+        name = golds[k % len(golds)][:-len(".json")]
+        case = f"case{k:06d}"
+        with open(os.path.join(src, "prompts", name + ".txt"), "rb") as f:
+            prompt = f.read()
+        with open(os.path.join(src, "gold", name + ".json"), "rb") as f:
+            gold = f.read()
+        with open(os.path.join(root, "prompts", case + ".txt"), "wb") as f:
+            f.write(prompt)
+        for sub in ["gold"] + [os.path.join("llm_outputs", m) for m in MODELS]:
+            with open(os.path.join(root, sub, case + ".json"), "wb") as f:
+                f.write(gold)
+
+
+def read_files(root, parse):
+    n = 0
+    for model in MODELS:
+        model_dir = os.path.join(root, "llm_outputs", model)
+        for fname in os.listdir(model_dir):
+            gold_path = os.path.join(root, "gold", fname)
+            if not os.path.exists(gold_path):
+                continue
+            for path in (gold_path, os.path.join(model_dir, fname)):
+                with open(path, "rb") as f:
+                    data = f.read()
+                if parse:
+                    json.loads(data)
+                n += 1
+    return n
+
+
+def read_pack(path, parse):
+    n = 0
+    with PackReader(path) as pack:
+        for model in MODELS:
+            for fname in pack.listdir(f"llm_outputs/{model}"):
+                gold_key = f"gold/{fname}"
+                if gold_key not in pack:
+                    continue
+                for key in (gold_key, f"llm_outputs/{model}/{fname}"):
+                    data = pack[key]
+                    if parse:
+                        json.loads(data)
+                    n += 1
+    return n
+
+
+def timed(fn, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        secs = time.perf_counter() - t0
+        best = secs if best is None else min(best, secs)
+    return out, best
+
+
+def same_tree(a, b):
+    cmp = filecmp.dircmp(a, b)
+    if cmp.left_only or cmp.right_only or cmp.funny_files:
+        return False
+    _, mismatch, errors = filecmp.cmpfiles(a, b, cmp.common_files, shallow=False)
+    return not mismatch and not errors and all(same_tree(os.path.join(a, d), os.path.join(b, d)) for d in cmp.common_dirs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--out", default="/tmp/packed")
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"\n{'cases':>7} {'files':>7} {'pack s':>7} {'MB':>6} | {'files raw':>10} {'pack raw':>9} {'x':>6} | "
+          f"{'files json':>11} {'pack json':>10} {'x':>6} | {'file us':>8} {'pack us':>8} {'roundtrip':>10}")
+    for n_cases in args.cases:
+        root = os.path.join(args.out, f"tree{n_cases}")
+        shutil.rmtree(args.out, ignore_errors=True)
+        build_tree(root, n_cases)
+        path = os.path.join(args.out, f"dataset{n_cases}.pack")
+        t0 = time.perf_counter()
+        n_files = pack_dir(root, path)
+        pack_secs = time.perf_counter() - t0
+
+        n_a, files_raw = timed(read_files, root, False)
+        n_b, pack_raw = timed(read_pack, path, False)
+        _, files_json = timed(read_files, root, True)
+        _, pack_json = timed(read_pack, path, True)
+        assert n_a == n_b == 2 * len(MODELS) * n_cases
+
+        rng = random.Random(0)
+        with PackReader(path) as pack:
+            keys = pack.keys()
+            assert len(keys) == n_files == 5 * n_cases
+            sample = [rng.choice(keys) for _ in range(args.lookups)]
+
+            def one_by_one_files():
+                for key in sample:
+                    with open(os.path.join(root, *key.split("/")), "rb") as f:
+                        f.read()
+
+            def one_by_one_pack():
+                for key in sample:
+                    pack[key]
+
+            _, file_lookup = timed(one_by_one_files)
+            _, pack_lookup = timed(one_by_one_pack)
+
+        unpacked = os.path.join(args.out, "unpacked")
+        unpack_dir(path, unpacked)
+        ok = same_tree(root, unpacked)
+        mb = (os.path.getsize(path) + os.path.getsize(path + ".idx")) / 1e6
+        print(f"{n_cases:>7} {n_files:>7} {pack_secs:>7.2f} {mb:>6.1f} | {files_raw:>9.3f}s {pack_raw:>8.3f}s "
+              f"{files_raw / pack_raw:>5.1f}x | {files_json:>10.3f}s {pack_json:>9.3f}s {files_json / pack_json:>5.1f}x | "
+              f"{file_lookup / len(sample) * 1e6:>8.1f} {pack_lookup / len(sample) * 1e6:>8.1f} "
+              f"{'OK' if ok else 'MISMATCH':>10}")
+    shutil.rmtree(args.out, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Peephole optimizer (warehouse.peephole) on padded gold plans.
+
+Every gold plan gets k redundancies of the kinds seen in generated plans
+(a goto repeated in place, a detour goto before a goto, a repeated
+wait_until_free, a pick put straight back before the real pick) for
+k = 0..MAX_PADDING. The optimized plan must keep the original verdict; it
+should drop every padding step, plus whatever the gold itself wastes (S1
+golds drive to Worktable.dock twice). Reports per stage and k the steps
+and simulated makespan saved, the rewrites per rule and the time per plan.
+
+Usage:
+    python benchmarks/bench_peephole.py [--stages S1 S2 S3 S4] [--seed 0]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.peephole import RULES, optimize_plan
+from warehouse.simulation import simulate
+from warehouse.stages import load_stage
+
+MAX_PADDING = 3
+
+
+def pad(steps, k, poses, rng):
+    """`steps` with k redundant steps or step pairs inserted; returns (steps, steps added)."""
+    steps, added = list(steps), 0
+    for _ in range(k):
+        kinds = [i for i, s in enumerate(steps) if s["action"] in ("base.goto", "wait_until_free", "arm.pick")]
+        i = rng.choice(kinds)
+        step = steps[i]
+        tag = {"agent": step["agent"]} if "agent" in step else {}
+        if step["action"] == "arm.pick":
+            pair = [dict(step), {**tag, "action": "arm.place", "object": step["object"], "to": step["from"]}]
+            steps[i:i] = pair
+            added += 2
+        elif step["action"] == "base.goto" and rng.random() < 0.5:
+            steps.insert(i, {**tag, "action": "base.goto", "target": rng.choice(poses)})
+            added += 1
+        else:
+            steps.insert(i + 1, dict(step))
+            added += 1
+    return steps, added
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stages", nargs="+", default=["S1", "S2", "S3", "S4"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"\n{'stage':<5} {'k':>2} {'plans':>6} {'steps':>6} {'added':>6} {'removed':>8} {'saved s':>8} "
+          f"{'verdict':>8} {'ms':>6}  rewrites")
+    for stage in args.stages:
+        s = load_stage(stage)
+        gold_dir = os.path.join(BASE_DIR, stage, "dataset", "gold")
+        golds = []
+        for fname in sorted(os.listdir(gold_dir)):
+            with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+                golds.append(json.load(f))
+        poses = sorted(s.world["poses"])
+        for k in range(MAX_PADDING + 1):
+            n_steps = n_added = n_removed = saved = secs = 0
+            kept = True
+            rules = dict.fromkeys(RULES, 0)
+            for gold in golds:
+                goal = {obj: slot for slot, obj in gold["goal"].items()}
+                steps, added = pad(gold["steps"], k, poses, rng)
+                plan = {"steps": steps}
+                t0 = time.perf_counter()
+                opt = optimize_plan(s.validator, s.world, plan, s.ACTIONS, {}, goal)
+                secs += time.perf_counter() - t0
+                after = s.validator.validate(s.world, {"steps": opt["steps"]}, s.ACTIONS, {}, goal)
+                kept &= (after["logic_ok"], after["goal_ok"]) == opt["verdict"]
+                saved += (simulate(s.validator, s.world, plan, s.ACTIONS)["makespan"]
+                          - simulate(s.validator, s.world, {"steps": opt["steps"]}, s.ACTIONS)["makespan"])
+                n_steps += len(steps)
+                n_added += added
+                n_removed += opt["before"] - opt["after"]
+                for rule, n in opt["removed"].items():
+                    rules[rule] += n
+            n = len(golds)
+            print(f"{stage:<5} {k:>2} {n:>6} {n_steps / n:>6.2f} {n_added / n:>6.2f} {n_removed / n:>8.2f} "
+                  f"{saved / n:>8.2f} {str(kept):>8} {secs / n * 1e3:>6.2f}  "
+                  + ", ".join(f"{r}={c}" for r, c in rules.items() if c))
+
+
+if __name__ == "__main__":
+    main()
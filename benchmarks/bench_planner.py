@@ -0,0 +1,118 @@
+"""
+Gold plan synthesis with the forward-search planner (warehouse/planner.py).
+
+1. Stage tasks: the goal of each stage's gold plans, planned with every
+   heuristic; plan length against the hand-written gold, time and
+   expansions. S1 is also planned via its Worktable.slot landmark. Every
+   plan is checked with the stage's validate().
+2. Generated tasks: random "move these boxes to these bins" goals in
+   synthetic worlds (benchmarks/synthetic_world.py) with the stage's
+   validator; plans/s with h_FF, and how often its plan is as short as
+   the shortest (A* with LM-cut) on a sample.
+
+Usage:
+    python benchmarks/bench_planner.py [--tasks 1000] [--budget 10]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import make_synthetic_world
+from warehouse.grounding import ground_steps
+from warehouse.planner import HEURISTICS, find_plan
+from warehouse.stages import STAGES, load_stage
+
+WORLDS = [(1, 8), (2, 8), (2, 12), (3, 12)]   # (robots, slots) of the generated tasks
+SAMPLE = 30                                   # generated tasks also planned with LM-cut
+
+
+def gold_tasks(stage):
+    """(goal, gold step count) of each distinct goal among the stage's gold plans."""
+    gold_dir = os.path.join(BASE_DIR, stage, "dataset", "gold")
+    tasks = {}
+    for fname in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        goal = {o: s for s, o in gold["goal"].items()}
+        tasks.setdefault(json.dumps(goal, sort_keys=True), (goal, len(gold["steps"])))
+    return list(tasks.values())
+
+
+def random_goal(world, rng):
+    """Move 1-3 random boxes, each into a different random bin."""
+    boxes = rng.sample(sorted(world["objects"]), rng.randint(1, min(3, len(world["objects"]))))
+    bins = rng.sample([s for s in world["slots"] if s.startswith("Bin.")], len(boxes))
+    return dict(zip(boxes, bins))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1000, help="generated tasks")
+    parser.add_argument("--budget", type=float, default=10.0, help="seconds per plan")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    # === Stage tasks ===
+    print("\n=== Stage gold tasks ===\n")
+    print(f"{'stage':<5} {'heuristic':<9} {'via':<4} {'gold':>5} {'plan':>5} {'ms':>9} {'expanded':>9} {'valid':>6}")
+    for stage in STAGES:
+        s = load_stage(stage)
+        for goal, gold_len in gold_tasks(stage):
+            vias = [None, [{"redbox": "Worktable.slot"}]] if stage == "S1" else [None]
+            for via in vias:
+                for heuristic in HEURISTICS:
+                    t0 = time.perf_counter()
+                    r = s.find_plan(goal, heuristic=heuristic, via=via, budget=args.budget)
+                    ms = (time.perf_counter() - t0) * 1e3
+                    v = s.validate({"steps": r["steps"] or []}, goal=goal)
+                    print(f"{stage:<5} {heuristic:<9} {'yes' if via else 'no':<4} {gold_len:>5} "
+                          f"{str(r['length']):>5} {ms:>9.1f} {r['expanded']:>9} "
+                          f"{str(v['logic_ok'] and v['goal_ok']):>6}")
+
+    # === Generated tasks ===
+    print(f"\n=== Generated tasks ({args.tasks} per stage, synthetic worlds {WORLDS}) ===\n")
+    print(f"{'stage':<5} {'plans/s':>8} {'ms p50':>7} {'ms max':>7} {'steps':>6} {'solved':>7} "
+          f"{'valid':>6} {'shortest (sample)':>18}")
+    for stage in STAGES[1:]:
+        s = load_stage(stage)
+        worlds = []
+        for n_agents, n_slots in WORLDS:
+            world = make_synthetic_world(n_agents, n_slots)
+            worlds.append((world, ground_steps(world, s.ACTIONS, s.ACTION_SCHEMA)))
+        tasks = []
+        for _ in range(args.tasks):
+            world, candidates = rng.choice(worlds)
+            tasks.append((world, candidates, random_goal(world, rng)))
+        times, lengths, solved, valid = [], [], 0, 0
+        t_all = time.perf_counter()
+        for world, candidates, goal in tasks:
+            t0 = time.perf_counter()
+            r = find_plan(s.validator, world, s.ACTIONS, goal, candidates=candidates, budget=args.budget)
+            times.append((time.perf_counter() - t0) * 1e3)
+            if r["steps"] is not None:
+                solved += 1
+                lengths.append(r["length"])
+                v = s.validator.validate(world, {"steps": r["steps"]}, s.ACTIONS, {}, goal)
+                valid += v["logic_ok"] and v["goal_ok"]
+        elapsed = time.perf_counter() - t_all
+        shortest = compared = 0
+        for world, candidates, goal in tasks[:SAMPLE]:
+            ff = find_plan(s.validator, world, s.ACTIONS, goal, candidates=candidates, budget=args.budget)
+            opt = find_plan(s.validator, world, s.ACTIONS, goal, heuristic="lmcut",
+                            candidates=candidates, budget=args.budget)
+            if opt["steps"] is not None:   # proven shortest within the budget
+                compared += 1
+                shortest += ff["length"] == opt["length"]
+        print(f"{stage:<5} {len(tasks) / elapsed:>8.1f} {statistics.median(times):>7.1f} {max(times):>7.1f} "
+              f"{statistics.mean(lengths):>6.1f} {solved:>7} {valid:>6} {f'{shortest}/{compared}':>18}")
+
+
+if __name__ == "__main__":
+    main()
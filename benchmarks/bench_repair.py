@@ -0,0 +1,95 @@
+"""
+Repair distance (warehouse.repair) on mutated gold plans.
+
+Every gold plan gets k random edits (delete a step, insert or substitute a
+random grounded step, swap two neighbouring steps) for k = 0..MAX_EDITS.
+RD never exceeds the number of edits made (a swap counts two), and is
+often lower when an edit happens to be harmless. Reports per k the RD
+distribution, expanded nodes and time per plan, and the timeouts.
+
+Usage:
+    python benchmarks/bench_repair.py --stage S4 [--budget 1.0]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.grounding import ground_steps
+from warehouse.repair import repair_distance, BUDGET
+
+MAX_EDITS = 3
+
+
+def mutate(steps, k, candidates, rng):
+    """`steps` with k random edits; returns (steps, edit cost)."""
+    steps, cost = list(steps), 0
+    for _ in range(k):
+        op = rng.choice(["delete", "insert", "substitute", "swap"])
+        if op == "delete" and steps:
+            steps.pop(rng.randrange(len(steps)))
+        elif op == "insert" or not steps:
+            steps.insert(rng.randrange(len(steps) + 1), dict(rng.choice(candidates)[0]))
+        elif op == "substitute":
+            steps[rng.randrange(len(steps))] = dict(rng.choice(candidates)[0])
+        elif len(steps) > 1:
+            i = rng.randrange(len(steps) - 1)
+            steps[i], steps[i + 1] = steps[i + 1], steps[i]
+            cost += 1
+        cost += 1
+    return steps, cost
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S1", "S2", "S3", "S4"], required=True)
+    parser.add_argument("--budget", type=float, default=BUDGET, help="seconds per plan")
+    args = parser.parse_args()
+
+    stage_dir = os.path.join(BASE_DIR, args.stage)
+    sys.path.append(stage_dir)
+    from validation import validator
+    from env.actions_spec import ACTIONS
+    from env.make_world import make_world
+
+    world = make_world()
+    candidates = ground_steps(world, ACTIONS, validator.ACTION_SCHEMA)
+    gold_dir = os.path.join(stage_dir, "dataset", "gold")
+    cases = []
+    for fname in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        cases.append((gold["steps"], {o: s for s, o in gold["goal"].items()}))
+
+    print(f"\n=== Repair distance ({args.stage}, {len(cases)} gold plans, "
+          f"{len(candidates)} grounded steps, budget {args.budget:.1f}s) ===\n")
+    print(f"{'edits':>5} {'RD distribution':<34} {'expanded':>9} {'ms/plan':>8} {'max ms':>8} {'timeouts':>8}")
+    rng = random.Random(0)
+    for k in range(MAX_EDITS + 1):
+        dist, expanded, times, timeouts = {}, 0, [], 0
+        for steps, goal in cases:
+            changed, cost = mutate(steps, k, candidates, rng)
+            t0 = time.perf_counter()
+            r = repair_distance(validator, world, {"steps": changed}, ACTIONS, {}, goal,
+                                reference=steps, budget=args.budget, candidates=candidates)
+            times.append((time.perf_counter() - t0) * 1e3)
+            if r["timeout"]:
+                timeouts += 1
+                key = f">={r['lower_bound']}"
+            else:
+                assert r["distance"] <= cost, (r["distance"], cost)
+                assert validator.validate(world, {"steps": r["repaired"]}, ACTIONS, {}, goal)["goal_ok"]
+                key = str(r["distance"])
+            dist[key] = dist.get(key, 0) + 1
+            expanded += r["expanded"]
+        hist = " ".join(f"{d}:{c}" for d, c in sorted(dist.items()))
+        print(f"{k:>5} {hist:<34} {expanded / len(cases):>9.0f} {sum(times) / len(times):>8.1f} "
+              f"{max(times):>8.1f} {timeouts:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Shared-resource benchmark: validator throughput with hundreds of stations.
+
+Part 1 runs the S4 validator on synthetic worlds where every box passes
+through one of R capacity-limited stations (see synthetic_world.py); with
+O(1) acquire/release the steps/s should not depend on R.
+Part 2 times ResourceTable acquire/release and wait-queue operations
+directly, cycling over all resources.
+
+Usage:
+    python benchmarks/bench_resources.py
+"""
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.join(BASE_DIR, "S4"))
+from validation.validator import validate
+from env.actions_spec import ACTIONS
+from synthetic_world import make_synthetic_world, add_stations, make_station_plan
+from warehouse.resources import ResourceSpec, ResourceTable
+
+STATIONS = [10, 100, 500, 2000]
+N_AGENTS = 8
+N_SLOTS = 2000
+N_TASKS = 400       # 3200 steps per plan
+N_OPS = 200_000
+REPEATS = 3
+
+
+def best_of(fn, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_validator():
+    print(f"{'stations':>9} {'units':>6} {'steps':>6} {'steps/s':>11}  full station rejected")
+    for n_stations in STATIONS:
+        slots_per = 2
+        world = add_stations(make_synthetic_world(N_AGENTS, N_SLOTS), n_stations, slots_per, capacity=1)
+        plan, goal = make_station_plan(world, N_TASKS)
+        res = validate(world, plan, ACTIONS, {}, goal, debug=True)
+        assert res["goal_ok"], res
+
+        # Station.0 holds box0 after the first round's placements; its second
+        # slot is empty, but the capacity-1 resource must refuse it.
+        steps = plan["steps"]
+        probe = {"agent": "robot1", "action": "wait_until_free", "target": "Station.0.1.slot"}
+        rejected = not validate(world, {"steps": steps[:N_AGENTS * 5] + [probe]}, ACTIONS, {})["logic_ok"]
+
+        t = best_of(lambda: validate(world, plan, ACTIONS, {}, goal))
+        print(f"{n_stations:>9} {n_stations * slots_per:>6} {len(steps):>6} {len(steps) / t:>11,.0f}  {rejected}")
+
+
+def bench_table(n_resources):
+    slots = {f"R.{r}.{i}.slot": None for r in range(n_resources) for i in range(3)}
+    world = {"slots": slots, "resources": {
+        f"R.{r}": {"slots": [f"R.{r}.{i}.slot" for i in range(3)], "capacity": 2} for r in range(n_resources)}}
+    table = ResourceTable(ResourceSpec(world))
+    rng = random.Random(0)
+    order = [rng.randrange(n_resources) for _ in range(N_OPS)]
+
+    def acquire_release():
+        for rid in order:
+            if not table.acquire(rid):
+                table.release(rid)
+
+    def queues():
+        for n, rid in enumerate(order):
+            table.enqueue(rid, n)
+        for rid in order:
+            table.dequeue(rid)
+
+    t_ar = best_of(acquire_release)
+    t_q = best_of(queues)
+    print(f"{n_resources:>9} {N_OPS / t_ar:>16,.0f} {2 * N_OPS / t_q:>16,.0f}")
+
+
+def main():
+    print(f"\n=== Validator with shared stations (S4, {N_AGENTS} agents, capacity 1 of 2 slots) ===\n")
+    bench_validator()
+    print(f"\n=== ResourceTable operations ({N_OPS} random ops) ===\n")
+    print(f"{'resources':>9} {'acquire|rel/s':>16} {'enq+deq/s':>16}")
+    for n in (100, 1000, 10000):
+        bench_table(n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Parametric scenario generation (warehouse/scenarios.py) at scale.
+
+Streams N validator-checked tasks to sharded JSONL for growing N and
+reports tasks/s, bytes per task and the process's peak RSS after each
+run: with streaming the peak does not grow with N. Then reads the
+largest run back with read_shards and re-validates a sample of the gold
+plans from the JSON alone.
+
+Usage:
+    python benchmarks/bench_scenarios.py [--tasks 1000 10000 100000] [--out /tmp/scenarios] [--gzip]
+"""
+import argparse
+import os
+import resource
+import shutil
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.scenarios import generate_tasks, read_shards, world_of, write_shards
+from warehouse.stages import load_stage
+
+PARAMS = {"robots": (2, 16), "objects": (2, 24), "shelves": (1, 6), "stations": (1, 4),
+          "relay_depth": (0, 2), "categories": (1, 4)}
+SAMPLE = 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--out", default="/tmp/scenarios")
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+    s = load_stage("S4")
+
+    # === Generation ===
+    print(f"\n=== Streaming generation (S4 validator, zone bin rules, {PARAMS}) ===\n")
+    print(f"{'tasks':>8} {'shards':>7} {'tasks/s':>8} {'bytes/task':>11} {'peak RSS MB':>12}")
+    for n in args.tasks:
+        out = os.path.join(args.out, str(n))
+        shutil.rmtree(out, ignore_errors=True)
+        t0 = time.perf_counter()
+        manifest = write_shards(generate_tasks(n, bin_rules="zone", **PARAMS), out, compress=args.gzip)
+        secs = time.perf_counter() - t0
+        size = sum(os.path.getsize(os.path.join(out, sh["file"])) for sh in manifest["shards"])
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{n:>8} {len(manifest['shards']):>7} {n / secs:>8.0f} {size / n:>11.0f} {peak:>12.1f}")
+
+    # === Read back ===
+    out = os.path.join(args.out, str(args.tasks[-1]))
+    t0 = time.perf_counter()
+    count, checked, steps, objects = 0, 0, 0, 0
+    for record in read_shards(out):
+        count += 1
+        steps += len(record["steps"])
+        objects += len(record["goal"])
+        if count % max(1, args.tasks[-1] // SAMPLE) == 0:
+            goal = {obj: slot for slot, obj in record["goal"].items()}
+            r = s.validator.validate(world_of(record), {"steps": record["steps"]}, s.ACTIONS,
+                                     record["constraints"], goal)
+            assert r["goal_ok"], (record["task_id"], r["failure"])
+            checked += 1
+    secs = time.perf_counter() - t0
+    print(f"\nread back {count} tasks in {secs:.1f}s ({count / secs:.0f} tasks/s); {objects / count:.1f} boxes "
+          f"and {steps / count:.1f} gold steps per task; {checked} re-validated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Plan-to-schedule compilation (warehouse/schedule.py).
+
+1. Stage gold plans (S1-S4): steps against DAG depth, makespan against
+   running the steps one at a time, barriers per plan.
+2. Synthetic plans with many robots: transfer plans (independent tasks)
+   and station relays (every box passes a capacity-1 station; with one
+   station more than robots, each round hands the stations on to other
+   robots), with the compile time.
+
+Every schedule is checked: its makespan equals simulate(), and executing
+the steps in timeline order (start time, then plan index) through the
+validator reaches the goal, as a dispatcher following it would.
+
+Usage:
+    python benchmarks/bench_schedule.py [--stage S4]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import add_stations, make_station_plan, make_synthetic_world, make_transfer_plan
+from warehouse.schedule import compile_schedule
+from warehouse.simulation import simulate
+from warehouse.stages import STAGES, load_stage
+
+SYNTHETIC = [("transfer", 4, 64), ("transfer", 16, 256), ("transfer", 64, 1024),
+             ("station", 4, 64), ("station", 16, 256), ("station", 64, 1024)]   # kind, robots, tasks
+
+
+def checked(validator, world, actions, plan, goal):
+    """compile_schedule of `plan`, after checking its timeline order and makespan."""
+    t0 = time.perf_counter()
+    sched = compile_schedule(validator, world, plan, actions, goal=goal)
+    secs = time.perf_counter() - t0
+    assert sched["ok"], sched["failure"]
+    entries = sorted((e["start"], e["index"], e["step"]) for t in sched["timelines"].values() for e in t)
+    r = validator.validate(world, {"steps": [step for *_, step in entries]}, actions, {}, goal)
+    assert r["logic_ok"] and r["goal_ok"], r["failure"]
+    assert abs(simulate(validator, world, plan, actions)["makespan"] - sched["makespan"]) < 1e-9
+    json.dumps(sched)
+    return sched, secs
+
+
+def row(name, sched, secs):
+    print(f"{name:<18} {sched['steps']:>6} {sched['depth']:>6} {sched['parallelism']:>6.2f} "
+          f"{sched['makespan']:>9.1f} {sched['sequential']:>11.1f} {sched['sequential'] / sched['makespan']:>7.2f} "
+          f"{len(sched['barriers']):>9} {secs * 1e3:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S2", "S3", "S4"], default="S4", help="validator for synthetic plans")
+    args = parser.parse_args()
+    header = (f"{'plan':<18} {'steps':>6} {'depth':>6} {'x':>6} {'makespan':>9} {'sequential':>11} "
+              f"{'speedup':>7} {'barriers':>9} {'ms':>9}")
+
+    # === Stage gold plans ===
+    print("\n=== Stage gold plans (first case) ===\n")
+    print(header)
+    for stage in STAGES:
+        s = load_stage(stage)
+        with open(os.path.join(BASE_DIR, stage, "dataset", "gold", f"{stage.lower()}_case001.json"), "r",
+                  encoding="utf-8") as f:
+            gold = json.load(f)
+        goal = {obj: slot for slot, obj in gold["goal"].items()}
+        row(stage, *checked(s.validator, s.world, s.ACTIONS, gold, goal))
+
+    # === Synthetic plans ===
+    print(f"\n=== Synthetic plans ({args.stage} validator) ===\n")
+    print(header)
+    s = load_stage(args.stage)
+    for kind, robots, tasks in SYNTHETIC:
+        if kind == "transfer":
+            world = make_synthetic_world(robots, 2 * tasks)
+            plan, goal = make_transfer_plan(world, tasks)
+        else:
+            world = add_stations(make_synthetic_world(robots, 2 * tasks), robots + 1)
+            plan, goal = make_station_plan(world, tasks)
+        row(f"{kind} {robots}x{tasks}", *checked(s.validator, world, s.ACTIONS, plan, goal))
+
+
+if __name__ == "__main__":
+    main()
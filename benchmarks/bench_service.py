@@ -0,0 +1,141 @@
+"""
+Load test of the validation service (warehouse.service).
+
+1. Startup: what a one-off script pays per run (fresh interpreter, stage
+   imports, make_world) against loading all four stages once.
+2. Correctness: every gold plan of every stage, plus a truncated and a
+   step-swapped copy, through POST /validate; results must equal
+   validator.validate of the stage, failures included. Error responses
+   for malformed requests.
+3. Load: concurrent clients posting batches of S4 plans (per-plan goals)
+   to a server on a background thread; plans/s and request latency.
+
+Usage:
+    python benchmarks/bench_service.py [--requests 200]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.service import ValidatorService, ServiceError, serve_in_thread, validate_remote, STAGES
+
+CLIENTS = [1, 4, 16]
+BATCHES = [1, 32, 256]
+
+_ONE_OFF = """
+import sys, time
+t0 = time.perf_counter()
+sys.path.append({stage_dir!r})
+from validation.validator import validate
+from env.actions_spec import ACTIONS
+from env.make_world import make_world
+make_world()
+print(time.perf_counter() - t0)
+"""
+
+
+def load_cases(stage):
+    gold_dir = os.path.join(BASE_DIR, stage, "dataset", "gold")
+    cases = []
+    for fname in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        cases.append((gold["steps"], {o: s for s, o in gold["goal"].items()}))
+    return cases
+
+
+def variants(cases, rng):
+    """(plan, goal) pairs: each gold plan, truncated and with two neighbouring steps swapped."""
+    out = []
+    for steps, goal in cases:
+        i = rng.randrange(len(steps) - 1)
+        swapped = steps[:i] + [steps[i + 1], steps[i]] + steps[i + 2:]
+        out += [({"steps": steps}, goal), ({"steps": steps[:i]}, goal), ({"steps": swapped}, goal)]
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200, help="requests per load configuration")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    # === Startup ===
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", _ONE_OFF.format(stage_dir=os.path.join(BASE_DIR, "S4"))],
+                         capture_output=True, text=True, check=True).stdout.split()
+    one_off = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    service = ValidatorService()
+    loaded = time.perf_counter() - t0
+    server, url = serve_in_thread(service)
+    print("\n=== Startup ===\n")
+    print(f"one-off script (S4): {one_off * 1e3:.0f} ms wall, {float(out[-1]) * 1e3:.0f} ms imports + make_world")
+    print(f"service, {len(STAGES)} stages preloaded: {loaded * 1e3:.0f} ms once")
+
+    # === Correctness ===
+    checked = 0
+    for stage in STAGES:
+        s = service.stages[stage]
+        pairs = variants(load_cases(stage), rng)
+        resp = validate_remote(url, stage, [p for p, _ in pairs], goals=[g for _, g in pairs])
+        for (plan, goal), got in zip(pairs, resp["results"]):
+            want = s.validator.validate(s.world, plan, s.ACTIONS, {}, goal)
+            failure = want["failure"].as_dict() if want["failure"] else None
+            assert (got["logic_ok"], got["goal_ok"]) == (want["logic_ok"], want["goal_ok"]), (stage, got, want)
+            assert json.loads(json.dumps(failure)) == got["failure"], (stage, got, failure)
+            checked += 1
+    errors = []
+    for kwargs in ({"stage": "S9", "plans": []}, {"stage": "S4", "plans": {}},
+                   {"stage": "S4", "plans": [{}], "goals": []}):
+        try:
+            validate_remote(url, **kwargs)
+        except ServiceError as e:
+            errors.append(f"{e.code}/{e.status}")
+    print(f"\n=== Correctness ===\n\n{checked} plans match validator.validate; "
+          f"error responses: {', '.join(errors)}")
+
+    # === Load ===
+    pairs = variants(load_cases("S4"), rng)
+    print(f"\n=== Load (S4, {args.requests} requests per row) ===\n")
+    print(f"{'clients':>7} {'batch':>6} {'plans/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'server ms':>10}")
+    for batch in BATCHES:
+        for clients in CLIENTS:
+            latencies, server_ms = [], []
+            lock = threading.Lock()
+            per_client = max(1, args.requests // clients)
+
+            def client(seed):
+                local = random.Random(seed)
+                for _ in range(per_client):
+                    chosen = [local.choice(pairs) for _ in range(batch)]
+                    t = time.perf_counter()
+                    resp = validate_remote(url, "S4", [p for p, _ in chosen], goals=[g for _, g in chosen])
+                    with lock:
+                        latencies.append((time.perf_counter() - t) * 1e3)
+                        server_ms.append(resp["stats"]["ms"])
+
+            threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+            t0 = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - t0
+            latencies.sort()
+            print(f"{clients:>7} {batch:>6} {len(latencies) * batch / elapsed:>9.0f} "
+                  f"{statistics.median(latencies):>8.2f} {latencies[int(0.99 * (len(latencies) - 1))]:>8.2f} "
+                  f"{statistics.mean(server_ms):>10.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
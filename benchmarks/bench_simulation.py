@@ -0,0 +1,75 @@
+"""
+Temporal simulation (warehouse.simulation) of valid multi-robot plans.
+
+Simulates the stage's gold plans, then synthetic station plans (one
+capacity-1 station per robot, as make_station_plan needs one unit per
+robot and round) for an increasing number of robots, and reports
+makespan, mean robot idle time, station utilization and simulation cost.
+
+Usage:
+    python benchmarks/bench_simulation.py --stage S4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import make_synthetic_world, add_stations, make_station_plan
+from warehouse.simulation import simulate
+
+ROBOTS = [1, 2, 4, 8, 16, 32]
+TASKS = 256
+
+
+def summary(sim):
+    idle = sum(sim["idle"].values()) / len(sim["idle"])
+    util = sum(sim["utilization"].values()) / len(sim["utilization"]) if sim["utilization"] else 0.0
+    return sim["makespan"], idle, util
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S3", "S4"], required=True)
+    args = parser.parse_args()
+
+    stage_dir = os.path.join(BASE_DIR, args.stage)
+    sys.path.append(stage_dir)
+    from validation import validator
+    from env.actions_spec import ACTIONS
+    from env.make_world import make_world
+
+    world = make_world()
+    gold_dir = os.path.join(stage_dir, "dataset", "gold")
+    rows = []
+    t0 = time.perf_counter()
+    for fname in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        sim = simulate(validator, world, gold, ACTIONS)
+        assert sim["logic_ok"], sim["failure"]
+        rows.append(summary(sim))
+    elapsed = time.perf_counter() - t0
+    makespan, idle, util = (sum(col) / len(col) for col in zip(*rows))
+    print(f"\n=== Gold plans ({args.stage}, {len(rows)} plans, {elapsed / len(rows) * 1e6:.0f} us/plan) ===\n")
+    print(f"makespan {makespan:.2f}s | idle/robot {idle:.2f}s | Inspection util {util:.2f}")
+
+    print(f"\n=== Station plans ({TASKS} tasks, one capacity-1 station per robot) ===\n")
+    print(f"{'robots':>6} {'makespan':>9} {'idle/robot':>11} {'util':>6} {'ms':>8}")
+    for n in ROBOTS:
+        syn = make_synthetic_world(n, 2 * TASKS)
+        add_stations(syn, n)
+        plan, goal = make_station_plan(syn, TASKS)
+        t0 = time.perf_counter()
+        sim = simulate(validator, syn, plan, ACTIONS)
+        ms = (time.perf_counter() - t0) * 1e3
+        assert sim["logic_ok"], sim["failure"]
+        makespan, idle, util = summary(sim)
+        print(f"{n:>6} {makespan:>8.1f}s {idle:>10.1f}s {util:>6.2f} {ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
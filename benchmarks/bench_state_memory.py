@@ -0,0 +1,122 @@
+"""
+Memory and time per validated plan, and the cost of branching the state.
+
+For every gold plan of a stage (or a synthetic transfer plan with --slots):
+- time:    wall time of one validate() call,
+- state:   bytes allocated by init_symbolic_state (tracemalloc),
+- peak:    tracemalloc peak during one validate() call,
+- branch:  cost of exploring one alternative step from the state halfway
+           through the plan, either by deep-copying the state or, when the
+           state supports it, by snapshot() + execute_step + rollback().
+
+Usage:
+    python benchmarks/bench_state_memory.py --stage S4
+    python benchmarks/bench_state_memory.py --stage S4 --slots 4000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import make_synthetic_world, make_transfer_plan
+
+REPEATS = 5
+
+
+def best_of(fn, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def traced(fn):
+    """Return (bytes still allocated by fn's result, peak bytes during fn)."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current - base, peak - base
+
+
+def load_cases(stage_dir):
+    gold_dir = os.path.join(stage_dir, "dataset", "gold")
+    cases = []
+    for fname in sorted(os.listdir(gold_dir)):
+        if fname.endswith(".json"):
+            with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+                gold = json.load(f)
+            goal = {obj: slot for slot, obj in gold.get("goal", {}).items()}
+            cases.append(({"steps": gold["steps"]}, goal))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S1", "S2", "S3", "S4"], required=True)
+    parser.add_argument("--slots", type=int, default=0, help="use a synthetic world of this size")
+    args = parser.parse_args()
+
+    stage_dir = os.path.join(BASE_DIR, args.stage)
+    sys.path.append(stage_dir)
+    from validation import validator
+    from env.actions_spec import ACTIONS
+
+    if args.slots:
+        world = make_synthetic_world(1 if args.stage == "S1" else 4, args.slots)
+        plan, goal = make_transfer_plan(world, 50)
+        if args.stage == "S1":
+            plan = {"steps": [{k: v for k, v in s.items() if k != "agent"} for s in plan["steps"]]}
+        cases, label = [(plan, goal)], f"synthetic, {args.slots} slots"
+    else:
+        from env.make_world import make_world
+        world = make_world()
+        cases, label = load_cases(stage_dir), "gold plans"
+
+    t_val, mem_state, mem_peak, t_copy, t_undo = 0.0, 0, 0, 0.0, 0.0
+    for plan, goal in cases:
+        assert validator.validate(world, plan, ACTIONS, {}, goal)["goal_ok"]
+        t_val += best_of(lambda: validator.validate(world, plan, ACTIONS, {}, goal))
+        mem_state += traced(lambda: validator.init_symbolic_state(world))[0]
+        mem_peak += traced(lambda: validator.validate(world, plan, ACTIONS, {}, goal))[1]
+
+        steps = plan["steps"]
+        half = len(steps) // 2
+        st = validator.init_symbolic_state(world)
+        for i in range(half):
+            validator.execute_step(st, i, steps[i], world, ACTIONS, {})
+
+        def branch_copy():
+            validator.execute_step(deepcopy(st), half, steps[half], world, ACTIONS, {})
+
+        def branch_undo():
+            mark = st.snapshot()
+            validator.execute_step(st, half, steps[half], world, ACTIONS, {})
+            st.rollback(mark)
+
+        t_copy += best_of(branch_copy)
+        if hasattr(st, "snapshot"):
+            t_undo += best_of(branch_undo)
+
+    n = len(cases)
+    print(f"\n=== Symbolic state cost per validated plan ({args.stage}, {label}, {n} plans) ===\n")
+    print(f"validate:           {t_val / n * 1e6:10.1f} us")
+    print(f"state size:         {mem_state / n:10.0f} B")
+    print(f"validate peak:      {mem_peak / n:10.0f} B")
+    print(f"branch (deepcopy):  {t_copy / n * 1e6:10.1f} us")
+    if t_undo:
+        print(f"branch (undo log):  {t_undo / n * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Execution-trace check and overhead on the gold plans of one stage.
+
+Every gold plan, plus random mutations of it, is streamed through
+warehouse.trace.trace. The deltas are replayed onto the initial occupancy,
+and both the replayed occupancy and the returned result must match a
+direct run of the validator. Reports the time of validate() and of a
+fully consumed trace.
+
+Usage:
+    python benchmarks/bench_trace.py --stage S4
+    python benchmarks/bench_trace.py --stage S4 --show s4_case001
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.trace import trace
+
+N_MUTATIONS = 20
+
+
+def run(gen):
+    """Consume a trace generator; returns (deltas, result)."""
+    deltas = []
+    while True:
+        try:
+            deltas.append(next(gen))
+        except StopIteration as stop:
+            return deltas, stop.value
+
+
+def mutate(steps, rng):
+    steps = copy.deepcopy(steps)
+    op = rng.randrange(3)
+    if op == 0 and steps:
+        steps.pop(rng.randrange(len(steps)))
+    elif op == 1 and len(steps) > 1:
+        i = rng.randrange(len(steps) - 1)
+        steps[i], steps[i + 1] = steps[i + 1], steps[i]
+    elif steps:
+        steps.insert(rng.randrange(len(steps)), copy.deepcopy(rng.choice(steps)))
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S1", "S2", "S3", "S4"], required=True)
+    parser.add_argument("--show", help="print the trace of one gold case, e.g. s4_case001")
+    args = parser.parse_args()
+
+    stage_dir = os.path.join(BASE_DIR, args.stage)
+    sys.path.append(stage_dir)
+    from validation import validator
+    from env.actions_spec import ACTIONS
+    from env.make_world import make_world
+
+    world = make_world()
+    gold_dir = os.path.join(stage_dir, "dataset", "gold")
+
+    if args.show:
+        with open(os.path.join(gold_dir, f"{args.show}.json"), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        goal = {o: s for s, o in gold["goal"].items()}
+        deltas, result = run(trace(validator, world, gold, ACTIONS, {}, goal))
+        for d in deltas:
+            print(f"[{d.index}] {d.agent or ''} {d.step.get('action')}: "
+                  f"occ={dict(d.occ)} holding={dict(d.holding)} at={dict(d.at)} res={dict(d.resources)}")
+        print(f"result: logic_ok={result['logic_ok']} goal_ok={result['goal_ok']}")
+        return
+
+    rng = random.Random(0)
+    plans = []
+    for fname in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        goal = {o: s for s, o in gold["goal"].items()}
+        plans.append(({"steps": gold["steps"]}, goal))
+        plans += [({"steps": mutate(gold["steps"], rng)}, goal) for _ in range(N_MUTATIONS)]
+
+    n_steps = 0
+    for plan, goal in plans:
+        deltas, result = run(trace(validator, world, plan, ACTIONS, {}, goal))
+        assert result == validator.validate(world, plan, ACTIONS, {}, goal)
+
+        occ = {slot: None for slot in world["slots"]}
+        occ.update(world["state"]["occupancy"])
+        for d in deltas:
+            occ.update(d.occ)
+        st = validator.init_symbolic_state(world)
+        for i, step in enumerate(plan["steps"][:len(deltas)]):
+            validator.execute_step(st, i, step, world, ACTIONS, {})
+        assert occ == st["occ"], (occ, st["occ"])
+        n_steps += len(deltas)
+
+    t0 = time.perf_counter()
+    for plan, goal in plans:
+        validator.validate(world, plan, ACTIONS, {}, goal)
+    t1 = time.perf_counter()
+    for plan, goal in plans:
+        run(trace(validator, world, plan, ACTIONS, {}, goal))
+    t2 = time.perf_counter()
+
+    print(f"\n=== Execution traces ({args.stage}, {len(plans)} plans, {n_steps} traced steps) ===\n")
+    print("Replayed occupancy and results match the validator for every plan.")
+    print(f"validate: {(t1 - t0) / len(plans) * 1e6:8.1f} us/plan")
+    print(f"trace:    {(t2 - t1) / len(plans) * 1e6:8.1f} us/plan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Validator throughput on all-valid plans.
+
+Valid plans exercise every precondition, effect and invariant check and
+never reach the failure path, so this measures the cost of the checks
+themselves. Uses the stage's gold plans and, for S2-S4, a 800-step
+synthetic transfer plan.
+
+Usage:
+    python benchmarks/bench_valid_throughput.py --stage S4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import make_synthetic_world, make_transfer_plan
+
+REPEATS = 5
+ROUNDS = 20
+
+
+def best_of(fn, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S1", "S2", "S3", "S4"], required=True)
+    args = parser.parse_args()
+
+    stage_dir = os.path.join(BASE_DIR, args.stage)
+    sys.path.append(stage_dir)
+    from validation.validator import validate
+    from env.actions_spec import ACTIONS
+    from env.make_world import make_world
+
+    world = make_world()
+    gold_dir = os.path.join(stage_dir, "dataset", "gold")
+    cases = []
+    for fname in sorted(os.listdir(gold_dir)):
+        if fname.endswith(".json"):
+            with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+                gold = json.load(f)
+            cases.append(({"steps": gold["steps"]}, {o: s for s, o in gold["goal"].items()}))
+    assert all(validate(world, p, ACTIONS, {}, g)["goal_ok"] for p, g in cases)
+
+    def run_gold():
+        for _ in range(ROUNDS):
+            for plan, goal in cases:
+                validate(world, plan, ACTIONS, {}, goal)
+
+    n_plans = ROUNDS * len(cases)
+    n_steps = ROUNDS * sum(len(p["steps"]) for p, _ in cases)
+    t = best_of(run_gold)
+    print(f"\n=== Throughput on all-valid plans ({args.stage}) ===\n")
+    print(f"gold plans:       {n_plans / t:>10,.0f} plans/s  {n_steps / t:>10,.0f} steps/s")
+
+    if args.stage != "S1":
+        syn = make_synthetic_world(4, 400)
+        plan, goal = make_transfer_plan(syn, 200)
+        assert validate(syn, plan, ACTIONS, {}, goal)["goal_ok"]
+        t = best_of(lambda: validate(syn, plan, ACTIONS, {}, goal))
+        print(f"synthetic plan:   {1 / t:>10,.0f} plans/s  {len(plan['steps']) / t:>10,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Validator scaling benchmark: steps/s against number of agents and slots.
+
+Runs the S4 validator on synthetic worlds (see synthetic_world.py) with a
+fixed-length plan, so any drop in throughput comes from per-step cost
+growing with world size. State initialization is timed separately because
+it is paid once per plan, not once per step.
+
+Usage:
+    python benchmarks/bench_validator_scaling.py [--debug]
+
+--debug validates with the full-recount cross-check of the object index,
+which restores the old O(slots) per-step cost.
+"""
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BASE_DIR, "S4"))
+from validation.validator import validate, init_symbolic_state
+from env.actions_spec import ACTIONS
+from synthetic_world import make_synthetic_world, make_transfer_plan
+
+AGENTS = [2, 16, 128, 512]
+SLOTS = [400, 4000, 20000]
+N_TASKS = 200   # 800 steps per plan
+REPEATS = 3
+
+
+def best_of(fn, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    mode = "debug cross-check" if args.debug else "incremental invariants"
+    print(f"\n=== Validator scaling (S4 validator, synthetic worlds, {mode}) ===\n")
+    print(f"{'agents':>7} {'slots':>7} {'steps':>6} {'init ms':>9} {'steps/s':>11}")
+    for n_slots in SLOTS:
+        for n_agents in AGENTS:
+            world = make_synthetic_world(n_agents, n_slots)
+            plan, goal = make_transfer_plan(world, N_TASKS)
+            res = validate(world, plan, ACTIONS, {}, goal, debug=True)
+            assert res["goal_ok"], res
+
+            t_init = best_of(lambda: init_symbolic_state(world))
+            t_total = best_of(lambda: validate(world, plan, ACTIONS, {}, goal, debug=args.debug))
+            n_steps = len(plan["steps"])
+            rate = n_steps / max(t_total - t_init, 1e-9)
+            print(f"{n_agents:>7} {n_slots:>7} {n_steps:>6} {t_init * 1e3:>9.2f} {rate:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Differential check and throughput of the NumPy lockstep validator.
+
+Generates random plans for each stage by mutating its gold plans (dropped,
+inserted, swapped and corrupted steps, wrong agents and objects, and the
+malformed shapes LLM output comes in: steps that are not objects, list or
+number fields, plans without a step list), validates them with both the
+reference stage validator and warehouse.vectorized.validate_many, and
+fails (AssertionError, exit status 1) unless logic_ok / goal_ok agree for
+every plan. The reference must return a verdict for every plan; a raise
+fails the check too. Reports plans/s for both backends.
+
+Usage:
+    python benchmarks/bench_vectorized.py [--stage S1 S4] [--plans 20000]
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+from warehouse.vectorized import validate_many
+
+AGENTS = ["robotA", "robotB", "robotC", "robotD", "robotE"]
+OBJECTS = ["redbox", "bluebox", "greenbox"]
+
+
+def mutate(steps, vocab, rng):
+    """Apply 0-3 random edits to a copy of `steps`, then sometimes break one step's shape."""
+    steps = copy.deepcopy(steps)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.randrange(7)
+        if op == 0 and steps:
+            steps.pop(rng.randrange(len(steps)))
+        elif op == 1:
+            steps.insert(rng.randint(0, len(steps)), copy.deepcopy(rng.choice(vocab)))
+        elif op == 2 and len(steps) > 1:
+            i = rng.randrange(len(steps) - 1)
+            steps[i], steps[i + 1] = steps[i + 1], steps[i]
+        elif op == 3 and steps:
+            s = steps[rng.randrange(len(steps))]
+            if "agent" in s and rng.random() < 0.8:
+                s["agent"] = rng.choice(AGENTS)
+            else:
+                s.pop("agent", None)
+        elif op == 4 and steps:
+            s = steps[rng.randrange(len(steps))]
+            if "object" in s:
+                s["object"] = rng.choice(OBJECTS)
+        elif op == 5 and steps:
+            s = steps[rng.randrange(len(steps))]
+            s.pop(rng.choice(list(s)))
+        elif op == 6 and steps:
+            s = steps[rng.randrange(len(steps))]
+            s["action"] = rng.choice(["arm.pick", "arm.place", "base.goto", "wait_until_free", "arm.push"])
+    if steps and rng.random() < 0.05:   # malformed LLM output: a non-object step or a non-string field
+        k = rng.randrange(len(steps))
+        if rng.random() < 0.3:
+            steps[k] = rng.choice([None, "arm.pick", ["arm.pick"], 3])
+        else:
+            field = rng.choice(list(steps[k]) or ["action"])
+            steps[k][field] = rng.choice([[steps[k].get(field)], {"name": steps[k].get(field)}, 1, None])
+    return steps
+
+
+def make_plan(golds, vocab, rng):
+    """A mutated gold plan; now and then a plan that is not {"steps": [...]} at all."""
+    if rng.random() < 0.01:
+        return rng.choice([None, [], "plan", {"steps": None}, {"steps": "arm.pick"}, {}])
+    return {"steps": mutate(rng.choice(golds)["steps"], vocab, rng)}
+
+
+def check_stage(stage, n_plans, seed):
+    """Run the differential check for one stage; raises AssertionError on any disagreement."""
+    stage_dir = os.path.join(BASE_DIR, stage)
+    for name in [m for m in sys.modules if m == "validation" or m.startswith(("validation.", "env"))]:
+        del sys.modules[name]   # each stage has its own validation/ and env/ packages
+    sys.path.insert(0, stage_dir)
+    try:
+        from validation import validator
+        from env.actions_spec import ACTIONS
+        from env.make_world import make_world
+    finally:
+        sys.path.remove(stage_dir)
+
+    world = make_world()
+    gold_dir = os.path.join(stage_dir, "dataset", "gold")
+    golds = []
+    for fname in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+            golds.append(json.load(f))
+    goal = {obj: slot for slot, obj in golds[0]["goal"].items()}
+    vocab = [s for g in golds for s in g["steps"]]
+
+    rng = random.Random(seed)
+    plans = [make_plan(golds, vocab, rng) for _ in range(n_plans)]
+
+    print(f"\n=== NumPy lockstep validator vs reference ({stage}, {len(plans)} plans) ===\n")
+    t0 = time.perf_counter()
+    ref = [validator.validate(world, p, ACTIONS, {}, goal) for p in plans]
+    t1 = time.perf_counter()
+    logic_ok, goal_ok = validate_many(validator, world, plans, ACTIONS, {}, goal)
+    t2 = time.perf_counter()
+
+    mismatches = [k for k in range(len(plans))
+                  if (ref[k]["logic_ok"], ref[k]["goal_ok"]) != (bool(logic_ok[k]), bool(goal_ok[k]))]
+    for k in mismatches[:5]:
+        print(f"[MISMATCH] plan {k}: reference={ref[k]} vectorized=({logic_ok[k]}, {goal_ok[k]})")
+        print(json.dumps(plans[k], default=str))
+    assert not mismatches, f"{stage}: {len(mismatches)} plans differ from the reference validator"
+
+    print(f"Agreement: {len(plans)}/{len(plans)} plans | logic_ok={int(logic_ok.sum())} goal_ok={int(goal_ok.sum())}")
+    print(f"Reference:  {len(plans) / (t1 - t0):>12,.0f} plans/s")
+    print(f"Vectorized: {len(plans) / (t2 - t1):>12,.0f} plans/s (including encoding)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", nargs="+", choices=["S1", "S2", "S3", "S4"], default=["S1", "S2", "S3", "S4"])
+    parser.add_argument("--plans", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for stage in args.stage:
+        check_stage(stage, args.plans, args.seed)
+
+
+if __name__ == "__main__":
+    main()
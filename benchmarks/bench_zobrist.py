@@ -0,0 +1,97 @@
+"""
+Incremental state hashing (warehouse/zobrist.py).
+
+1. Cost of recognizing a state after each step of a long synthetic plan:
+   hashing the occ/holding/agent_at dict views from scratch against
+   reading the incrementally maintained SymbolicState.zhash, for growing
+   worlds. Also checks that zhash equals the from-scratch Zobrist hash.
+2. Validator cost of maintaining the hash: validate() time per step on
+   the same plans.
+3. Transposition-table statistics of the search tools on the stage's gold
+   plans: validate_concurrent (exists) and repair_distance of plans with
+   one step deleted.
+
+Usage:
+    python benchmarks/bench_zobrist.py --stage S4
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_world import make_synthetic_world, make_transfer_plan
+from warehouse.concurrency import validate_concurrent
+from warehouse.repair import repair_distance
+
+SIZES = [(4, 16), (16, 64), (64, 256), (256, 1024)]   # (robots, slots)
+
+
+def rehash(st):
+    """State hash the way a search tool without zhash would take it."""
+    return hash((tuple(st["occ"].items()), tuple(st["holding"]), tuple(st["agent_at"])))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stage", choices=["S2", "S3", "S4"], required=True)
+    args = parser.parse_args()
+
+    stage_dir = os.path.join(BASE_DIR, args.stage)
+    sys.path.append(stage_dir)
+    from validation import validator
+    from env.actions_spec import ACTIONS
+    from env.make_world import make_world
+
+    # === Hash per step ===
+    print(f"\n=== State hash after every step (synthetic transfer plans, {args.stage}) ===\n")
+    print(f"{'robots':>6} {'slots':>6} {'steps':>6} {'rehash us':>10} {'zhash us':>9} {'validate us/step':>17}")
+    for n_agents, n_slots in SIZES:
+        world = make_synthetic_world(n_agents, n_slots)
+        plan, goal = make_transfer_plan(world, 2 * n_agents)
+        steps = plan["steps"]
+        timings = {}
+        for name, fn in (("rehash", rehash), ("zhash", lambda st: st.zhash)):
+            st = validator.init_symbolic_state(world)
+            total = 0.0
+            for i, step in enumerate(steps):
+                assert validator.execute_step(st, i, step, world, ACTIONS, {}) is None
+                t0 = time.perf_counter()
+                fn(st)
+                total += time.perf_counter() - t0
+            timings[name] = total / len(steps) * 1e6
+            assert st.zhash == st.index.zobrist.hash_state(st.occ, st.holding, st.agent_at)
+        t0 = time.perf_counter()
+        validator.validate(world, plan, ACTIONS, {}, goal)
+        per_step = (time.perf_counter() - t0) / len(steps) * 1e6
+        print(f"{n_agents:>6} {n_slots:>6} {len(steps):>6} {timings['rehash']:>10.2f} "
+              f"{timings['zhash']:>9.3f} {per_step:>17.2f}")
+
+    # === Transposition tables ===
+    world = make_world()
+    gold_dir = os.path.join(stage_dir, "dataset", "gold")
+    rng = random.Random(0)
+    conc, rep = [], []
+    for fname in sorted(os.listdir(gold_dir)):
+        with open(os.path.join(gold_dir, fname), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        goal = {o: s for s, o in gold["goal"].items()}
+        plan = {"steps": gold["steps"]}
+        r = validate_concurrent(validator, world, plan, ACTIONS, {}, goal)
+        conc.append((r["stats"]["explored_states"], r["stats"]["memo_hit_rate"]))
+        steps = list(gold["steps"])
+        steps.pop(rng.randrange(len(steps)))
+        r = repair_distance(validator, world, {"steps": steps}, ACTIONS, {}, goal, reference=gold["steps"])
+        rep.append((r["tt"]["size"], r["tt"]["hit_rate"]))
+    print(f"\n=== Transposition tables ({args.stage} gold plans) ===\n")
+    for name, rows in (("validate_concurrent", conc), ("repair_distance", rep)):
+        print(f"{name:<20} entries/plan {sum(r[0] for r in rows) / len(rows):>8.0f}   "
+              f"hit rate {sum(r[1] for r in rows) / len(rows):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+PyBullet-free symbolic worlds for validator benchmarks.
+
+The worlds follow the same dictionary layout as the stage `make_world()`
+functions (slots, objects, robots, poses, reachability_map, state), but
+contain no simulation handles, so they can be built at any size.
+"""
+
+
+def make_synthetic_world(n_agents, n_slots):
+    """
+    Build a warehouse with `n_agents` robots and `n_slots` slots.
+    The first half of the slots are shelf slots holding one box each,
+    the second half are empty bins; every slot has its own dock.
+    """
+    n_shelves = n_slots // 2
+    slots, reach, occupancy = {}, {}, {}
+    for k in range(n_shelves):
+        for kind in ("Shelf", "Bin"):
+            slot = f"{kind}.{k}.slot"
+            slots[slot] = [0.0, 0.0, 0.0]
+            reach[slot] = f"{kind}.{k}.dock"
+            occupancy[slot] = None
+        occupancy[f"Shelf.{k}.slot"] = f"box{k}"
+
+    return {
+        "slots": slots,
+        "objects": {f"box{k}": None for k in range(n_shelves)},
+        "robots": {f"robot{i}": None for i in range(n_agents)},
+        "poses": set(reach.values()),
+        "reachability_map": reach,
+        "state": {"occupancy": occupancy},
+    }
+
+
+def make_transfer_plan(world, n_tasks):
+    """
+    Build a valid plan moving box k from Shelf.k.slot to Bin.k.slot.
+    Task k is assigned to robot k mod N; the robots of one round work
+    in lockstep, so the plan interleaves all agents.
+    """
+    agents = list(world["robots"])
+    steps = []
+    for start in range(0, n_tasks, len(agents)):
+        batch = [(agents[j % len(agents)], j) for j in range(start, min(start + len(agents), n_tasks))]
+        steps += [{"agent": a, "action": "base.goto", "target": f"Shelf.{k}.dock"} for a, k in batch]
+        steps += [{"agent": a, "action": "arm.pick", "object": f"box{k}", "from": f"Shelf.{k}.slot"} for a, k in batch]
+        steps += [{"agent": a, "action": "base.goto", "target": f"Bin.{k}.dock"} for a, k in batch]
+        steps += [{"agent": a, "action": "arm.place", "object": f"box{k}", "to": f"Bin.{k}.slot"} for a, k in batch]
+    goal = {f"box{k}": f"Bin.{k}.slot" for k in range(n_tasks)}
+    return {"steps": steps}, goal
+
+
+def add_stations(world, n_stations, slots_per_station=1, capacity=None):
+    """
+    Add `n_stations` shared resources, each a group of Station.r.i.slot
+    slots with a common dock and the given capacity (default: one unit
+    per slot), to a synthetic world.
+    """
+    resources = world.setdefault("resources", {})
+    for r in range(n_stations):
+        slots = [f"Station.{r}.{i}.slot" for i in range(slots_per_station)]
+        for slot in slots:
+            world["slots"][slot] = [0.0, 0.0, 0.0]
+            world["reachability_map"][slot] = f"Station.{r}.dock"
+            world["state"]["occupancy"][slot] = None
+        world["poses"].add(f"Station.{r}.dock")
+        resources[f"Station.{r}"] = {"slots": slots,
+                                     "capacity": slots_per_station if capacity is None else capacity}
+    return world
+
+
+def make_station_plan(world, n_tasks):
+    """
+    Like make_transfer_plan, but every box passes through a station on its
+    way to the bin (box k uses station k mod R). Each round of tasks frees
+    its station slots before the next round, so the plan respects any
+    capacity as long as a round does not need more units than exist.
+    """
+    agents = list(world["robots"])
+    stations = sorted({s.rsplit(".", 2)[0] for s in world["slots"] if s.startswith("Station.")},
+                      key=lambda s: int(s.split(".")[1]))
+    steps = []
+    for start in range(0, n_tasks, len(agents)):
+        batch = [(agents[j % len(agents)], j) for j in range(start, min(start + len(agents), n_tasks))]
+        hop = {k: (stations[k % len(stations)], f"{stations[k % len(stations)]}.0.slot") for _, k in batch}
+        steps += [{"agent": a, "action": "base.goto", "target": f"Shelf.{k}.dock"} for a, k in batch]
+        steps += [{"agent": a, "action": "arm.pick", "object": f"box{k}", "from": f"Shelf.{k}.slot"} for a, k in batch]
+        steps += [{"agent": a, "action": "base.goto", "target": f"{hop[k][0]}.dock"} for a, k in batch]
+        steps += [{"agent": a, "action": "wait_until_free", "target": hop[k][1]} for a, k in batch]
+        steps += [{"agent": a, "action": "arm.place", "object": f"box{k}", "to": hop[k][1]} for a, k in batch]
+        steps += [{"agent": a, "action": "arm.pick", "object": f"box{k}", "from": hop[k][1]} for a, k in batch]
+        steps += [{"agent": a, "action": "base.goto", "target": f"Bin.{k}.dock"} for a, k in batch]
+        steps += [{"agent": a, "action": "arm.place", "object": f"box{k}", "to": f"Bin.{k}.slot"} for a, k in batch]
+    goal = {f"box{k}": f"Bin.{k}.slot" for k in range(n_tasks)}
+    return {"steps": steps}, goal
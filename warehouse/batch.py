@@ -0,0 +1,127 @@
+"""
+Prefix-sharing batch validation.
+
+Candidate plans for one prompt (best-of-N samples, model tiers, repeated
+runs) usually start with the same goto/pick steps. `validate_batch` inserts
+all plans into a trie keyed by canonical step tuples, executes every shared
+prefix once and, where plans diverge, rolls the symbolic state back through
+its undo log (SymbolicState.snapshot/rollback) instead of copying it.
+
+The functions here are stage-agnostic: they take the stage validator module
+(`validation.validator` of S1-S4) and drive its `init_symbolic_state`,
+`execute_step` and `goal_failure`, so per-plan results are identical to
+`validator.validate`.
+"""
+import json
+
+from warehouse.constraints import compile_constraints
+
+
+def canonical_step(step):
+    """Hashable key for a plan step; equal keys mean equal steps."""
+    if isinstance(step, dict):
+        try:
+            key = tuple(sorted(step.items()))
+            hash(key)
+            return key
+        except TypeError:  # unhashable field values in malformed LLM output
+            return ("<json>", json.dumps(step, sort_keys=True, default=str))
+    return ("<raw>", repr(step))
+
+
+class _Node:
+    __slots__ = ("step", "children", "plans")
+
+    def __init__(self, step=None):
+        self.step = step        # representative step object for this edge
+        self.children = {}      # canonical step → _Node
+        self.plans = []         # indices of plans ending at this node
+
+
+def build_trie(plans):
+    """
+    Insert every plan with a list of steps into a step trie.
+    Returns (root, malformed) where `malformed` lists the indices of plans
+    that are not objects or whose "steps" is not a list.
+    """
+    root, malformed = _Node(), []
+    for idx, plan in enumerate(plans):
+        steps = plan.get("steps", None) if isinstance(plan, dict) else None
+        if not isinstance(steps, list):
+            malformed.append(idx)
+            continue
+        node = root
+        for step in steps:
+            key = canonical_step(step)
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _Node(step)
+            node = child
+        node.plans.append(idx)
+    return root, malformed
+
+
+def _subtree_plans(node):
+    """All plan indices ending in the subtree rooted at `node`."""
+    out, stack = [], [node]
+    while stack:
+        n = stack.pop()
+        out.extend(n.plans)
+        stack.extend(n.children.values())
+    return out
+
+
+def validate_batch(validator, world, plans, actions, constraints, goal=None, debug=False):
+    """
+    Validate many plans for the same world, goal and constraints.
+
+    Returns (results, stats): `results[k]` equals
+    validator.validate(world, plans[k], actions, constraints, goal, debug),
+    and `stats` compares the steps plan-by-plan validation would execute
+    (each plan up to its first failure) with the steps actually executed,
+    reporting the fraction skipped thanks to shared prefixes.
+    """
+    results = [None] * len(plans)
+    constraints = compile_constraints(constraints)
+    root, malformed = build_trie(plans)
+    for idx in malformed:
+        results[idx] = {"logic_ok": False, "goal_ok": False, "failure": validator.Failure("malformed_plan")}
+
+    sequential = 0  # steps plan-by-plan validation would execute
+    executed = 0
+
+    # Depth-first walk over one shared state. Each stack entry carries the
+    # undo-log mark of its parent's state; popping an entry rolls back
+    # whatever the previously explored sibling subtree changed.
+    st = validator.init_symbolic_state(world)
+    stack = [(child, 0, st.snapshot()) for child in root.children.values()]
+    if root.plans:
+        failure = validator.goal_failure(st, goal, 0)
+        for idx in root.plans:
+            results[idx] = {"logic_ok": True, "goal_ok": failure is None, "failure": failure}
+    while stack:
+        node, depth, mark = stack.pop()
+        st.rollback(mark)
+        executed += 1
+        failure = validator.execute_step(st, depth, node.step, world, actions, constraints, debug)
+        if failure:
+            failed = _subtree_plans(node)
+            for idx in failed:
+                results[idx] = {"logic_ok": False, "goal_ok": False, "failure": failure}
+            sequential += (depth + 1) * len(failed)
+            continue
+        if node.plans:
+            failure = validator.goal_failure(st, goal, depth + 1)
+            for idx in node.plans:
+                results[idx] = {"logic_ok": True, "goal_ok": failure is None, "failure": failure}
+            sequential += (depth + 1) * len(node.plans)
+        mark = st.snapshot()
+        stack.extend((child, depth + 1, mark) for child in node.children.values())
+
+    stats = {
+        "plans": len(plans),
+        "sequential_steps": sequential,
+        "executed_steps": executed,
+        "skipped_fraction": (1 - executed / sequential) if sequential else 0.0,
+    }
+    return results, stats
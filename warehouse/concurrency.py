@@ -0,0 +1,420 @@
+"""
+Concurrency-aware plan validation.
+
+A multi-robot plan is read as one step sequence per agent, in plan order;
+the literal interleaving the LLM wrote is ignored. Synchronization points
+are the steps whose precondition reads shared state: a pick needs the
+object in the slot (slot_has), a place or wait_until_free needs the slot
+free and its resource below capacity (slot_free). Such a step blocks until
+another agent makes it true. Any other failure (own holding or position,
+schema, constraint, invariant) does not depend on the interleaving and
+ends the search. `validate_concurrent` decides
+
+    mode="exists"   some linearization executes every step, and
+    mode="forall"   every execution completes: no reachable state where all
+                    remaining agents are blocked (code "deadlock"),
+
+(goal_ok likewise over the final states), by depth-first search over
+(per-agent progress, shared state) with two reductions:
+
+- memoization: a (progress, state hash) pair is expanded once, looked up
+  in a bounded TranspositionTable (an evicted pair is only explored
+  again). The hash is the validator's incremental SymbolicState.zhash.
+- partial-order reduction: only the agents of a stubborn set are
+  expanded. Starting from one agent, every agent whose remaining steps
+  conflict with the next step of an agent in the set (shared slot or
+  resource, one side writing) is added until the set is closed; the
+  smallest set over all starting agents is kept. Agents outside it
+  cannot enable, disable or reorder anything inside it, so every
+  terminal state (completion or deadlock) is still reached. Independent
+  groups of robots are explored one after another instead of as a
+  product, and a step touching nothing shared is a singleton set.
+
+`check_waits` runs the plan once, in plan order, with blocking instead of
+search: a blocked step parks its agent (and the agent's later steps) on
+the symbol it waits for, and a step that changes that symbol wakes it. A
+WaitForGraph links every parked agent to the agents that still have a
+step able to release it (a pick from the slot or resource, or a place
+into the slot it needs filled). Whenever an agent parks, the graph is
+walked from it: if no running agent is reachable, the parked agents it
+reaches wait on each other forever (code "deadlock", with a cycle) or on
+something no remaining step releases (code "starvation").
+
+States are branched with the undo log (snapshot/rollback), never copied.
+Like batch.py this takes the stage validator module; every step is still
+checked by its execute_step, so failures read the same as in validate().
+"""
+import math
+from collections import Counter, deque
+
+from warehouse.batch import canonical_step
+from warehouse.constraints import compile_constraints
+from warehouse.zobrist import TranspositionTable
+
+_ANY = "*"
+_SYNC = ("slot_has", "slot_free")
+
+
+def _res_symbol(resources, slot):
+    """"res:<name>" for a slot belonging to a shared resource, else None."""
+    rid = resources.resource_of(slot) if resources is not None else None
+    return None if rid is None else f"res:{resources.spec.names[rid]}"
+
+
+def footprint(step, actions, resources=None):
+    """(reads, writes) of shared symbols ("slot:X", "res:R"); own holding/position excluded."""
+    reads, writes = set(), set()
+    try:
+        spec = actions[step["action"]]
+        for name, *keys in spec.get("pre", []):
+            if name in ("slot_has", "slot_free"):
+                slot = step[keys[0]]
+                reads.add(f"slot:{slot}")
+                res = _res_symbol(resources, slot)
+                if name == "slot_free" and res is not None:
+                    reads.add(res)
+        for name, *keys in spec.get("eff", []):
+            if name == "slot_set":
+                slot = step[keys[0]]
+                writes.add(f"slot:{slot}")
+                res = _res_symbol(resources, slot)
+                if res is not None:
+                    writes.add(res)
+    except (KeyError, TypeError, AttributeError):  # malformed step: depends on everything
+        return {_ANY}, {_ANY}
+    return reads, writes
+
+
+def _conflicts(fp, other):
+    reads, writes = fp
+    other_reads, other_writes = other
+    if _ANY in reads or _ANY in other_reads:
+        return True
+    return bool(writes & other_reads or writes & other_writes or reads & other_writes)
+
+
+def split_by_agent(world, plan):
+    """Return (agents, sequences) with sequences[a] = [(plan index, step), ...]."""
+    agents = list(world.get("robots", {})) or [None]
+    default = agents[0]
+    seqs = {a: [] for a in agents}
+    for i, step in enumerate(plan["steps"]):
+        agent = step.get("agent", default) if isinstance(step, dict) else default
+        key = agent if isinstance(agent, str) or agent is None else canonical_step(agent)
+        seqs.setdefault(key, []).append((i, step))
+    names = [a for a in seqs if seqs[a]]
+    return names, [seqs[a] for a in names]
+
+
+def naive_interleavings(lengths):
+    """Number of linearizations of independent sequences: the multinomial coefficient."""
+    total, n = 1, 0
+    for k in lengths:
+        n += k
+        total *= math.comb(n, k)
+    return total
+
+
+def validate_concurrent(validator, world, plan, actions, constraints, goal=None, mode="exists",
+                        reduction=True, debug=False):
+    """
+    Validate the per-agent sequences of `plan` over all linearizations.
+
+    Returns {"logic_ok", "goal_ok", "failure", "order", "stats"}:
+    - exists: `order` is a witness linearization (plan indices) reaching
+      the goal, or a complete one if none does; `failure` is None or the
+      failure met on the deepest explored path.
+    - forall: `order` is a counterexample path ending in `failure` (the
+      failing step, or the state where every agent left is blocked).
+    stats = {explored_states, transitions, naive_interleavings, memo_hit_rate}.
+    """
+    if mode not in ("exists", "forall"):
+        raise ValueError(f"mode must be 'exists' or 'forall', got {mode!r}")
+    steps = plan.get("steps", None)
+    if not isinstance(steps, list):
+        return {"logic_ok": False, "goal_ok": False, "failure": validator.Failure("malformed_plan"),
+                "order": [], "stats": {"explored_states": 0, "transitions": 0, "naive_interleavings": 0,
+                                       "memo_hit_rate": 0.0}}
+
+    constraints = compile_constraints(constraints)
+    st = validator.init_symbolic_state(world)
+    _, seqs = split_by_agent(world, plan)
+    resources = getattr(st, "resources", None)
+    fps = [[footprint(step, actions, resources) for _, step in seq] for seq in seqs]
+    # suffix footprints: everything agent a still has to do from position p on
+    suffix = []
+    for seq_fps in fps:
+        acc_r, acc_w, out = set(), set(), [None] * (len(seq_fps) + 1)
+        out[-1] = (frozenset(), frozenset())
+        for p in range(len(seq_fps) - 1, -1, -1):
+            acc_r |= seq_fps[p][0]
+            acc_w |= seq_fps[p][1]
+            out[p] = (frozenset(acc_r), frozenset(acc_w))
+        suffix.append(out)
+
+    n_agents = len(seqs)
+    pcs = [0] * n_agents
+    stats = {"explored_states": 1, "transitions": 0,
+             "naive_interleavings": naive_interleavings([len(s) for s in seqs])}
+
+    def moves():
+        live = [a for a in range(n_agents) if pcs[a] < len(seqs[a])]
+        if not reduction or len(live) < 2:
+            return live
+        best = live
+        for seed in live:
+            members, work = {seed}, [seed]
+            while work and len(members) < len(best):
+                x = work.pop()
+                fp = fps[x][pcs[x]]
+                for b in live:
+                    if b not in members and _conflicts(fp, suffix[b][pcs[b]]):
+                        members.add(b)
+                        work.append(b)
+            if len(members) < len(best):
+                best = sorted(members)
+                if len(best) == 1:
+                    break
+        return best
+
+    def result(logic_ok, goal_ok, failure, order):
+        stats["memo_hit_rate"] = visited.stats()["hit_rate"]
+        return {"logic_ok": logic_ok, "goal_ok": goal_ok, "failure": failure, "order": order, "stats": stats}
+
+    def blocked(failure):
+        return failure.code == "precondition_failed" and failure.predicate in _SYNC
+
+    st.snapshot()
+    visited = TranspositionTable()
+    visited.put((tuple(pcs), st.zhash), True)
+    path, deepest = [], (None, -1)
+    complete = None  # first complete linearization missing the goal
+    all_goal = True
+    # [agents to try, next, undo mark, agent moved in, blocked steps]
+    frames = [[moves(), 0, len(st.log), None, []]]
+
+    while frames:
+        frame = frames[-1]
+        cand, k, mark, moved, stuck = frame
+        if k >= len(cand):
+            if mode == "forall" and len(stuck) == len(cand):
+                failure = validator.Failure("deadlock", len(path), observed={
+                    "blocked": [f.describe() for f in stuck]})
+                return result(False, False, failure, list(path))
+            frames.pop()
+            if moved is not None:
+                pcs[moved] -= 1
+                path.pop()
+            continue
+        frame[1] += 1
+        st.rollback(mark)
+        a = cand[k]
+        i, step = seqs[a][pcs[a]]
+        stats["transitions"] += 1
+        failure = validator.execute_step(st, i, step, world, actions, constraints, debug)
+        if failure:
+            if not blocked(failure):
+                return result(False, False, failure, path + [i])
+            stuck.append(failure)
+            if len(path) > deepest[1]:
+                deepest = (failure, len(path))
+            continue
+
+        pcs[a] += 1
+        path.append(i)
+        if visited.seen((tuple(pcs), st.zhash)):
+            pcs[a] -= 1
+            path.pop()
+            continue
+        stats["explored_states"] += 1
+
+        if len(path) == len(steps):
+            goal_fail = validator.goal_failure(st, goal, len(steps))
+            if mode == "exists" and goal_fail is None:
+                return result(True, True, None, list(path))
+            if goal_fail is not None:
+                all_goal = False
+                if complete is None:
+                    complete = (list(path), goal_fail)
+            pcs[a] -= 1
+            path.pop()
+            continue
+        frames.append([moves(), 0, len(st.log), a, []])
+
+    if mode == "forall":
+        return result(True, all_goal, None if all_goal else complete[1],
+                      [] if all_goal else complete[0])
+    if complete is not None:
+        return result(True, False, complete[1], complete[0])
+    return result(False, False, deepest[0], [])
+
+
+class WaitForGraph:
+    """
+    Agents parked on shared symbols and the remaining steps that can release
+    them. ("free", "slot:X" | "res:R") is released by a pick from X (from a
+    slot of R); ("fill", "slot:X") by a place into X.
+    """
+
+    def __init__(self):
+        self.releasers = {}   # (kind, symbol) -> Counter(agent -> remaining releasing steps)
+        self.waiting = {}     # parked agent -> (kind, symbol)
+
+    def expect(self, agent, step, resources=None, delta=1):
+        """Count (delta=1) or retire (delta=-1) the releases `step` of `agent` will make."""
+        action = step.get("action") if isinstance(step, dict) else None
+        keys = []
+        if action == "arm.pick" and isinstance(step.get("from"), str):
+            keys.append(("free", f"slot:{step['from']}"))
+            res = _res_symbol(resources, step["from"])
+            if res is not None:
+                keys.append(("free", res))
+        elif action == "arm.place" and isinstance(step.get("to"), str):
+            keys.append(("fill", f"slot:{step['to']}"))
+        for key in keys:
+            c = self.releasers.get(key)
+            if c is None:
+                c = self.releasers[key] = Counter()
+            c[agent] += delta
+            if c[agent] <= 0:
+                del c[agent]
+
+    def park(self, agent, key):
+        self.waiting[agent] = key
+
+    def wake(self, agent):
+        self.waiting.pop(agent, None)
+
+    def stuck(self, agent):
+        """
+        None if a running agent is reachable from `agent`, else
+        ("deadlock", cycle) or ("starvation", starving agent).
+        """
+        seen, stack, starving = {agent}, [agent], None
+        while stack:
+            u = stack.pop()
+            if u not in self.waiting:
+                return None
+            rel = self.releasers.get(self.waiting[u])
+            if not rel:
+                starving = u if starving is None else starving
+                continue
+            for v in rel:
+                if v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        if starving is not None:
+            return "starvation", starving
+        cycle, u = [], agent
+        while u not in cycle:
+            cycle.append(u)
+            u = next(iter(self.releasers[self.waiting[u]]))
+        return "deadlock", cycle[cycle.index(u):] + [u]
+
+
+def _wait_key(failure, resources):
+    """(kind, symbol) a blocked step waits for."""
+    slot = failure.args.get("slot")
+    if failure.predicate == "slot_has":
+        return "fill", f"slot:{slot}"
+    res = _res_symbol(resources, slot) if "resource" in failure.observed else None
+    return "free", res or f"slot:{slot}"
+
+
+def check_waits(validator, world, plan, actions, constraints=None, goal=None, debug=False):
+    """
+    Execute `plan` in plan order, parking agents at blocked steps instead of
+    failing. Returns {"logic_ok", "goal_ok", "failure", "order", "parks"}
+    where `order` is the executed order (plan indices) and `parks` the
+    number of times an agent blocked. Runs in O(steps x agents).
+    """
+    constraints = compile_constraints(constraints)
+    steps = plan.get("steps", None)
+    if not isinstance(steps, list):
+        return {"logic_ok": False, "goal_ok": False, "failure": validator.Failure("malformed_plan"),
+                "order": [], "parks": 0}
+
+    st = validator.init_symbolic_state(world)
+    resources = getattr(st, "resources", None)
+    names, seqs = split_by_agent(world, plan)
+    graph = WaitForGraph()
+    for a, seq in enumerate(seqs):
+        for _, step in seq:
+            graph.expect(a, step, resources)
+    agent_of = {i: a for a, seq in enumerate(seqs) for i, _ in seq}
+    queues = [deque() for _ in seqs]
+    waiters = {}    # (kind, symbol) -> parked agents
+    order, parks = [], 0
+
+    def result(logic_ok, goal_ok, failure):
+        return {"logic_ok": logic_ok, "goal_ok": goal_ok, "failure": failure, "order": order, "parks": parks}
+
+    def stuck_failure(a, i):
+        verdict = graph.stuck(a)
+        if verdict is None:
+            return None
+        kind, who = verdict
+        waiting_on = {names[u]: graph.waiting[u][1] for u in graph.waiting}
+        if kind == "starvation":
+            return validator.Failure("starvation", i, names[who], "wait_for",
+                                     observed={"waiting_on": graph.waiting[who][1]})
+        return validator.Failure("deadlock", i, names[a], "wait_for",
+                                 observed={"cycle": [names[u] for u in who], "waiting_on": waiting_on})
+
+    def run(a):
+        """Run agent a's queued steps until it blocks; returns a Failure or None."""
+        nonlocal parks
+        ready = deque([a])
+        while ready:
+            b = ready.popleft()
+            q = queues[b]
+            while q and b not in graph.waiting:
+                i, step = q[0]
+                failure = validator.execute_step(st, i, step, world, actions, constraints, debug)
+                if failure:   # preconditions are checked before any effect, nothing to undo
+                    if failure.code != "precondition_failed" or failure.predicate not in _SYNC:
+                        return failure
+                    key = _wait_key(failure, resources)
+                    graph.park(b, key)
+                    waiters.setdefault(key, []).append(b)
+                    parks += 1
+                    failure = stuck_failure(b, i)
+                    if failure:
+                        return failure
+                    break
+                q.popleft()
+                order.append(i)
+                graph.expect(b, step, resources, -1)
+                for key in _released(step, resources):
+                    for c in waiters.pop(key, ()):
+                        graph.wake(c)
+                        ready.append(c)
+        return None
+
+    for i, step in enumerate(steps):
+        a = agent_of[i]
+        queues[a].append((i, step))
+        if len(queues[a]) == 1 and a not in graph.waiting:
+            failure = run(a)
+            if failure:
+                return result(False, False, failure)
+
+    for a in list(graph.waiting):   # woken agents run to completion, so these never move again
+        failure = stuck_failure(a, queues[a][0][0])
+        if failure:
+            return result(False, False, failure)
+
+    failure = validator.goal_failure(st, goal, len(steps))
+    return result(True, failure is None, failure)
+
+
+def _released(step, resources):
+    """Wait keys a successfully executed `step` may satisfy."""
+    action = step.get("action")
+    if action == "arm.pick":
+        slot = step["from"]
+        res = _res_symbol(resources, slot)
+        return [("free", f"slot:{slot}")] + ([("free", res)] if res is not None else [])
+    if action == "arm.place":
+        return [("fill", f"slot:{step['to']}")]
+    return []
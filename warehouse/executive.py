@@ -0,0 +1,236 @@
+"""
+Asyncio multi-robot executive.
+
+`run_plan` executes a plan instead of only checking it: every robot is an
+asyncio task consuming its own queue of steps (split_by_agent), against a
+SymbolicWarehouse that holds the state and applies each step with the
+stage validator's execute_step, so the same predicates decide what can
+happen.
+
+- A step whose shared preconditions do not hold yet (slot_has /
+  slot_free: the slot is occupied, the object has not arrived, the
+  resource is at capacity) blocks its robot until a step writes that slot
+  or resource, then is tried again; wait_until_free blocks the same way
+  on its slot. Any other failed check (wrong dock, empty hands, unknown
+  names) stops the run with that Failure.
+- With `ordered` (the default) a step also waits for the earlier plan
+  steps it conflicts with (the dependencies of warehouse.simulation), so
+  the run reaches the states the validated plan does. Without it robots
+  take shared slots first come, first served, which may reorder them or
+  deadlock.
+- Durations are those of warehouse.simulation and elapse on a virtual
+  clock: when every robot is sleeping or blocked the clock jumps to the
+  next step end, so hundreds of robots and hours of plan run in a second.
+  If no robot can move and none is sleeping the run stops with a
+  "deadlock" Failure naming the blocked robots.
+
+Reports the realized makespan, the contention waits (time and number of
+times each robot was blocked) and throughput (steps and delivered goal
+objects per simulated minute), next to the wall-clock time.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+
+from warehouse.concurrency import footprint, split_by_agent
+from warehouse.constraints import compile_constraints
+from warehouse.simulation import DURATIONS, _dependencies, _start_pose, dock_positions, travel_time
+
+_SHARED = ("slot_has", "slot_free")
+
+
+class SymbolicWarehouse:
+    """Shared warehouse state; steps are applied with the validator's execute_step."""
+
+    def __init__(self, validator, world, actions, constraints=None):
+        self.validator, self.world, self.actions = validator, world, actions
+        self.constraints = compile_constraints(constraints)
+        self.state = validator.init_symbolic_state(world)
+        self.resources = getattr(self.state, "resources", None)
+
+    def footprint(self, step):
+        return footprint(step, self.actions, self.resources)
+
+    def try_step(self, i, step):
+        """("done", None) once applied, ("blocked", Failure) if a shared precondition is false, else ("failed", Failure)."""
+        mark = self.state.snapshot()
+        failure = self.validator.execute_step(self.state, i, step, self.world, self.actions, self.constraints)
+        if failure is None:
+            return "done", None
+        self.state.rollback(mark)
+        if failure.code == "precondition_failed" and failure.predicate in _SHARED:
+            return "blocked", failure
+        return "failed", failure
+
+
+class _Clock:
+    """Virtual time: advances to the next timer once every robot is parked on a future."""
+
+    def __init__(self, n_robots):
+        self.now = 0.0
+        self.parked = 0
+        self.n = n_robots
+        self.timers = []
+        self.seq = itertools.count()
+        self.quiet = asyncio.Event()
+        if n_robots == 0:   # nothing will ever park (an empty plan): the run is over at once
+            self.quiet.set()
+
+    def _park(self):
+        self.parked += 1
+        if self.parked == self.n:
+            self.quiet.set()
+
+    async def park(self, fut):
+        self._park()
+        await fut
+
+    def release(self, fut):
+        if not fut.done():
+            fut.set_result(None)
+            self.parked -= 1
+
+    def finish(self):
+        self._park()
+
+    async def sleep(self, seconds):
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.timers, (self.now + seconds, next(self.seq), fut))
+        await self.park(fut)
+
+    def advance(self):
+        """Fire the earliest timers; False if there are none."""
+        if not self.timers:
+            return False
+        self.now = self.timers[0][0]
+        while self.timers and self.timers[0][0] == self.now:
+            self.release(heapq.heappop(self.timers)[2])
+        return True
+
+
+async def run_plan(validator, world, plan, actions=None, constraints=None, goal=None,
+                   ordered=True, durations=None):
+    """
+    Execute `plan` with one asyncio task per robot. Returns {"logic_ok",
+    "goal_ok", "failure", "makespan", "schedule", "waits", "blocked",
+    "throughput", "wall"}: schedule = [(plan index, agent, start, end)],
+    waits/blocked = seconds and times each robot spent blocked on a slot,
+    resource or earlier step, throughput = {"steps_per_min",
+    "goals_per_min"} in simulated time, wall = seconds of real time.
+    """
+    t0 = time.perf_counter()
+    actions = validator.ACTIONS if actions is None else actions
+    durations = {**DURATIONS, **(durations or {})}
+    steps = plan.get("steps", None) if isinstance(plan, dict) else None
+    if not isinstance(steps, list):
+        return _report(False, False, validator.Failure("malformed_plan"), 0.0, [], {}, {}, 0, goal, [], t0)
+
+    house = SymbolicWarehouse(validator, world, actions, constraints)
+    names, seqs = split_by_agent(world, plan)
+    preds = _dependencies(steps, actions, house.resources) if ordered else [()] * len(steps)
+    pos = dock_positions(world)
+    clock = _Clock(len(seqs))
+    loop = asyncio.get_running_loop()
+    finished = set()      # plan indices of completed steps
+    waiting = {}          # symbol or ("step", i) -> [futures of robots blocked on it]
+    schedule, delivered = [], []
+    waits = {name: 0.0 for name in names}
+    blocked = {name: 0 for name in names}
+    blocked_on = {}       # robot -> what it is blocked on right now
+    outcome = {"failure": None}
+
+    def wake(keys):
+        for key in keys:
+            for fut in waiting.pop(key, ()):
+                clock.release(fut)
+
+    async def block(name, keys):
+        fut = loop.create_future()
+        for key in keys:
+            waiting.setdefault(key, []).append(fut)
+        since = clock.now
+        blocked[name] += 1
+        blocked_on[name] = keys
+        await clock.park(fut)
+        del blocked_on[name]
+        waits[name] += clock.now - since
+
+    async def robot(a):
+        name, pose = names[a], _start_pose(world, names[a])
+        queue = asyncio.Queue()
+        for item in seqs[a]:
+            queue.put_nowait(item)
+        try:
+            while not queue.empty() and outcome["failure"] is None:
+                i, step = queue.get_nowait()
+                if not isinstance(step, dict):
+                    outcome["failure"] = validator.Failure("schema_error", i, name,
+                                                           observed={"errors": ["step is not an object"]})
+                    break
+                pending = [j for j in preds[i] if j not in finished]
+                while pending:
+                    await block(name, [("step", pending[0])])
+                    pending = [j for j in pending if j not in finished]
+                reads, writes = house.footprint(step)
+                while True:
+                    status, failure = house.try_step(i, step)
+                    if status != "blocked":
+                        break
+                    await block(name, reads)
+                if status == "failed":
+                    outcome["failure"] = failure
+                    break
+                start = clock.now
+                if step["action"] == "base.goto":
+                    dur = travel_time(pos, pose, step["target"])
+                    pose = step["target"]
+                else:
+                    dur = durations.get(step["action"], 0.0)
+                wake(writes)   # a step reserves what it writes when it starts, as in the validator
+                if dur:
+                    await clock.sleep(dur)
+                schedule.append((i, name, start, clock.now))
+                if step["action"] == "arm.place" and goal and goal.get(step["object"]) == step["to"]:
+                    delivered.append(clock.now)
+                finished.add(i)
+                wake([("step", i)])
+        finally:
+            clock.finish()
+
+    tasks = [asyncio.create_task(robot(a)) for a in range(len(seqs))]
+    while True:
+        await clock.quiet.wait()
+        clock.quiet.clear()
+        if outcome["failure"] is not None or len(finished) == len(steps) or all(t.done() for t in tasks):
+            break
+        if not clock.advance():
+            stuck = [f"{name} on " + ", ".join(f"step {k[1]}" if isinstance(k, tuple) else k for k in keys)
+                     for name, keys in sorted(blocked_on.items())]
+            outcome["failure"] = validator.Failure("deadlock", len(finished), observed={"blocked": stuck})
+            break
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    failure = outcome["failure"]
+    logic_ok = failure is None
+    if logic_ok:
+        failure = validator.goal_failure(house.state, goal, len(steps))
+    makespan = max((end for *_, end in schedule), default=0.0)
+    schedule.sort(key=lambda s: (s[2], s[0]))
+    return _report(logic_ok, logic_ok and failure is None, failure, makespan, schedule, waits, blocked,
+                   len(schedule), goal, delivered, t0)
+
+
+def _report(logic_ok, goal_ok, failure, makespan, schedule, waits, blocked, n_steps, goal, delivered, t0):
+    per_min = 60.0 / makespan if makespan else 0.0
+    return {"logic_ok": logic_ok, "goal_ok": goal_ok, "failure": failure, "makespan": makespan,
+            "schedule": schedule, "waits": waits, "blocked": blocked,
+            "throughput": {"steps_per_min": n_steps * per_min, "goals_per_min": len(delivered) * per_min},
+            "wall": time.perf_counter() - t0}
+
+
+def execute(validator, world, plan, actions=None, constraints=None, goal=None, ordered=True, durations=None):
+    """run_plan in a fresh event loop (asyncio.run)."""
+    return asyncio.run(run_plan(validator, world, plan, actions, constraints, goal, ordered, durations))
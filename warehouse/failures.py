@@ -0,0 +1,90 @@
+"""
+Structured validation failures.
+
+The stage validators return a Failure record instead of a formatted
+message: the checks on the hot path only produce booleans, and on failure
+the validator records what it observed (slot content, held object, dock,
+resource usage) next to the failing predicate and its arguments. Text is
+produced on demand by describe(), so evaluations can aggregate by `code`
+or `predicate` without parsing messages.
+
+Codes:
+    malformed_plan        plan["steps"] is not a list
+    unknown_action        step action not in the action spec
+    schema_error          missing/unknown fields or unknown names
+    unknown_agent         step agent not declared in world["robots"]
+    precondition_failed   `predicate` false for `args`
+    constraint_violation  place outside constraints["allowed_targets"]
+    invariant_broken      duplicated object, resource over capacity, ...
+    goal_unsatisfied      logic ok, final state misses the goal
+    deadlock              blocked agents wait on each other (concurrency.py)
+    starvation            an agent waits for a release no remaining step makes
+"""
+
+
+class Failure:
+    """First failure of a plan: what went wrong, where, and what was observed."""
+    __slots__ = ("code", "step", "agent", "predicate", "args", "observed")
+
+    def __init__(self, code, step=None, agent=None, predicate=None, args=None, observed=None):
+        self.code = code
+        self.step = step            # index of the failing step (len(steps) for the goal)
+        self.agent = agent          # agent name, None for single-robot stages
+        self.predicate = predicate  # failing predicate / constraint / invariant name
+        self.args = args or {}      # materialized arguments of the check
+        self.observed = observed or {}  # state values seen when the check failed
+
+    def _why(self):
+        a, o, who = self.args, self.observed, f"{self.agent} " if self.agent else ""
+        pred = self.predicate
+        if "unknown_slot" in o:
+            return f"unknown slot '{o['unknown_slot']}'"
+        if pred == "is_pose":
+            return f"unknown pose '{a.get('target')}'"
+        if pred == "holding_is":
+            return f"{who}holding={o.get('holding')} != {a.get('value')}"
+        if pred == "slot_has":
+            return f"{a.get('slot')} has {o.get('found')} not {a.get('object')}"
+        if pred == "slot_free":
+            if "resource" in o:
+                return f"{o['resource']} at capacity ({o['in_use']}/{o['capacity']}, shared resource)"
+            return f"{a.get('slot')} occupied by {o.get('found')}"
+        if pred == "at_reach":
+            return f"{who}not at dock '{o.get('dock')}' (at={o.get('at')})"
+        if pred == "allowed_targets":
+            return f"'{a.get('object')}' not allowed in '{a.get('slot')}'"
+        if "reason" in o:
+            return o["reason"]
+        return f"{pred} failed for {a}"
+
+    def describe(self):
+        """Human-readable message in the validators' former error format."""
+        at = f"[{self.step}] " if self.step is not None else ""
+        who = f" ({self.agent})" if self.agent else ""
+        if self.code == "malformed_plan":
+            return "plan has no list of steps"
+        if self.code == "unknown_action":
+            return f"{at}unknown_action '{self.args.get('action')}'"
+        if self.code == "schema_error":
+            return f"{at}schema/type error: " + " ; ".join(self.observed.get("errors", []))
+        if self.code == "unknown_agent":
+            return f"{at}schema/type error: unknown agent '{self.agent}'"
+        if self.code == "deadlock" and "cycle" in self.observed:
+            waits = ", ".join(f"{a} on {s}" for a, s in self.observed.get("waiting_on", {}).items())
+            return f"{at}deadlock: " + " -> ".join(self.observed["cycle"]) + f" (waiting: {waits})"
+        if self.code == "deadlock":
+            return f"{at}deadlock: " + " ; ".join(self.observed.get("blocked", []))
+        if self.code == "starvation":
+            return f"{at}starvation{who}: {self.observed.get('waiting_on')} is never released"
+        if self.code == "goal_unsatisfied":
+            return f"goal_unsatisfied: {self._why()}"
+        return f"{at}{self.code}{who}: {self.predicate} -> {self._why()}"
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __eq__(self, other):
+        return isinstance(other, Failure) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return f"Failure({self.describe()!r})"
@@ -0,0 +1,217 @@
+"""
+Gold-plan verification at dataset build time.
+
+A gold file that does not pass its own stage validator corrupts TSR and
+PS of every model evaluated against it. `verify_golds` checks every
+gold/*.json of a stage: the plan must execute on the stage world and reach
+the file's goal ({slot: object}, under its constraints if any). Files are
+checked in a process pool, each worker loading the stage profile
+(warehouse.stages) once.
+
+Only changed files are checked again. A cache next to the gold directory
+(dataset/gold_check.json) maps each file name to the SHA-256 of its bytes
+and its verdict; it is thrown away when the stage's validator, action
+spec, world or the warehouse modules they use change, since those decide
+the verdicts too. Files found bad stay in the cache with their errors, so
+an unchanged bad file fails every build without being validated again.
+
+Errors are dicts: {"file", "task_id", "code", "step", "agent",
+"predicate", "args", "observed", "message"}, the Failure fields of the
+first failure (warehouse/failures.py) plus its describe() text; a file
+that is not a gold plan (bad JSON, no goal or steps, a step that is not
+an object of string fields, ...) gets code "bad_gold". With errors,
+verify_golds raises GoldCheckError carrying them and the report.
+
+    python -m warehouse.goldcheck S3 [--workers 8] [--no-cache] [--json]
+
+exits with status 1 and one line per bad file when the check fails; the
+generate_dataset.py scripts run it after writing their files.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+CACHE_NAME = "gold_check.json"
+_STAGE_FILES = (("validation", "validator.py"), ("env", "actions_spec.py"), ("env", "make_world.py"))
+_SHARED_FILES = ("validator.py", "failures.py", "constraints.py", "resources.py", "zobrist.py", "stages.py",
+                 "goldcheck.py")
+
+
+class GoldCheckError(Exception):
+    """Gold plans rejected by their stage validator; `errors` has one dict per bad file."""
+
+    def __init__(self, stage, errors, report=None):
+        shown = "; ".join(f"{e['file']}: {e['message']}" for e in errors[:5])
+        more = f" (+{len(errors) - 5} more)" if len(errors) > 5 else ""
+        super().__init__(f"{stage}: {len(errors)} gold plan(s) fail validation: {shown}{more}")
+        self.stage = stage
+        self.errors = errors
+        self.report = report
+
+
+def stage_fingerprint(stage):
+    """Digest of the sources deciding a stage's verdicts (validator, action spec, world, shared modules)."""
+    h = hashlib.sha256(stage.encode("utf-8"))
+    paths = [os.path.join(BASE_DIR, stage, *parts) for parts in _STAGE_FILES]
+    paths += [os.path.join(BASE_DIR, "warehouse", name) for name in _SHARED_FILES]
+    for path in paths:
+        h.update(path[len(BASE_DIR):].encode("utf-8"))
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def _error(fname, task_id, code, message, failure=None):
+    out = {"file": fname, "task_id": task_id, "code": code, "step": None, "agent": None,
+           "predicate": None, "args": {}, "observed": {}}
+    if failure is not None:
+        out.update(failure.as_dict())
+    out["message"] = message
+    return out
+
+
+def check_gold(stage, fname, data):
+    """Error dict for the gold file `fname` (its bytes `data`) of `stage`, or None if it is correct."""
+    from warehouse.stages import load_stage
+
+    try:
+        gold = json.loads(data)
+    except ValueError as e:
+        return _error(fname, None, "bad_gold", f"not JSON: {e}")
+    if not isinstance(gold, dict):
+        return _error(fname, None, "bad_gold", "not a JSON object")
+    task_id = gold.get("task_id")
+    if task_id is not None and task_id != os.path.splitext(fname)[0]:
+        return _error(fname, task_id, "bad_gold", f"task_id '{task_id}' does not match the file name")
+    goal = gold.get("goal")
+    if not isinstance(goal, dict) or not goal:
+        return _error(fname, task_id, "bad_gold", "no goal {slot: object}")
+    if len(set(map(str, goal.values()))) != len(goal):
+        return _error(fname, task_id, "bad_gold", "an object is the goal of several slots")
+    constraints = gold.get("constraints") or {}
+    if not isinstance(constraints, dict):
+        return _error(fname, task_id, "bad_gold", "'constraints' is not an object")
+    steps = gold.get("steps")
+    if not isinstance(steps, list) or not steps:
+        return _error(fname, task_id, "bad_gold", "no list of steps")
+    for i, step in enumerate(steps):
+        if not isinstance(step, dict) or not all(isinstance(v, str) for v in step.values()):
+            return dict(_error(fname, task_id, "bad_gold", f"[{i}] step is not an object of string fields: {step!r}"),
+                        step=i)
+
+    try:
+        result = load_stage(stage).validate(gold, constraints, {obj: slot for slot, obj in goal.items()})
+    except Exception as e:   # one file must not abort the pool
+        return _error(fname, task_id, "bad_gold", f"validator raised {type(e).__name__}: {e}")
+    if result["goal_ok"]:
+        return None
+    failure = result["failure"]
+    return _error(fname, task_id, failure.code, failure.describe(), failure)
+
+
+def _check_item(item):
+    stage, fname, data = item
+    return fname, check_gold(stage, fname, data)
+
+
+def _load_cache(path, fingerprint):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get("files", {}) if cache.get("fingerprint") == fingerprint else {}
+
+
+def _save_cache(path, stage, fingerprint, files):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"stage": stage, "fingerprint": fingerprint, "files": files}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def verify_golds(stage, gold_dir=None, cache_path=None, workers=None, use_cache=True, strict=True):
+    """
+    Check every gold/*.json of `stage`. Returns {"stage", "files",
+    "verified", "cached", "errors", "seconds"}: verified counts the files
+    validated in this run, cached those whose verdict came from the cache.
+    Raises GoldCheckError if any file is bad, unless strict=False.
+    """
+    t0 = time.perf_counter()
+    gold_dir = gold_dir or os.path.join(BASE_DIR, stage, "dataset", "gold")
+    if cache_path is None:
+        cache_path = os.path.join(os.path.dirname(os.path.abspath(gold_dir)), CACHE_NAME)
+    fingerprint = stage_fingerprint(stage)
+    cached = _load_cache(cache_path, fingerprint) if use_cache else {}
+
+    files, todo = {}, []
+    for fname in sorted(os.listdir(gold_dir)):
+        if not fname.endswith(".json"):
+            continue
+        with open(os.path.join(gold_dir, fname), "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        entry = cached.get(fname)
+        if entry is not None and entry.get("sha256") == digest:
+            files[fname] = entry
+        else:
+            files[fname] = {"sha256": digest, "error": None}
+            todo.append((stage, fname, data))
+
+    if len(todo) > 1 and workers != 1:
+        n = min(workers or os.cpu_count() or 1, len(todo))
+        with ProcessPoolExecutor(max_workers=n) as pool:
+            results = list(pool.map(_check_item, todo, chunksize=max(1, len(todo) // (4 * n))))
+    else:
+        results = [_check_item(item) for item in todo]
+    for fname, error in results:
+        files[fname]["error"] = error
+
+    if use_cache and cache_path:
+        _save_cache(cache_path, stage, fingerprint, files)
+    errors = [entry["error"] for _, entry in sorted(files.items()) if entry["error"]]
+    report = {"stage": stage, "files": len(files), "verified": len(todo), "cached": len(files) - len(todo),
+              "errors": errors, "seconds": time.perf_counter() - t0}
+    if errors and strict:
+        raise GoldCheckError(stage, errors, report)
+    return report
+
+
+def main():
+    from warehouse.stages import STAGES
+
+    parser = argparse.ArgumentParser(description="Check that every gold plan of a stage passes its validator.")
+    parser.add_argument("stages", nargs="+", choices=STAGES)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="validate every file, ignore and keep no cache")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    args = parser.parse_args()
+
+    failed = False
+    for stage in args.stages:
+        report = verify_golds(stage, workers=args.workers, use_cache=not args.no_cache, strict=False)
+        failed = failed or bool(report["errors"])
+        if args.json:
+            print(json.dumps(report))
+            continue
+        print(f"[{stage}] {report['files']} gold plans: {report['verified']} verified, {report['cached']} cached, "
+              f"{len(report['errors'])} bad ({report['seconds']:.2f}s)")
+        for e in report["errors"]:
+            print(f"  {e['file']}: {e['code']}: {e['message']}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Grounded actions of a stage world.
+
+`ground_steps` lists every well-typed step the action spec allows in a
+world: the parameter domains are read off the precondition predicates
+(is_pose -> poses, at_reach/slot_has/slot_free -> slots, the object of
+slot_has/holding_is -> objects), and every step gets an "agent" field
+when the world declares robots and the schema allows one. Steps without
+effects (wait_until_free) are left out unless `with_noops` is set: they
+never change the state.
+
+Each step comes with the state facts its preconditions require (slot
+content, held object, dock), so `applicable_steps` can discard most
+candidates by a lookup before the stage validator's execute_step checks
+the survivors (constraints, invariants and resources included).
+`successors` yields the accepted steps with their effects applied, for
+search code that needs the next state of each.
+"""
+import itertools
+
+
+def _domains(spec, world):
+    """Field name -> list of values, from the predicate arguments of one action."""
+    domains = {}
+    for name, *keys in spec.get("pre", []):
+        if name == "is_pose":
+            domains[keys[0]] = sorted(world["poses"])
+        elif name in ("at_reach", "slot_has", "slot_free"):
+            domains[keys[0]] = list(world["slots"])
+        if name == "slot_has" and keys[1] is not None:
+            domains[keys[1]] = list(world["objects"])
+        elif name == "holding_is" and keys[0] is not None:
+            domains[keys[0]] = list(world["objects"])
+    return domains
+
+
+def _requires(step, spec, world):
+    """Facts ("occ", slot, obj) / ("holding", agent, obj) / ("at", agent, dock) the preconditions need."""
+    agent = step.get("agent")
+    facts = []
+    for name, *keys in spec.get("pre", []):
+        if name == "slot_has":
+            facts.append(("occ", step[keys[0]], step[keys[1]]))
+        elif name == "slot_free":
+            facts.append(("occ", step[keys[0]], None))
+        elif name == "holding_is":
+            facts.append(("holding", agent, step[keys[0]] if keys[0] is not None else None))
+        elif name == "at_reach":
+            facts.append(("at", agent, world["reachability_map"].get(step[keys[0]])))
+    return tuple(facts)
+
+
+def ground_steps(world, actions, schema=None, with_noops=False):
+    """[(step, required facts)] for every step of `actions` over the names of `world`."""
+    agents = list(world.get("robots", {}))
+    steps = []
+    for action, spec in actions.items():
+        if not spec.get("eff") and not with_noops:
+            continue
+        domains = _domains(spec, world)
+        fields = sorted(domains)
+        with_agent = bool(agents) and (schema is None or "agent" in schema[action]["allowed"])
+        for agent in (agents if with_agent else [None]):
+            for values in itertools.product(*(domains[f] for f in fields)):
+                step = {"agent": agent} if agent is not None else {}
+                step["action"] = action
+                step.update(zip(fields, values))
+                steps.append((step, _requires(step, spec, world)))
+    return steps
+
+
+def _holds(st, fact):
+    kind, key, value = fact
+    if kind == "occ":
+        return st.occ_of(key) == value
+    current = st.holding if kind == "holding" else st.agent_at
+    if type(current) is list:   # multi-robot stages: indexed by agent id
+        a = st.agent_id.get(key) if key is not None else 0
+        return a is not None and current[a] == value
+    return current == value
+
+
+def successors(validator, st, candidates, world, actions, constraints=None):
+    """
+    Yield each step of `candidates` (from ground_steps) that execute_step
+    accepts in `st`, with `st` holding the step's effects until the next
+    step is requested; `st` is restored when the generator finishes.
+    """
+    constraints = constraints or {}
+    mark = st.snapshot()
+    try:
+        for step, requires in candidates:
+            if not all(_holds(st, fact) for fact in requires):
+                continue
+            if validator.execute_step(st, -1, step, world, actions, constraints) is None:
+                yield step
+            st.rollback(mark)
+    finally:
+        st.rollback(mark)
+
+
+def applicable_steps(validator, st, candidates, world, actions, constraints=None):
+    """The steps of `candidates` execute_step accepts in `st`; `st` is left unchanged."""
+    return list(successors(validator, st, candidates, world, actions, constraints))
@@ -0,0 +1,164 @@
+"""
+Library of validated plans keyed by task signature.
+
+Many tasks recur unchanged (the 50 A-first S3 cases are one task), so a
+plan that validated once can be served again without calling the LLM.
+`task_signature` reduces a task to a canonical key:
+
+- the world without its objects (slots, poses, reachability, robots,
+  resources), fingerprinted once per world dict;
+- the initial occupancy, goal, constraints and any extra requirements
+  with object names replaced by canonical ones: objects are numbered by
+  the slot they start in, so the same task with other box names has the
+  same signature. allowed_targets patterns are resolved against the
+  world's objects, so differently written rules admitting the same
+  objects also match;
+- the stage name, as validators differ between stages.
+
+`requirements` is what the task prescribes beyond its goal, as
+`requirements_of` reads it off a reference plan (the gold): the relay
+slots of each object and the order in which objects enter them (A-first
+and B-first S3 cases share world and goal but differ there). Object
+names in it are renamed too, and a plan is only stored under
+requirements it meets.
+
+A PlanLibrary stores only plans its stage validator accepts with the goal
+reached, in canonical names, and returns them renamed to the requester's
+objects. It keeps hit/miss statistics and can persist itself as JSON.
+
+    library = PlanLibrary("plan_library.json")
+    steps = library.lookup("S3", world, goal)
+    if steps is None:
+        steps = ...   # call the LLM
+        library.store("S3", world, goal, {"steps": steps}, validator, ACTIONS)
+    library.save()
+"""
+import hashlib
+import json
+import os
+import threading
+
+from warehouse.constraints import _ObjectRule
+from warehouse.makespan import routes_of
+
+_WORLD_KEYS = {}   # id(world) -> (world, fingerprint)
+_SKIP = ("objects", "state")
+
+
+def _digest(value):
+    text = json.dumps(value, sort_keys=True, default=lambda v: sorted(v) if isinstance(v, (set, frozenset)) else str(v))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def world_fingerprint(world):
+    """Digest of everything in `world` except its objects and their placement; cached per world dict."""
+    cached = _WORLD_KEYS.get(id(world))
+    if cached is None or cached[0] is not world:
+        if len(_WORLD_KEYS) >= 64:
+            _WORLD_KEYS.clear()
+        cached = _WORLD_KEYS[id(world)] = (world, _digest({k: v for k, v in world.items() if k not in _SKIP}))
+    return cached[1]
+
+
+def canonical_names(world):
+    """{object: canonical name}: objects numbered by initial slot, then unplaced objects by name."""
+    placed = sorted((slot, obj) for slot, obj in world.get("state", {}).get("occupancy", {}).items() if obj)
+    order = [obj for _, obj in placed]
+    order += sorted(o for o in world.get("objects", {}) if o not in set(order))
+    return {obj: f"@{k}" for k, obj in enumerate(order)}
+
+
+def _rename(value, names):
+    if isinstance(value, str):
+        return names.get(value, value)
+    if isinstance(value, dict):
+        return {_rename(k, names): _rename(v, names) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_rename(v, names) for v in value]
+    return value
+
+
+def _canonical_constraints(constraints, names):
+    out = {}
+    for key, value in (constraints or {}).items():
+        if key == "allowed_targets" and value:
+            out[key] = {slot: sorted(names[o] for o in names if _ObjectRule(patterns).matches(o))
+                        for slot, patterns in value.items()}
+        elif value:
+            out[key] = _rename(value, names)
+    return out
+
+
+def task_signature(stage, world, goal, constraints=None, requirements=None):
+    """(signature, {object: canonical name}) of a task."""
+    names = canonical_names(world)
+    occupancy = {slot: names.get(obj, obj) for slot, obj in world.get("state", {}).get("occupancy", {}).items() if obj}
+    key = {"stage": stage, "world": world_fingerprint(world), "occupancy": occupancy,
+           "goal": _rename(goal or {}, names), "constraints": _canonical_constraints(constraints, names),
+           "requirements": _rename(requirements, names)}
+    return _digest(key), names
+
+
+def requirements_of(plan):
+    """Requirements a reference plan (the gold) fixes beyond its goal: relay slots, and the order objects enter them."""
+    via = routes_of(plan)
+    slots = {slot for route in via.values() for slot in route}
+    order = [s.get("object") for s in plan.get("steps", []) if s.get("action") == "arm.place" and s.get("to") in slots]
+    return {"via": via, "order": order} if via else None
+
+
+def _rename_steps(steps, names):
+    return [{**s, "object": names.get(s["object"], s["object"])} if "object" in s else dict(s) for s in steps]
+
+
+class PlanLibrary:
+    """Validated plans by task signature; lookup/store are thread safe."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}   # signature -> {"stage", "steps" (canonical names)}
+        self.hits = self.misses = self.stores = self.rejected = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+
+    def lookup(self, stage, world, goal, constraints=None, requirements=None):
+        """Steps of a stored plan for the task, in the task's object names, or None."""
+        sig, names = task_signature(stage, world, goal, constraints, requirements)
+        with self._lock:
+            entry = self.entries.get(sig)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        inverse = {c: obj for obj, c in names.items()}
+        return _rename_steps(entry["steps"], inverse)
+
+    def store(self, stage, world, goal, plan, validator, actions, constraints=None, requirements=None):
+        """Store `plan` if it validates, reaches the goal and meets `requirements`; returns the validate() result."""
+        result = validator.validate(world, plan, actions, constraints or {}, goal)
+        with self._lock:
+            if not result["goal_ok"] or (requirements is not None and requirements_of(plan) != requirements):
+                self.rejected += 1
+                return result
+            sig, names = task_signature(stage, world, goal, constraints, requirements)
+            if sig not in self.entries:
+                self.entries[sig] = {"stage": stage, "steps": _rename_steps(plan["steps"], names)}
+                self.stores += 1
+        return result
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0, "stores": self.stores, "rejected": self.rejected}
+
+    def save(self, path=None):
+        path = path or self.path
+        with self._lock:
+            data = {"version": 1, "entries": self.entries}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,255 @@
+"""
+Makespan-optimal multi-robot plans.
+
+The shortest plan (warehouse.planner) counts steps; `plan_makespan`
+minimizes the time the robots need working in parallel, measured exactly
+as warehouse.simulation does: goto durations from the dock distances,
+DURATIONS for pick/place, and a step touching a shared slot or resource
+(concurrency.footprint) starts only after every earlier step in conflict
+with it has ended.
+
+Each goal object travels a route of slots, [where it is, *via, goal],
+e.g. Shelf.red.slot -> Inspection.slot -> RedBin.slot for the S3/S4 relay
+tasks. Every hop is a leg: goto, pick, goto, place, carried out by one
+robot; consecutive legs of an object may go to different robots (a
+handover at the intermediate slot). The search is branch and bound over
+which leg is appended next to the plan and which robot does it:
+
+- an appended leg is checked step by step by the stage validator's
+  execute_step, so a place into a full station (Inspection.slot, capacity
+  from world["resources"]) or an occupied slot cuts the branch, and every
+  complete branch is a valid, validator-ordered plan;
+- its steps are timed as early as the robot and the conflicting earlier
+  steps allow (an active schedule for that append order); station
+  mutual exclusion becomes a precedence between the legs using it, in
+  the order they were appended, much as conflict-based search branches
+  on which of two conflicting agents goes first;
+- two adjacent legs of different robots touching no common shared symbol
+  commute (same times, same states), so only the order with the earlier
+  starting leg first is expanded; of several robots at the same pose and free at the same time
+  only the first is tried for a leg;
+- a node is pruned when its lower bound (the longest remaining leg chain
+  of an object, the remaining work spread evenly over the robots, and
+  the remaining picks and places on each station, which the timing
+  serializes) cannot beat the best plan found. Children are tried earliest finish
+  first, so the first leaf is the greedy list schedule.
+
+The result is optimal among plans that move each goal object along its
+route with whole legs (no robot holds an object while doing something
+else), which covers the stage tasks. With many robots and objects the
+time budget may run out first: the best plan found is returned with the
+proven lower bound and optimal=False.
+
+`routes_of` reads the via slots of each object off an existing plan (the
+gold), so a reference for a task uses the same relay structure.
+"""
+import math
+import time
+
+from warehouse.concurrency import footprint
+from warehouse.constraints import compile_constraints
+from warehouse.simulation import DURATIONS, _start_pose, dock_positions, travel_time
+
+BUDGET = 5.0   # seconds per task
+INF = math.inf
+
+
+def routes_of(plan):
+    """{object: [slots it is placed into before its last place]}: the via slots of `plan`."""
+    placed = {}
+    for step in plan.get("steps", []):
+        if isinstance(step, dict) and step.get("action") == "arm.place":
+            placed.setdefault(step.get("object"), []).append(step.get("to"))
+    return {obj: slots[:-1] for obj, slots in placed.items() if len(slots) > 1}
+
+
+def plan_makespan(validator, world, goal, actions=None, constraints=None, via=None, roles=None,
+                  waits=False, durations=None, budget=BUDGET):
+    """
+    Returns {"steps", "schedule", "makespan", "lower_bound", "optimal", "expanded", "timeout"}.
+    steps is a validator-ordered interleaving (steps sorted by start time),
+    schedule = [(step index, agent, start, end), ...] as in simulate().
+    `via` maps objects to intermediate slots; `roles` maps objects to the
+    robot (or None: any) for each leg of their route; with `waits` a
+    wait_until_free precedes every place into a resource slot (S3/S4
+    prompts ask for it). steps is None if no plan exists or none was found
+    in the budget.
+    """
+    actions = validator.ACTIONS if actions is None else actions
+    constraints = compile_constraints(constraints)
+    durations = {**DURATIONS, **(durations or {})}
+    via, roles = via or {}, roles or {}
+    reach = world["reachability_map"]
+    pos = dock_positions(world)
+    names = list(world.get("robots", {})) or [None]
+    n = len(names)
+    deadline = time.perf_counter() + budget
+
+    st = validator.init_symbolic_state(world)
+    resources = getattr(st, "resources", None)
+    where = {obj: slot for slot, obj in world["state"].get("occupancy", {}).items() if obj}
+    chains = []   # per object: [(object, leg number, from slot, to slot)]
+    for obj, slot in goal.items():
+        route = [where.get(obj), *via.get(obj, []), slot]
+        chain = [(obj, k, a, b) for k, (a, b) in enumerate(zip(route, route[1:])) if a != b]
+        if any(a is None for _, _, a, _ in chain):
+            return _result(None, None, INF, 0, True, False)
+        if chain:
+            chains.append(chain)
+
+    def leg_time(src, dst):
+        """Least duration of a leg once its robot is at the pick dock."""
+        return durations["arm.pick"] + durations["arm.place"] + travel_time(pos, reach[src], reach[dst])
+
+    rest = [[sum(leg_time(a, b) for _, _, a, b in chain[k:]) for k in range(len(chain) + 1)] for chain in chains]
+
+    def res_symbol(slot):
+        rid = resources.resource_of(slot) if resources is not None else None
+        return None if rid is None else f"res:{resources.spec.names[rid]}"
+
+    # station[c][k]: {resource symbol: seconds of picks/places on it by legs k.. of chain c};
+    # every pick or place on a resource writes its symbol, so they run one at a time
+    station = []
+    for chain in chains:
+        acc, rows = {}, [{}]
+        for _, _, src, dst in reversed(chain):
+            for slot, action in ((src, "arm.pick"), (dst, "arm.place")):
+                sym = res_symbol(slot)
+                if sym is not None:
+                    acc[sym] = acc.get(sym, 0.0) + durations[action]
+            rows.append(dict(acc))
+        station.append(rows[::-1])
+
+    def leg_steps(leg, agent, at):
+        obj, _, src, dst = leg
+        tag = {"agent": agent} if agent is not None else {}
+        steps = []
+        if at != reach[src]:
+            steps.append({**tag, "action": "base.goto", "target": reach[src]})
+        steps.append({**tag, "action": "arm.pick", "object": obj, "from": src})
+        if reach[dst] != reach[src]:
+            steps.append({**tag, "action": "base.goto", "target": reach[dst]})
+        if waits and "wait_until_free" in actions and resources is not None and resources.resource_of(dst) is not None:
+            steps.append({**tag, "action": "wait_until_free", "target": dst})
+        steps.append({**tag, "action": "arm.place", "object": obj, "to": dst})
+        return steps
+
+    def timed(steps, a, free, pose, wend, rend):
+        """Start/end of each step of robot `a`; returns (timed steps, free, pose, wend, rend, symbols)."""
+        wend, rend, out, symbols = dict(wend), dict(rend), [], set()
+        for step in steps:
+            reads, writes = footprint(step, actions, resources)
+            start = max([free] + [wend.get(s, 0.0) for s in reads | writes] + [rend.get(s, 0.0) for s in writes])
+            if step["action"] == "base.goto":
+                dur = travel_time(pos, pose, step["target"])
+                pose = step["target"]
+            else:
+                dur = durations.get(step["action"], 0.0)
+            free = start + dur
+            for s in reads:
+                rend[s] = max(rend.get(s, 0.0), free)
+            for s in writes:
+                wend[s], rend[s] = free, 0.0
+            symbols |= reads | writes
+            out.append((step, names[a], start, free))
+        return out, free, pose, wend, rend, symbols
+
+    # least goto onto the first pick dock of each chain, for a robot not already there
+    starts = set(pos) | {_start_pose(world, name) for name in names}
+    approach = [min((travel_time(pos, p, reach[chain[0][2]]) for p in starts - {reach[chain[0][2]]}), default=0.0)
+                for chain in chains]
+
+    def bound(free, pose, wend, nxt, span):
+        earliest = min(free)
+        work = sum(r[k] for r, k in zip(rest, nxt))
+        work += sum(d for chain, d, k in zip(chains, approach, nxt) if k == 0 and reach[chain[0][2]] not in pose)
+        lb = max(span, (sum(free) + work) / n)
+        busy, head, tail = {}, {}, {}
+        for chain, r, k, ops in zip(chains, rest, nxt, station):
+            if k == len(chain):
+                continue
+            lb = max(lb, max(earliest, wend.get(f"slot:{chain[k][2]}", 0.0)) + r[k])
+            for sym, secs in ops[k].items():
+                busy[sym] = busy.get(sym, 0.0) + secs
+                # before the first op: the pick of the current leg unless the object is in the station
+                first = 0.0 if res_symbol(chain[k][2]) == sym else leg_time(chain[k][2], chain[k][3]) - durations["arm.place"]
+                head[sym] = min(head.get(sym, INF), first)
+            for _, _, src, dst in chain[k:]:
+                # after the last op: carrying a picked object on, or nothing if it ends in the station
+                sym = res_symbol(src)
+                if sym is not None:
+                    after = leg_time(src, dst) - durations["arm.pick"]
+                    tail[sym] = min(tail.get(sym, INF), after)
+            sym = res_symbol(chain[-1][3])
+            if sym is not None:
+                tail[sym] = 0.0
+        for sym, secs in busy.items():   # picks and places on a resource run one at a time
+            lb = max(lb, max(earliest, wend.get(sym, 0.0)) + head[sym] + secs + tail.get(sym, 0.0))
+        return lb
+
+    best = {"makespan": INF, "trail": None}
+    stats = {"expanded": 0, "timeout": False}
+
+    def expand(free, pose, at, wend, rend, nxt, span, trail, last):
+        if stats["timeout"] or bound(free, pose, wend, nxt, span) >= best["makespan"] - 1e-9:
+            return
+        if all(k == len(chain) for chain, k in zip(chains, nxt)):
+            if validator.goal_failure(st, goal, len(trail)) is None:
+                best["makespan"], best["trail"] = span, list(trail)
+            return
+        stats["expanded"] += 1
+        if stats["expanded"] % 256 == 0 and time.perf_counter() > deadline:
+            stats["timeout"] = True
+            return
+        children = []
+        for c, chain in enumerate(chains):
+            k = nxt[c]
+            if k == len(chain):
+                continue
+            role = roles.get(chain[k][0], [])
+            wanted = role[chain[k][1]] if chain[k][1] < len(role) else None
+            tried = set()
+            for a in range(n):
+                if wanted is not None and names[a] != wanted:
+                    continue
+                if (pose[a], at[a], free[a]) in tried:   # interchangeable with a robot already tried
+                    continue
+                tried.add((pose[a], at[a], free[a]))
+                steps = leg_steps(chain[k], names[a], at[a])
+                out, f, p, w, r, symbols = timed(steps, a, free[a], pose[a], wend, rend)
+                order = (out[0][2], c, a)   # canonical order of commuting legs: by start time
+                if last is not None and last[0][2] != a and not (symbols & last[1]) and order < last[0]:
+                    continue   # commutes with the previous leg and starts earlier: that order is expanded
+                children.append((f, c, a, out, p, w, r, symbols, order))
+        children.sort(key=lambda ch: (ch[0], ch[1], ch[2]))
+        for f, c, a, out, p, w, r, symbols, order in children:
+            mark = st.snapshot()
+            if all(validator.execute_step(st, len(trail) + j, step, world, actions, constraints) is None
+                   for j, (step, *_) in enumerate(out)):
+                free2, pose2, at2, nxt2 = list(free), list(pose), list(at), list(nxt)
+                free2[a], pose2[a], at2[a] = f, p, p
+                nxt2[c] += 1
+                trail.extend(out)
+                expand(free2, pose2, at2, w, r, nxt2, max(span, f), trail, (order, symbols))
+                del trail[len(trail) - len(out):]
+            st.rollback(mark)
+
+    free0 = [0.0] * n
+    pose0 = [_start_pose(world, name) for name in names]
+    nxt0 = [0] * len(chains)
+    root_bound = bound(free0, pose0, {}, nxt0, 0.0)
+    expand(free0, pose0, [None] * n, {}, {}, nxt0, 0.0, [], None)
+    optimal = not stats["timeout"]
+    lower = best["makespan"] if optimal else root_bound
+    return _result(best["trail"], best["makespan"], lower, stats["expanded"], optimal, stats["timeout"])
+
+
+def _result(trail, makespan, lower, expanded, optimal, timeout):
+    if trail is None:
+        return {"steps": None, "schedule": [], "makespan": None, "lower_bound": lower,
+                "optimal": optimal, "expanded": expanded, "timeout": timeout}
+    order = sorted(range(len(trail)), key=lambda i: (trail[i][2], i))
+    return {"steps": [trail[i][0] for i in order],
+            "schedule": [(j, trail[i][1], trail[i][2], trail[i][3]) for j, i in enumerate(order)],
+            "makespan": makespan, "lower_bound": lower, "optimal": optimal,
+            "expanded": expanded, "timeout": timeout}
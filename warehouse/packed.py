@@ -0,0 +1,303 @@
+"""
+Packed dataset container.
+
+A stage dataset is hundreds of small files (prompts/*.txt, gold/*.json,
+llm_outputs/<model>/*.json) read one by one after os.listdir, so at scale
+the cost is file-system metadata rather than bytes. A pack holds all of
+them in two files:
+
+    <name>.pack      append-only data: an 8-byte header, then the raw
+                     bytes of every file back to back
+    <name>.pack.idx  fixed-width index: a 16-byte header (magic, version,
+                     count), then one 128-byte entry per key, sorted by
+                     key: key (112 bytes, UTF-8, NUL padded), offset (u64),
+                     length (u32), CRC-32 (u32)
+
+Keys are paths relative to the dataset directory with "/" separators
+("gold/s3_case001.json"). Nothing is parsed on open: the first lookup
+reads the key column of the memory-mapped index into a dict in one pass
+(~0.7 us per entry), after which a case is one dict probe and one slice of
+the memory-mapped data file. keys(prefix) and listdir(subdir) replace
+os.listdir with a binary search over the sorted index.
+
+PackWriter(append=True) only appends to the data file and writes the
+index last (to a temporary file, then os.replace), so an interrupted
+writer leaves the previous index valid. A new pack (append=False, or no
+pack yet) is written to <name>.pack.tmp beside the old one; close()
+removes the old index, then moves the new data and index into place, so
+a reader finds the old pack, the new one, or no index (an error), never
+an index over the wrong data. Leaving a `with` block on an exception
+aborts instead of committing. Adding an existing key again appends the
+new bytes and the index points to them; the old ones stay as dead space.
+
+pack_dir / unpack_dir convert from and to the directory layout, so
+scripts reading files keep working:
+
+    python -m warehouse.packed pack S3/dataset S3/dataset/dataset.pack
+    python -m warehouse.packed unpack S3/dataset/dataset.pack /tmp/S3_dataset
+    python -m warehouse.packed ls S3/dataset/dataset.pack gold/
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+DATA_MAGIC = b"WHPD"
+INDEX_MAGIC = b"WHPX"
+VERSION = 1
+KEY_BYTES = 112
+_HEADER = struct.Struct("<4sIQ")                  # magic, version, count
+_ENTRY = struct.Struct(f"<{KEY_BYTES}sQII")       # key, offset, length, crc32
+_DATA_HEADER = struct.Struct("<4sI")              # magic, version
+SUBDIRS = ("prompts", "gold", "llm_outputs")
+
+
+def _key_bytes(key):
+    kb = key.encode("utf-8")
+    if len(kb) > KEY_BYTES or b"\0" in kb:
+        raise ValueError(f"pack key must be at most {KEY_BYTES} UTF-8 bytes without NUL: {key!r}")
+    return kb
+
+
+def _read_index(path):
+    """{key bytes: (offset, length, crc)} of an existing index."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    magic, version, count = _HEADER.unpack_from(raw)
+    if magic != INDEX_MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a version {VERSION} pack index")
+    entries = {}
+    for k in range(count):
+        kb, off, length, crc = _ENTRY.unpack_from(raw, _HEADER.size + k * _ENTRY.size)
+        entries[kb.rstrip(b"\0")] = (off, length, crc)
+    return entries
+
+
+class PackWriter:
+    """Appends files to a pack; the index is written by close() (or leaving the `with` block)."""
+
+    def __init__(self, path, append=True):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.entries = {}
+        self.append = append and os.path.exists(path) and os.path.exists(self.index_path)
+        if self.append:
+            self.entries = _read_index(self.index_path)
+            self._data = open(path, "ab")
+        else:   # a new pack is built beside the old one, which stays readable until close()
+            self._data = open(path + ".tmp", "wb")
+            self._data.write(_DATA_HEADER.pack(DATA_MAGIC, VERSION))
+        self.offset = self._data.tell()
+
+    def add(self, key, data):
+        """Append `data` (bytes or str) under `key`."""
+        kb = _key_bytes(key)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._data.write(data)
+        self.entries[kb] = (self.offset, len(data), zlib.crc32(data))
+        self.offset += len(data)
+
+    def add_json(self, key, value):
+        self.add(key, json.dumps(value, indent=2, ensure_ascii=False))
+
+    def close(self):
+        """Commit: write the index, and for a new pack swap its files in for the old ones."""
+        if self._data.closed:
+            return
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._data.close()
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(INDEX_MAGIC, VERSION, len(self.entries)))
+            for kb in sorted(self.entries):
+                f.write(_ENTRY.pack(kb, *self.entries[kb]))
+            f.flush()
+            os.fsync(f.fileno())
+        if not self.append:
+            # drop the old index first: a crash in between leaves no index (an error on open),
+            # never an old index over new data
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            os.replace(self.path + ".tmp", self.path)
+        os.replace(tmp, self.index_path)
+
+    def abort(self):
+        """Discard what was added: the pack on disk stays as it was (appended bytes become dead space)."""
+        if not self._data.closed:
+            self._data.close()
+            if not self.append:
+                os.remove(self.path + ".tmp")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class PackReader:
+    """Random access by key into a pack through memory-mapped data and index files."""
+
+    def __init__(self, path, verify=False):
+        self.path = path
+        self.verify = verify
+        with open(path + ".idx", "rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = _HEADER.unpack_from(self._index)
+        if magic != INDEX_MAGIC or version != VERSION or _DATA_HEADER.unpack_from(self._data) != (DATA_MAGIC, VERSION):
+            self.close()
+            raise ValueError(f"{path}: not a version {VERSION} pack")
+        self._keys = _Keys(self._index, self.count)
+        self._table = None   # key bytes -> (offset, length, crc), built on first lookup
+
+    def _find(self, key):
+        if self._table is None:
+            # one pass over the index on first lookup; a bisect per key costs ~20 probes from Python
+            entries = self._index[_HEADER.size:_HEADER.size + self.count * _ENTRY.size]
+            self._table = {kb.rstrip(b"\0"): (off, length, crc) for kb, off, length, crc in _ENTRY.iter_unpack(entries)}
+        return self._table.get(key.encode("utf-8"))
+
+    def get(self, key, default=None):
+        """Bytes stored under `key`, or `default`."""
+        entry = self._find(key)
+        if entry is None:
+            return default
+        off, length, crc = entry
+        data = self._data[off:off + length]
+        if len(data) != length:
+            raise ValueError(f"{self.path}: data file truncated at {key!r}")
+        if self.verify and zlib.crc32(data) != crc:
+            raise ValueError(f"{self.path}: CRC mismatch for {key!r}")
+        return data
+
+    def __getitem__(self, key):
+        data = self.get(key)
+        if data is None:
+            raise KeyError(key)
+        return data
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def text(self, key):
+        return self[key].decode("utf-8")
+
+    def json(self, key):
+        return json.loads(self[key])
+
+    def keys(self, prefix=""):
+        """Keys starting with `prefix`, sorted."""
+        pb = _key_bytes(prefix)
+        k = bisect.bisect_left(self._keys, pb)
+        out = []
+        while k < self.count:
+            kb = self._keys[k].rstrip(b"\0")
+            if not kb.startswith(pb):
+                break
+            out.append(kb.decode("utf-8"))
+            k += 1
+        return out
+
+    def listdir(self, subdir):
+        """File names directly under `subdir`, like os.listdir on the unpacked dataset."""
+        prefix = subdir.rstrip("/") + "/"
+        return [key[len(prefix):] for key in self.keys(prefix) if "/" not in key[len(prefix):]]
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._index.close()
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Keys:
+    """The index's key column as a sequence for bisect, read from the mmap on demand."""
+
+    def __init__(self, index, count):
+        self.index, self.count = index, count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, k):
+        start = _HEADER.size + k * _ENTRY.size
+        return self.index[start:start + KEY_BYTES]
+
+
+def pack_dir(src_dir, path, subdirs=SUBDIRS, append=False):
+    """Pack every file under `subdirs` of `src_dir` into `path`; returns the number of files."""
+    n = 0
+    with PackWriter(path, append=append) as writer:
+        for sub in subdirs:
+            top = os.path.join(src_dir, sub)
+            for root, dirs, files in os.walk(top):
+                dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+                for fname in sorted(files):
+                    full = os.path.join(root, fname)
+                    with open(full, "rb") as f:
+                        writer.add(os.path.relpath(full, src_dir).replace(os.sep, "/"), f.read())
+                    n += 1
+    return n
+
+
+def unpack_dir(path, out_dir, prefix=""):
+    """Write the files of a pack (those under `prefix`) back to the directory layout; returns the number."""
+    with PackReader(path, verify=True) as pack:
+        keys = pack.keys(prefix)
+        for key in keys:
+            full = os.path.join(out_dir, *key.split("/"))
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, "wb") as f:
+                f.write(pack[key])
+    return len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert stage datasets to and from packed containers.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("pack", help="pack a dataset directory")
+    p.add_argument("src", help="dataset directory, e.g. S3/dataset")
+    p.add_argument("pack", help="output pack, e.g. S3/dataset/dataset.pack")
+    p.add_argument("--subdirs", nargs="+", default=list(SUBDIRS))
+    p.add_argument("--append", action="store_true", help="add to an existing pack instead of replacing it")
+    u = sub.add_parser("unpack", help="write a pack back to a dataset directory")
+    u.add_argument("pack")
+    u.add_argument("out")
+    u.add_argument("--prefix", default="")
+    ls = sub.add_parser("ls", help="list the keys of a pack")
+    ls.add_argument("pack")
+    ls.add_argument("prefix", nargs="?", default="")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        n = pack_dir(args.src, args.pack, args.subdirs, args.append)
+        print(f"{n} files from {args.src} -> {args.pack} ({os.path.getsize(args.pack)} bytes)")
+    elif args.command == "unpack":
+        n = unpack_dir(args.pack, args.out, args.prefix)
+        print(f"{n} files from {args.pack} -> {args.out}")
+    else:
+        with PackReader(args.pack) as pack:
+            for key in pack.keys(args.prefix):
+                sys.stdout.write(key + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Peephole optimization of plans.
+
+Generated plans (and some gold plans) carry steps that change nothing or
+undo each other. `optimize_plan` removes them with a few local rules,
+looking at each robot's own step sequence (steps without "agent" belong
+to the first robot, as in the validators):
+
+    goto_noop    base.goto to the dock the robot is already at
+    goto_chain   base.goto immediately followed by another goto of the
+                 same robot: only the last one is driven (travel times
+                 obey the triangle inequality, so this never costs time)
+    wait_repeat  wait_until_free on a slot the same robot already waited
+                 for, with no step writing that slot or its resource
+                 (concurrency.footprint) in between
+    round_trip   arm.pick of an object followed, with only gotos of that
+                 robot in between, by its arm.place back into the same
+                 slot: the pick, the place and those gotos go
+
+A place followed by a pick of the same object from the same slot is kept:
+relay tasks prescribe it (via Worktable.slot, Inspection.slot) although
+the goal only checks the final slot.
+
+Every rewrite is proven with the stage validator before it is accepted:
+the rewritten plan must still execute (logic_ok) and reach the goal
+exactly when the original did; a rewrite that fails this (e.g. another
+robot uses the slot during a round trip) is skipped. Plans that do not
+execute are returned unchanged, as their steps after the failure mean
+nothing to the validator.
+"""
+from warehouse.concurrency import footprint
+from warehouse.constraints import compile_constraints
+
+RULES = ("goto_noop", "goto_chain", "wait_repeat", "round_trip")
+
+
+def _agent(step, default):
+    agent = step.get("agent", default)
+    return agent if isinstance(agent, str) or agent is None else repr(agent)
+
+
+def _candidates(world, steps, actions, resources):
+    """Yield (rule, plan indices to delete) in plan order."""
+    default = next(iter(world.get("robots", {})), None)
+    at = {}        # agent -> dock after its last goto
+    last = {}      # agent -> plan index of its previous step
+    gotos = {}     # agent -> plan indices of its gotos since its last non-goto step
+    waited = {}    # (agent, slot) -> symbols read by that wait, while nothing wrote them
+    picked = {}    # agent -> (index of its last pick, object, slot) while only gotos followed
+    for i, step in enumerate(steps):
+        agent, action = _agent(step, default), step.get("action")
+        prev = last.get(agent)
+        if action == "base.goto":
+            target = step.get("target")
+            if at.get(agent) == target:
+                yield "goto_noop", (i,)
+            elif prev is not None and steps[prev].get("action") == "base.goto":
+                yield "goto_chain", (prev,)
+            at[agent] = target
+            gotos.setdefault(agent, []).append(i)
+        else:
+            if action == "wait_until_free":
+                key = (agent, step.get("target"))
+                if key in waited:
+                    yield "wait_repeat", (i,)
+            elif action == "arm.place" and agent in picked:
+                j, obj, slot = picked[agent]
+                if (step.get("object"), step.get("to")) == (obj, slot):
+                    yield "round_trip", (j, *gotos.get(agent, []), i)
+            picked.pop(agent, None)
+            if action == "arm.pick":
+                picked[agent] = (i, step.get("object"), step.get("from"))
+            gotos[agent] = []
+        reads, writes = footprint(step, actions, resources)
+        if writes:
+            waited = {k: r for k, r in waited.items() if not (r & writes)}
+        if action == "wait_until_free":
+            waited[(agent, step.get("target"))] = reads
+        last[agent] = i
+
+
+def optimize_plan(validator, world, plan, actions, constraints=None, goal=None):
+    """
+    Returns {"steps", "removed", "before", "after", "rejected", "verdict"}:
+    the optimized step list, {rule: steps removed}, step counts before and
+    after, the number of rewrites the validator refused, and
+    (logic_ok, goal_ok) of the original plan, which the result shares.
+    """
+    constraints = compile_constraints(constraints)
+    steps = plan.get("steps") if isinstance(plan, dict) else None
+    removed = dict.fromkeys(RULES, 0)
+    if not isinstance(steps, list) or not all(isinstance(s, dict) for s in steps):
+        return {"steps": steps, "removed": removed, "before": None, "after": None, "rejected": 0,
+                "verdict": (False, False)}
+
+    def verdict(candidate):
+        r = validator.validate(world, {"steps": candidate}, actions, constraints, goal)
+        return r["logic_ok"], r["goal_ok"]
+
+    want = verdict(steps)
+    resources = getattr(validator.init_symbolic_state(world), "resources", None)
+    out = list(steps)
+    rejected = set()   # ids of the steps of refused rewrites
+    if want[0]:
+        changed = True
+        while changed:
+            changed = False
+            for rule, drop in _candidates(world, out, actions, resources):
+                key = tuple(id(out[i]) for i in drop)
+                if key in rejected:
+                    continue
+                trial = [s for i, s in enumerate(out) if i not in drop]
+                if verdict(trial) != want:
+                    rejected.add(key)
+                    continue
+                out, changed = trial, True
+                removed[rule] += len(drop)
+                break
+    return {"steps": out, "removed": removed, "before": len(steps), "after": len(out),
+            "rejected": len(rejected), "verdict": want}
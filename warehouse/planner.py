@@ -0,0 +1,391 @@
+"""
+Forward-search planner over a stage's action spec.
+
+`find_plan` searches from the world's initial state for a shortest step
+list after which the goal ({object: slot}) holds, using the stage
+validator itself as the transition function: the successors of a state
+are the grounded steps (warehouse.grounding) that execute_step accepts,
+so every returned plan passes validate() with the same constraints, and
+a new stage needs no planner-side model.
+
+States are deduplicated by their incremental hash (SymbolicState.zhash)
+in a TranspositionTable holding the least cost seen per state. Search is
+A* with unit step costs and one of the heuristics
+
+    "ff"      FF relaxed-plan length, with h_add best supporters (default;
+              not admissible, so plans are usually but not always shortest)
+    "lmcut"   LM-cut (admissible and much tighter than h_max: shortest)
+    "max"     h_max of the delete relaxation (admissible: shortest)
+    "blind"   h = 0, i.e. breadth-first search (shortest)
+
+Heuristics are evaluated lazily: a child is queued with its parent's
+h - 1 and evaluated only when it comes off the queue. Ties on f go to
+the lower h, then to the steps of the parent's relaxed plan that were
+applicable in it (FF's helpful actions), then to the newest node.
+
+The relaxation is built once per candidate set from the grounded steps'
+required facts and the facts their effects add ("occ", slot, object),
+("holding", agent, object) and ("at", agent, dock); constraints and
+resource capacities are left to execute_step.
+
+Robots are interchangeable for every check of the stage validators, so
+of several robots at the same place holding the same object (all idle
+robots at the start, say) only the first one is given moves; the others
+would only lead to renamed copies of the same states.
+
+`via` plans through landmark goals in order, each segment from where the
+previous one ended, e.g. S1's "via Worktable.slot" tasks:
+
+    find_plan(validator, world, ACTIONS, {"redbox": "RedBin.slot"},
+              via=[{"redbox": "Worktable.slot"}])
+"""
+import copy
+import heapq
+import itertools
+import time
+
+from warehouse.constraints import compile_constraints
+from warehouse.grounding import ground_steps, successors
+from warehouse.zobrist import TranspositionTable
+
+HEURISTICS = ("lmcut", "max", "ff", "blind")
+BUDGET = 10.0   # seconds per plan
+INF = float("inf")
+
+
+def _adds(step, spec):
+    """Facts the effects of a grounded step make true."""
+    agent = step.get("agent")
+    facts = []
+    for name, *keys in spec.get("eff", []):
+        if name == "set_at":
+            facts.append(("at", agent, step[keys[0]]))
+        elif name == "slot_set":
+            facts.append(("occ", step[keys[0]], step[keys[1]] if keys[1] is not None else None))
+        elif name == "holding_set":
+            facts.append(("holding", agent, step[keys[0]] if keys[0] is not None else None))
+    return facts
+
+
+def state_facts(st):
+    """The ("occ" / "holding" / "at", key, value) facts of a symbolic state."""
+    slots = st.index.slots
+    facts = [("occ", slots[s], obj) for s, obj in enumerate(st.occ)]
+    if type(st.holding) is list:   # multi-robot stages: indexed by agent id
+        for agent, held, at in zip(st.index.agents, st.holding, st.agent_at):
+            facts += [("holding", agent, held), ("at", agent, at)]
+    else:
+        facts += [("holding", None, st.holding), ("at", None, st.agent_at)]
+    return facts
+
+
+class RelaxedTask:
+    """Delete relaxation of a set of grounded steps, with h_max, LM-cut and h_FF."""
+
+    def __init__(self, candidates, actions):
+        self.fact_id = {}
+        self.steps = [step for step, _ in candidates]
+        self.pre, self.add = [], []
+        for step, requires in candidates:
+            self.pre.append(sorted({self._intern(f) for f in requires}))
+            self.add.append([self._intern(f) for f in _adds(step, actions[step["action"]])])
+        self.pre_of = [[] for _ in self.fact_id]
+        for a, pre in enumerate(self.pre):
+            for f in pre:
+                self.pre_of[f].append(a)
+        self.achievers = [[] for _ in self.fact_id]
+        for a, add in enumerate(self.add):
+            for f in add:
+                self.achievers[f].append(a)
+        self.n_pre = [len(pre) for pre in self.pre]
+        self.free = [a for a, pre in enumerate(self.pre) if not pre]
+
+    def _intern(self, fact):
+        return self.fact_id.setdefault(fact, len(self.fact_id))
+
+    def _explore(self, init, goals, additive):
+        """Cost of each fact (max or sum over preconditions, +1 per step) until all goals are reached."""
+        cost = [INF] * len(self.fact_id)
+        support = [-1] * len(self.fact_id)
+        remaining = self.n_pre[:]
+        acost = [0] * len(remaining)
+        pre_of, add = self.pre_of, self.add
+        push, pop = heapq.heappush, heapq.heappop
+        heap = []
+        for f in init:
+            cost[f] = 0
+            heap.append((0, f))
+        for a in self.free:
+            for g in add[a]:
+                if 1 < cost[g]:
+                    cost[g], support[g] = 1, a
+                    heap.append((1, g))
+        heapq.heapify(heap)
+        left = {g for g in goals if cost[g] > 0}
+        while heap and left:
+            c, f = pop(heap)
+            if c > cost[f]:
+                continue
+            left.discard(f)
+            for a in pre_of[f]:
+                remaining[a] -= 1
+                if additive:
+                    acost[a] += c
+                elif c > acost[a]:
+                    acost[a] = c
+                if remaining[a] == 0:
+                    ca = acost[a] + 1
+                    for g in add[a]:
+                        if ca < cost[g]:
+                            cost[g], support[g] = ca, a
+                            push(heap, (ca, g))
+        return cost, support
+
+    def _hmax(self, init, step_cost):
+        """h_max of every fact under `step_cost`, and each step's costliest precondition (-1: none)."""
+        cost = [INF] * len(self.fact_id)
+        pcf = [-1] * len(self.pre)
+        remaining = self.n_pre[:]
+        pre_of, add = self.pre_of, self.add
+        push, pop = heapq.heappush, heapq.heappop
+        heap = []
+        for f in init:
+            cost[f] = 0
+            heap.append((0, f))
+        for a in self.free:
+            for g in add[a]:
+                if step_cost[a] < cost[g]:
+                    cost[g] = step_cost[a]
+                    heap.append((step_cost[a], g))
+        heapq.heapify(heap)
+        while heap:
+            c, f = pop(heap)
+            if c > cost[f]:
+                continue
+            for a in pre_of[f]:
+                remaining[a] -= 1
+                if remaining[a] == 0:   # popped last, so f is the costliest precondition
+                    pcf[a] = f
+                    ca = c + step_cost[a]
+                    for g in add[a]:
+                        if ca < cost[g]:
+                            cost[g] = ca
+                            push(heap, (ca, g))
+        return cost, pcf
+
+    def _cut(self, init, goals, step_cost, cost, pcf):
+        """Steps of the LM-cut landmark: reachable along h_max supporters, adding a goal-zone fact."""
+        top = max(goals, key=cost.__getitem__)
+        zone, stack = set(), [top]
+        while stack:   # facts reaching the goal through zero-cost steps
+            f = stack.pop()
+            if f in zone:
+                continue
+            zone.add(f)
+            for a in self.achievers[f]:
+                if step_cost[a] == 0 and pcf[a] != -1:
+                    stack.append(pcf[a])
+        cut, reached = set(), set(init)
+        stack = [(f, self.pre_of[f]) for f in init] + [(-1, self.free)]
+        while stack:
+            f, steps = stack.pop()
+            for a in steps:
+                if pcf[a] != f:
+                    continue
+                for g in self.add[a]:
+                    if g in zone:
+                        cut.add(a)
+                    elif g not in reached:
+                        reached.add(g)
+                        stack.append((g, self.pre_of[g]))
+        return cut
+
+    def _ids(self, st, goal):
+        """(ids of the state's facts, ids of the goal facts), or None if a goal fact is unreachable."""
+        init = [self.fact_id[f] for f in state_facts(st) if f in self.fact_id]
+        goals = []
+        for obj, slot in goal.items():
+            fact = ("occ", slot, obj)
+            if fact in self.fact_id:
+                goals.append(self.fact_id[fact])
+            elif st.occ_of(slot) != obj:
+                return None
+        return init, goals
+
+    def h_max(self, st, goal):
+        ids = self._ids(st, goal)
+        if ids is None:
+            return INF
+        cost, _ = self._explore(ids[0], ids[1], additive=False)
+        return max((cost[g] for g in ids[1]), default=0)
+
+    def h_lmcut(self, st, goal):
+        ids = self._ids(st, goal)
+        if ids is None:
+            return INF
+        init, goals = ids
+        if not goals:
+            return 0
+        step_cost = [1] * len(self.pre)
+        h = 0
+        while True:
+            cost, pcf = self._hmax(init, step_cost)
+            top = max(cost[g] for g in goals)
+            if top == 0 or top == INF:
+                return h if top == 0 else INF
+            cut = self._cut(init, goals, step_cost, cost, pcf)
+            m = min(step_cost[a] for a in cut)
+            h += m
+            for a in cut:
+                step_cost[a] -= m
+
+    def relaxed_plan(self, st, goal):
+        """(h_FF, ids of the relaxed plan's steps applicable in `st`: the helpful steps)."""
+        ids = self._ids(st, goal)
+        if ids is None:
+            return INF, ()
+        cost, support = self._explore(ids[0], ids[1], additive=True)
+        relaxed, stack = set(), list(ids[1])
+        while stack:
+            f = stack.pop()
+            if cost[f] == INF:
+                return INF, ()
+            a = support[f]
+            if cost[f] > 0 and a not in relaxed:
+                relaxed.add(a)
+                stack.extend(self.pre[a])
+        return len(relaxed), {id(self.steps[a]) for a in relaxed if all(cost[f] == 0 for f in self.pre[a])}
+
+    def h_ff(self, st, goal):
+        return self.relaxed_plan(st, goal)[0]
+
+
+_RELAXED = {}   # id(candidates) -> (candidates, RelaxedTask)
+
+
+def _relaxed_task(candidates, actions):
+    cached = _RELAXED.get(id(candidates))
+    if cached is None or cached[0] is not candidates:
+        if len(_RELAXED) >= 16:
+            _RELAXED.clear()
+        cached = _RELAXED[id(candidates)] = (candidates, RelaxedTask(candidates, actions))
+    return cached[1]
+
+
+def find_plan(validator, world, actions, goal, constraints=None, heuristic="ff",
+              budget=BUDGET, candidates=None, via=None, symmetry=True):
+    """
+    Returns {"steps", "length", "expanded", "generated", "evaluated", "timeout", "tt"}.
+    steps is None when the goal is unreachable or the budget ran out
+    (timeout tells which); tt is the transposition table's stats() of the
+    last segment. `candidates` are the world's grounded steps when reused
+    across calls (StageProfile.candidates); `via` a list of landmark goals
+    reached in order before `goal`. With `symmetry`, of several robots in
+    the same place holding the same thing only the first is moved.
+    """
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"unknown heuristic '{heuristic}', expected one of {list(HEURISTICS)}")
+    constraints = compile_constraints(constraints)
+    if candidates is None:
+        candidates = ground_steps(world, actions, getattr(validator, "ACTION_SCHEMA", None))
+    relaxed = _relaxed_task(candidates, actions)
+    if heuristic == "ff":
+        evaluate = relaxed.relaxed_plan
+    else:
+        h = {"lmcut": relaxed.h_lmcut, "max": relaxed.h_max, "blind": lambda st, goal: 0}[heuristic]
+        evaluate = lambda st, goal: (h(st, goal), ())
+    deadline = time.perf_counter() + budget
+
+    st = validator.init_symbolic_state(world)
+    steps, stats = [], {"expanded": 0, "generated": 0, "evaluated": 0, "timeout": False, "tt": None}
+    for target in [*(via or []), goal or {}]:
+        segment, st = _search(validator, st, target, world, actions, constraints, candidates, evaluate, symmetry, deadline, stats)
+        if segment is None:
+            return {"steps": None, "length": None, **stats}
+        steps += segment
+    return {"steps": steps, "length": len(steps), **stats}
+
+
+def _twins(st):
+    """Agents holding the same object at the same place as a lower-numbered agent."""
+    if type(st.holding) is not list:
+        return None
+    seen, twins = set(), set()
+    for agent, key in zip(st.index.agents, zip(st.holding, st.agent_at)):
+        if key in seen:
+            twins.add(agent)
+        seen.add(key)
+    return twins
+
+
+def _search(validator, st, goal, world, actions, constraints, candidates, evaluate, symmetry, deadline, stats):
+    """A* from `st` to `goal`: (steps, final state), or (None, None)."""
+    goal_ids = [(st.index.slot_id.get(slot), obj) for obj, slot in goal.items()]
+    if any(s is None for s, _ in goal_ids):
+        return None, None
+
+    def reached(s):
+        return all(s.occ[i] == obj for i, obj in goal_ids)
+
+    root = st.zhash
+    best = TranspositionTable()   # state hash -> least number of steps seen
+    best.put(root, 0)
+    origin = {root: None}   # state hash -> (parent hash, step) of its best path
+    state_of = {root: st}   # state hash -> SymbolicState, for evaluated states
+    helpful_of = {}         # state hash -> helpful steps, for requeued states
+    counter = itertools.count(0, -1)
+    # (f, h, 0 if helpful for the parent else 1, tie, g, state hash, h exact).
+    # Children are queued with their parent's h - 1, a lower bound for a
+    # consistent h, and evaluated when popped, so most generated states are
+    # never evaluated; ties go to the deepest, newest node.
+    heap = [(0, 0, 0, next(counter), 0, root, False)]
+
+    def materialize(key):
+        s = state_of.get(key)
+        if s is None:
+            parent, step = origin[key]
+            s = copy.deepcopy(materialize(parent))
+            validator.execute_step(s, -1, step, world, actions, constraints)
+            state_of[key] = s
+        return s
+
+    while heap:
+        f, hk, _, _, g, key, exact = heapq.heappop(heap)
+        if best.get(key, g) < g:
+            continue
+        s = materialize(key)
+        if reached(s):
+            path = []
+            while origin[key] is not None:
+                key, step = origin[key]
+                path.append(step)
+            stats["tt"] = best.stats()
+            return path[::-1], s
+        if not exact:
+            hk, helpful = evaluate(s, goal)
+            stats["evaluated"] += 1
+            if hk == INF:
+                continue
+            if g + hk > f:
+                helpful_of[key] = helpful
+                heapq.heappush(heap, (g + hk, hk, 0, next(counter), g, key, True))
+                continue
+        else:
+            helpful = helpful_of.pop(key, ())
+        stats["expanded"] += 1
+        if stats["expanded"] % 64 == 0 and time.perf_counter() > deadline:
+            stats["timeout"] = True
+            break
+        twins = _twins(s) if symmetry else None
+        moves = [c for c in candidates if c[0].get("agent") not in twins] if twins else candidates
+        hn = max(hk - 1, 0)
+        for step in successors(validator, s, moves, world, actions, constraints):
+            nkey = s.zhash
+            if g + 1 >= best.get(nkey, INF):
+                continue
+            best.put(nkey, g + 1)
+            origin[nkey] = (key, step)
+            stats["generated"] += 1
+            heapq.heappush(heap, (g + 1 + hn, hn, id(step) not in helpful, next(counter), g + 1, nkey, False))
+    stats["tt"] = best.stats()
+    return None, None
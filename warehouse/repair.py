@@ -0,0 +1,231 @@
+"""
+Minimal repair distance (RD).
+
+RD is the least number of step insertions, deletions and substitutions
+that turn a plan into one the stage validator accepts with the goal
+satisfied; 0 for a successful plan. It is found by A* over
+(plan position, symbolic state):
+
+    keep step p       cost 0, if execute_step accepts it
+    delete step p     cost 1
+    substitute p      cost 1, by any applicable grounded step
+    insert before p   cost 1, any applicable grounded step
+
+Inserted and substituted steps come from warehouse.grounding (steps with
+effects only; an inserted wait changes nothing). The heuristic counts the
+misplaced goal objects whose final place, and whose pick when not held,
+does not occur among the remaining plan steps, plus the docks those
+picks and places happen at that no robot is at and no remaining step
+drives to: each of those operations needs its own edit, and no single
+step removes more than one, so the estimate is admissible and
+consistent. States are keyed by their incremental 64-bit hash
+(SymbolicState.zhash), and a bounded TranspositionTable keyed by
+(position, state hash) keeps the best cost seen per node; an evicted
+node is only expanded again.
+
+The Levenshtein distance to a reference plan that reaches the goal (the
+gold plan) is an upper bound: nodes that cannot beat it are pruned, the
+search stops once the lower bound reaches it, and it is reported with the
+best lower bound proven so far when the per-case time budget runs out.
+"""
+import copy
+import heapq
+import itertools
+import json
+import time
+
+from warehouse.constraints import compile_constraints
+from warehouse.grounding import ground_steps, successors
+from warehouse.zobrist import TranspositionTable
+
+BUDGET = 1.0   # seconds per plan
+INF = float("inf")
+
+
+def _view(st):
+    """(occupancy, holding, position(s)) read by the heuristic; zhash hashes exactly these."""
+    holding = st.holding if type(st.holding) is not list else tuple(st.holding)
+    at = st.agent_at if type(st.agent_at) is not list else tuple(st.agent_at)
+    return tuple(st.occ), holding, at
+
+
+def step_edit_distance(a, b):
+    """Levenshtein distance between two step lists (steps compared as JSON)."""
+    a = [json.dumps(s, sort_keys=True) for s in a]
+    b = [json.dumps(s, sort_keys=True) for s in b]
+    prev = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        cur = [i]
+        for j, y in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (x != y)))
+        prev = cur
+    return prev[-1]
+
+
+def _remaining_ops(steps):
+    """suffix[p] = (objects picked, (object, slot) placed, poses visited) by steps[p:]."""
+    picks, places, gotos = set(), set(), set()
+    suffix = [None] * (len(steps) + 1)
+    suffix[-1] = (frozenset(), frozenset(), frozenset())
+    for p in range(len(steps) - 1, -1, -1):
+        s = steps[p]
+        if isinstance(s, dict):
+            try:
+                if s.get("action") == "arm.pick":
+                    picks.add(s.get("object"))
+                elif s.get("action") == "arm.place":
+                    places.add((s.get("object"), s.get("to")))
+                elif s.get("action") == "base.goto":
+                    gotos.add(s.get("target"))
+            except TypeError:   # unhashable names: the step cannot be kept anyway
+                pass
+        suffix[p] = (frozenset(picks), frozenset(places), frozenset(gotos))
+    return suffix
+
+
+def repair_distance(validator, world, plan, actions, constraints=None, goal=None,
+                    reference=None, budget=BUDGET, candidates=None):
+    """
+    Returns {"distance", "lower_bound", "upper_bound", "repaired", "expanded", "timeout", "tt"}
+    with tt the transposition table's stats().
+    distance is None when the budget ran out before it was proven; repaired
+    is a minimal repaired step list (None on timeout). `reference` is a
+    known goal-reaching step list for the upper bound; `candidates` the
+    grounded steps (ground_steps of the world) when reused across plans.
+    """
+    constraints = compile_constraints(constraints)
+    goal = goal or {}
+    steps = plan.get("steps") if isinstance(plan, dict) else None
+    steps = steps if isinstance(steps, list) else []
+    if candidates is None:
+        candidates = ground_steps(world, actions, getattr(validator, "ACTION_SCHEMA", None))
+    upper = step_edit_distance(steps, reference) if reference is not None else INF
+    suffix = _remaining_ops(steps)
+    n = len(steps)
+    deadline = time.perf_counter() + budget
+
+    st = validator.init_symbolic_state(world)
+    index = st.index
+    reach = world.get("reachability_map", {})
+    goal_ids = [(obj, index.slot_id.get(slot), reach.get(slot)) for obj, slot in goal.items()]
+
+    def h(skey, p):
+        """Edits still needed: missing final places and picks, plus gotos to unmanned docks they need."""
+        occ, holding, at = view[skey]
+        picks, places, gotos = suffix[p]
+        held = set(holding) if type(holding) is tuple else {holding}
+        at = set(at) if type(at) is tuple else {at}
+        need, docks = 0, set()
+        for obj, s, dock in goal_ids:
+            if s is not None and occ[s] == obj:
+                continue
+            if (obj, goal[obj]) not in places:
+                need += 1
+            docks.add(dock)
+            if obj not in held:
+                if obj not in picks:
+                    need += 1
+                if obj in occ:
+                    docks.add(reach.get(index.slots[occ.index(obj)]))
+        return need + sum(1 for d in docks if d is not None and d not in at and d not in gotos)
+
+    # States do not depend on the plan position, so they are materialized and
+    # expanded once per distinct state and shared by all nodes reaching them.
+    # A state is keyed by its incremental hash (SymbolicState.zhash).
+    root = st.zhash
+    view = {root: _view(st)}   # state key -> (occ, holding, at) for the heuristic
+    state_of = {root: st}   # state key -> SymbolicState, built on first expansion
+    origin = {}             # state key -> (parent state key, step) it was first reached by
+    succ = {}               # state key -> [(grounded step, next state key)] for applicable steps
+    kept = {}               # (state key, p) -> next state key if plan step p executes, else None
+
+    def materialize(skey):
+        s = state_of.get(skey)
+        if s is None:
+            parent, step = origin[skey]
+            s = copy.deepcopy(materialize(parent))
+            validator.execute_step(s, -1, step, world, actions, constraints)
+            state_of[skey] = s
+        return s
+
+    def transition(skey, s, step, p):
+        """Next state key of `step` from `s`, or None if execute_step rejects it; `s` is restored."""
+        mark = s.snapshot()
+        failure = validator.execute_step(s, p, step, world, actions, constraints)
+        nkey = None if failure else s.zhash
+        if nkey is not None and nkey not in view:
+            view[nkey] = _view(s)
+            origin[nkey] = (skey, step)
+        s.rollback(mark)
+        return nkey
+
+    # nodes[id] = (parent id, step executed or None, plan position, state key)
+    nodes = [(None, None, 0, root)]
+    best = TranspositionTable()   # (position, state) -> least edits seen
+    best.put((0, root), 0)
+    counter = itertools.count()
+    heap = [(h(root, 0), 0, next(counter), 0)]
+    expanded = 0
+    lower = 0
+
+    def push(node_id, g2, step, q, skey):
+        key = (q, skey)
+        if g2 < best.get(key, INF) and g2 <= upper:
+            best.put(key, g2)
+            nodes.append((node_id, step, q, skey))
+            heapq.heappush(heap, (g2 + h(skey, q), g2, next(counter), len(nodes) - 1))
+
+    def result(distance, repaired, timeout):
+        return {"distance": distance, "lower_bound": distance if distance is not None else lower,
+                "upper_bound": distance if distance is not None else (None if upper == INF else upper),
+                "repaired": repaired, "expanded": expanded, "timeout": timeout, "tt": best.stats()}
+
+    while heap:
+        f, g, _, node_id = heapq.heappop(heap)
+        if f >= upper:   # nothing shorter than the reference exists
+            break
+        _, _, p, skey = nodes[node_id]
+        if best.get((p, skey), g) < g:
+            continue
+        lower = max(lower, f)
+        if p == n and (not goal or h(skey, n) == 0) and \
+                validator.goal_failure(materialize(skey), goal, n) is None:
+            return result(g, _repaired(nodes, node_id), False)
+        expanded += 1
+        if expanded % 256 == 0 and time.perf_counter() > deadline:
+            return result(None, None, True)
+
+        if p < n:
+            if (skey, p) not in kept:
+                kept[(skey, p)] = transition(skey, materialize(skey), steps[p], p) if isinstance(steps[p], dict) else None
+            if kept[(skey, p)] is not None:
+                push(node_id, g, steps[p], p + 1, kept[(skey, p)])
+            push(node_id, g + 1, None, p + 1, skey)   # delete
+        if skey not in succ:
+            succ[skey] = []
+            s = materialize(skey)
+            for cand in successors(validator, s, candidates, world, actions, constraints):
+                nkey = s.zhash
+                if nkey not in view:
+                    view[nkey] = _view(s)
+                    origin[nkey] = (skey, cand)
+                succ[skey].append((cand, nkey))
+        for cand, nkey in succ[skey]:
+            push(node_id, g + 1, cand, p, nkey)           # insert
+            if p < n:
+                push(node_id, g + 1, cand, p + 1, nkey)   # substitute
+
+    if upper != INF:
+        lower = upper
+        return result(upper, list(reference), False)
+    return result(None, None, False)
+
+
+def _repaired(nodes, node_id):
+    out = []
+    while node_id is not None:
+        parent, step, _, _ = nodes[node_id]
+        if step is not None:
+            out.append(step)
+        node_id = parent
+    return out[::-1]
@@ -0,0 +1,125 @@
+"""
+Capacity-aware shared resources declared in the world definition.
+
+A world may declare
+
+    world["resources"] = {
+        "Inspection": {"slots": ["Inspection.slot"], "capacity": 1},
+        "Packing":    {"slots": ["Pack.1.slot", "Pack.2.slot", "Pack.3.slot"]},
+    }
+
+Each resource groups one or more slots and admits at most `capacity` of
+them to be occupied at once (default: one unit per slot). A mutex is one
+slot with capacity 1, a K-slot buffer is K slots, several identical
+stations are one slot each under a shared name, and capacity may be lower
+than the number of slots (e.g. three bays served by two operators).
+
+ResourceSpec holds the static declarations and is built once per world;
+ResourceTable is the per-state bookkeeping the validators use: O(1)
+acquire/release on an in-use counter per resource, plus FIFO wait queues
+for executives and simulators that block agents on a full resource.
+"""
+from collections import deque
+
+
+class ResourceSpec:
+    """Static resource declarations of one world, interned to integer ids."""
+    __slots__ = ("names", "resource_id", "capacity", "slots", "slot_resource")
+
+    def __init__(self, world):
+        self.names = []
+        self.resource_id = {}
+        self.capacity = []
+        self.slots = []
+        self.slot_resource = {}     # slot → resource id
+        for name, decl in world.get("resources", {}).items():
+            slots = list(decl.get("slots", []))
+            capacity = decl.get("capacity", len(slots))
+            if not isinstance(capacity, int) or capacity < 0:
+                raise ValueError(f"resource '{name}': capacity must be a non-negative int, got {capacity!r}")
+            rid = len(self.names)
+            for slot in slots:
+                if slot not in world["slots"]:
+                    raise ValueError(f"resource '{name}': unknown slot '{slot}'")
+                if slot in self.slot_resource:
+                    other = self.names[self.slot_resource[slot]]
+                    raise ValueError(f"slot '{slot}' belongs to both '{other}' and '{name}'")
+                self.slot_resource[slot] = rid
+            self.names.append(name)
+            self.resource_id[name] = rid
+            self.capacity.append(capacity)
+            self.slots.append(slots)
+
+    def __len__(self):
+        return len(self.names)
+
+
+class ResourceTable:
+    """
+    Units in use and waiting agents per resource.
+
+    acquire/release change `in_use` (and the count of over-capacity
+    resources, which only the initial occupancy can produce) through
+    `log` when it is set, using the same (container, key, old) entries as
+    the symbolic state's undo log. Wait queues are not logged.
+    """
+    __slots__ = ("spec", "in_use", "over", "queues", "log")
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.in_use = [0] * len(spec)
+        self.over = 0           # resources currently above capacity
+        self.queues = {}        # resource id → deque of waiting agents
+        self.log = None
+
+    def resource_of(self, slot):
+        """Resource id of `slot`, or None for unmanaged slots."""
+        return self.spec.slot_resource.get(slot)
+
+    def available(self, rid):
+        return self.spec.capacity[rid] - self.in_use[rid]
+
+    def _count(self, rid, delta):
+        n = self.in_use[rid] + delta
+        if self.log is not None:
+            self.log.append((self.in_use, rid, self.in_use[rid]))
+        self.in_use[rid] = n
+        cap = self.spec.capacity[rid]
+        if (n > cap) != (n - delta > cap):
+            if self.log is not None:
+                self.log.append((self, "over", self.over))
+            self.over += 1 if n > cap else -1
+
+    def acquire(self, rid, force=False):
+        """Take one unit of `rid`; returns False (and changes nothing) when full."""
+        if not force and self.in_use[rid] >= self.spec.capacity[rid]:
+            return False
+        self._count(rid, 1)
+        return True
+
+    def release(self, rid):
+        if self.in_use[rid] <= 0:
+            raise ValueError(f"release of idle resource '{self.spec.names[rid]}'")
+        self._count(rid, -1)
+
+    def over_capacity(self):
+        return [self.spec.names[r] for r, n in enumerate(self.in_use) if n > self.spec.capacity[r]]
+
+    # --- Wait queues ---
+    def enqueue(self, rid, who):
+        self.queues.setdefault(rid, deque()).append(who)
+
+    def dequeue(self, rid):
+        """Pop the longest-waiting agent of `rid`, or None."""
+        q = self.queues.get(rid)
+        return q.popleft() if q else None
+
+    def waiting(self, rid):
+        return tuple(self.queues.get(rid, ()))
+
+    def copy(self):
+        new = ResourceTable(self.spec)
+        new.in_use = self.in_use[:]
+        new.over = self.over
+        new.queues = {rid: deque(q) for rid, q in self.queues.items() if q}
+        return new
@@ -0,0 +1,284 @@
+"""
+Parametric scenario generator.
+
+The stage generate_dataset.py scripts write 100 cases of one fixed world.
+`generate_tasks` builds a fresh world per task from parameters:
+
+    robots       robots robot0..robotN-1, all starting at Shelf.0.dock
+    objects      boxes to deliver, named <category>box<k>
+    shelves      shelves Shelf.s (own dock); box k goes to shelf k mod
+                 shelves, so every shelf holds a box (at most one shelf
+                 per box: the count is capped at objects)
+    stations     shared stations Station.j.slot (own dock, capacity 1,
+                 declared in world["resources"])
+    relay_depth  stations every box must pass on its way to its bin
+    categories   box categories; bins are grouped by category, Bin.<c>.k.slot
+    bin_rules    allowed_targets of the bins: "none", "slot" (one exact
+                 rule per bin slot) or "zone" (one Bin.<c>.* pattern per
+                 category); anything else is a ValueError
+
+Each parameter is a number or an inclusive (lo, hi) range drawn per task.
+A task record holds the world (JSON: poses as a sorted list; world_of()
+restores it), the goal in the datasets' {slot: object} form, the
+constraints, the relay route of every box, a prompt in the style of the
+stage prompts and a gold plan. Gold plans move the boxes one after the
+other, each leg by the next robot in turn (a handover at every station),
+with a wait_until_free before every station place; every gold is checked
+with the stage validator (S4 by default) before it is emitted, and
+warehouse.schedule recovers the parallelism between robots.
+
+Tasks are produced lazily from (seed, task number), and write_shards
+streams them to JSONL shards of `shard_size` lines plus a manifest, so
+10^5+ tasks never sit in memory together:
+
+    python -m warehouse.scenarios --tasks 100000 --robots 2-8 --objects 4-16 \\
+        --stations 1-3 --relay-depth 0-2 --bin-rules zone --out scenarios/
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import time
+
+CATEGORIES = ("red", "blue", "green", "yellow", "white", "black", "orange", "purple")
+BIN_RULES = ("none", "slot", "zone")
+DEFAULTS = {"robots": (2, 4), "objects": (2, 8), "shelves": (1, 4), "stations": (1, 2),
+            "relay_depth": (0, 1), "categories": (1, 3)}
+
+
+def _draw(rng, value):
+    return rng.randint(*value) if isinstance(value, (tuple, list)) else int(value)
+
+
+def make_world(n_robots, n_objects, n_shelves, n_stations, n_categories, rng):
+    """World dict (poses as a set) and {box: category}."""
+    slots, occupancy, reach = {}, {}, {}
+    boxes = {}
+    for k in range(n_objects):
+        cat = CATEGORIES[rng.randrange(n_categories)]
+        box = f"{cat}box{k}"
+        boxes[box] = cat
+        level, s = divmod(k, n_shelves)
+        slot = f"Shelf.{s}.{level}.slot"
+        slots[slot] = [1.0 * s, 2.0, round(0.3 + 0.2 * level, 2)]
+        occupancy[slot] = box
+        reach[slot] = f"Shelf.{s}.dock"
+    resources = {}
+    for j in range(n_stations):
+        slot = f"Station.{j}.slot"
+        slots[slot] = [1.0 * j, 0.0, 0.45]
+        occupancy[slot] = None
+        reach[slot] = f"Station.{j}.dock"
+        resources[f"Station.{j}"] = {"slots": [slot], "capacity": 1}
+    bins_of = {}
+    for c, cat in enumerate(CATEGORIES[:n_categories]):
+        count = sum(1 for v in boxes.values() if v == cat)
+        for k in range(count):
+            slot = f"Bin.{cat}.{k}.slot"
+            slots[slot] = [1.0 * c, -2.0, 0.35]
+            occupancy[slot] = None
+            reach[slot] = f"Bin.{cat}.dock"
+            bins_of.setdefault(cat, []).append(slot)
+    robots = {f"robot{r}": {"holding": None, "dock": "Shelf.0.dock"} for r in range(n_robots)}
+    world = {"slots": slots, "poses": set(reach.values()), "objects": {b: None for b in boxes},
+             "robots": robots, "state": {"occupancy": occupancy}, "reachability_map": reach}
+    if resources:
+        world["resources"] = resources
+    return world, boxes, bins_of
+
+
+def bin_constraints(bins_of, mode):
+    if mode == "none":
+        return {}
+    if mode == "slot":
+        return {"allowed_targets": {slot: [f"{cat}box*"] for cat, slots in bins_of.items() for slot in slots}}
+    if mode == "zone":
+        return {"allowed_targets": {f"Bin.{cat}.*": [f"{cat}box*"] for cat in bins_of}}
+    raise ValueError(f"unknown bin_rules {mode!r}, expected one of {BIN_RULES}")
+
+
+def gold_plan(world, goal, routes):
+    """Boxes one after the other, each leg by the next robot; gotos only when needed."""
+    robots = list(world["robots"])
+    reach = world["reachability_map"]
+    where = {obj: slot for slot, obj in world["state"]["occupancy"].items() if obj}
+    at, steps, turn = {}, [], 0
+    for obj, dest in goal.items():
+        route = [where[obj], *routes.get(obj, []), dest]
+        for src, dst in zip(route, route[1:]):
+            robot = robots[turn % len(robots)]
+            turn += 1
+            for action, slot in (("arm.pick", src), ("arm.place", dst)):
+                if at.get(robot) != reach[slot]:
+                    steps.append({"agent": robot, "action": "base.goto", "target": reach[slot]})
+                    at[robot] = reach[slot]
+                if action == "arm.pick":
+                    steps.append({"agent": robot, "action": "arm.pick", "object": obj, "from": slot})
+                else:
+                    if slot.startswith("Station."):
+                        steps.append({"agent": robot, "action": "wait_until_free", "target": slot})
+                    steps.append({"agent": robot, "action": "arm.place", "object": obj, "to": slot})
+    return steps
+
+
+def make_prompt(world, goal, routes, constraints):
+    stations = sorted(world.get("resources", {}))
+    lines = [
+        f"Task: {len(world['robots'])} robots must deliver {len(goal)} boxes from the shelves to their bins.",
+        "",
+        "Delivery objective:",
+    ]
+    for obj, dest in goal.items():
+        via = routes.get(obj)
+        lines.append(f"- {obj} -> {dest}" + (f", passing through {', then '.join(via)}" if via else ""))
+    lines += ["", "Environment symbols:",
+              f"- Robots: {', '.join(world['robots'])}",
+              f"- Objects: {', '.join(goal)}",
+              f"- Slots: {', '.join(world['slots'])}",
+              f"- Poses/docks: {', '.join(sorted(world['poses']))}"]
+    if stations:
+        lines += ["", "Shared resources:"]
+        lines += [f"- {world['resources'][s]['slots'][0]} holds at most ONE box at any time; any robot placing "
+                  f"INTO it must issue a `wait_until_free` step immediately before placing." for s in stations]
+    rules = constraints.get("allowed_targets")
+    if rules:
+        lines += ["", "Bin rules (a box may only be placed into a matching bin):"]
+        lines += [f"- {slot}: {', '.join(objs)}" for slot, objs in rules.items()]
+    lines += [
+        "", "Rules:",
+        "1) A robot must be at a slot's dock (base.goto) before picking from or placing into that slot.",
+        "2) A robot holds at most one box.",
+        "3) Every step MUST include an \"agent\" field naming one of the robots.",
+        "", "Allowed high-level actions (you MUST only use these):",
+        "- base.goto", "- arm.pick", "- arm.place", "- wait_until_free",
+        "", "Valid JSON action formats:",
+        "- {\"agent\": \"<agent>\", \"action\": \"base.goto\", \"target\": \"<pose>\"}",
+        "- {\"agent\": \"<agent>\", \"action\": \"arm.pick\", \"object\": \"<obj>\", \"from\": \"<slot>\"}",
+        "- {\"agent\": \"<agent>\", \"action\": \"arm.place\", \"object\": \"<obj>\", \"to\": \"<slot>\"}",
+        "- {\"agent\": \"<agent>\", \"action\": \"wait_until_free\", \"target\": \"<slot>\"}",
+        "", "Output format (STRICT JSON):",
+        "- Output ONLY one JSON object of the form:",
+        "  {\"steps\": [ STEP_1, STEP_2, ... ]}",
+        "- DO NOT include explanations or comments.",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def make_task(k, seed=0, bin_rules="zone", **params):
+    """Task record number `k` of the stream `seed`; params as in DEFAULTS (numbers or (lo, hi))."""
+    rng = random.Random(f"{seed}:{k}")
+    p = {name: _draw(rng, params.get(name, default)) for name, default in DEFAULTS.items()}
+    p["shelves"] = max(1, min(p["shelves"], p["objects"]))
+    p["categories"] = max(1, min(p["categories"], len(CATEGORIES)))
+    p["relay_depth"] = min(p["relay_depth"], p["stations"])
+    world, boxes, bins_of = make_world(p["robots"], p["objects"], p["shelves"], p["stations"], p["categories"], rng)
+    free = {cat: list(slots) for cat, slots in bins_of.items()}
+    goal = {box: free[cat].pop(rng.randrange(len(free[cat]))) for box, cat in boxes.items()}
+    stations = [r["slots"][0] for r in world.get("resources", {}).values()]
+    routes = {box: rng.sample(stations, p["relay_depth"]) for box in boxes} if p["relay_depth"] else {}
+    constraints = bin_constraints(bins_of, bin_rules)
+    world_json = {**world, "poses": sorted(world["poses"])}
+    return world, {
+        "task_id": f"gen{seed}_{k:07d}",
+        "params": {**p, "bin_rules": bin_rules},
+        "world": world_json,
+        "goal": {slot: obj for obj, slot in goal.items()},
+        "constraints": constraints,
+        "routes": routes,
+        "prompt": make_prompt(world, goal, routes, constraints),
+        "steps": gold_plan(world, goal, routes),
+    }
+
+
+def world_of(record):
+    """The world of a task record with poses as a set, as the validators expect."""
+    return {**record["world"], "poses": set(record["world"]["poses"])}
+
+
+def generate_tasks(n_tasks, seed=0, stage="S4", start=0, **params):
+    """Yield task records start..start+n_tasks-1, each with a validator-checked gold plan."""
+    from warehouse.stages import load_stage
+    s = load_stage(stage)
+    for k in range(start, start + n_tasks):
+        world, record = make_task(k, seed, **params)
+        goal = {obj: slot for slot, obj in record["goal"].items()}
+        result = s.validator.validate(world, {"steps": record["steps"]}, s.ACTIONS, record["constraints"], goal)
+        if not result["goal_ok"]:
+            raise RuntimeError(f"{record['task_id']}: gold plan rejected by {stage}: {result['failure'].describe()}")
+        yield record
+
+
+def write_shards(records, out_dir, shard_size=10000, prefix="tasks", compress=False, manifest=None):
+    """
+    Stream `records` to out_dir/<prefix>-00000.jsonl[.gz], ... (shard_size
+    lines each) and write out_dir/<prefix>-manifest.json; returns the manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    ext = ".jsonl.gz" if compress else ".jsonl"
+    shards, count, f = [], 0, None
+    try:
+        for record in records:
+            if count % shard_size == 0:
+                if f is not None:
+                    f.close()
+                name = f"{prefix}-{len(shards):05d}{ext}"
+                path = os.path.join(out_dir, name)
+                f = gzip.open(path, "wt", encoding="utf-8") if compress else open(path, "w", encoding="utf-8")
+                shards.append({"file": name, "tasks": 0})
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            shards[-1]["tasks"] += 1
+            count += 1
+    finally:
+        if f is not None:
+            f.close()
+    data = {**(manifest or {}), "tasks": count, "shard_size": shard_size, "shards": shards}
+    with open(os.path.join(out_dir, f"{prefix}-manifest.json"), "w", encoding="utf-8") as mf:
+        json.dump(data, mf, indent=2)
+    return data
+
+
+def read_shards(out_dir, prefix="tasks"):
+    """Yield the task records of a write_shards directory, one line at a time."""
+    with open(os.path.join(out_dir, f"{prefix}-manifest.json"), "r", encoding="utf-8") as mf:
+        shards = json.load(mf)["shards"]
+    for shard in shards:
+        path = os.path.join(out_dir, shard["file"])
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def _range(text):
+    lo, _, hi = text.partition("-")
+    return (int(lo), int(hi)) if hi else int(lo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate validator-checked warehouse tasks into sharded JSONL.")
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stage", default="S4", help="validator checking the gold plans")
+    parser.add_argument("--shard-size", type=int, default=10000)
+    parser.add_argument("--gzip", action="store_true")
+    for name, (lo, hi) in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=_range, default=(lo, hi),
+                            help=f"number or lo-hi range (default {lo}-{hi})")
+    parser.add_argument("--bin-rules", choices=BIN_RULES, default="zone")
+    args = parser.parse_args()
+
+    params = {name: getattr(args, name) for name in DEFAULTS}
+    t0 = time.perf_counter()
+    tasks = generate_tasks(args.tasks, args.seed, args.stage, bin_rules=args.bin_rules, **params)
+    manifest = write_shards(tasks, args.out, args.shard_size, compress=args.gzip,
+                            manifest={"seed": args.seed, "stage": args.stage, "bin_rules": args.bin_rules,
+                                      "params": params})
+    secs = time.perf_counter() - t0
+    print(f"{manifest['tasks']} tasks in {len(manifest['shards'])} shards under {args.out} "
+          f"({secs:.1f}s, {manifest['tasks'] / secs:.0f} tasks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Plan-to-schedule compiler.
+
+A validated plan is one total order of steps, but the robots need not
+follow it literally. `compile_schedule` turns it into a dependency DAG:
+
+- each robot's steps stay in plan order (same agent);
+- a step conflicting with an earlier step of another robot on a shared
+  symbol (concurrency.footprint: the same slot, or a capacity-limited
+  resource such as Inspection) runs after it, which covers handovers
+  through a slot and station mutual exclusion;
+
+and schedules every step as soon as its predecessors are done, i.e. with
+the most parallelism these dependencies allow; the times are those of
+warehouse.simulation, and any execution respecting the DAG reaches the
+same states as the plan. Cross-robot edges implied by other edges are
+dropped, and the remaining ones are grouped into one barrier per waiting
+step.
+
+The result is plain JSON for a dispatcher: per robot, its steps with
+start/end times and the barriers each step waits on ("wait") or releases
+when it ends ("signal"); a barrier is open once every step in its "after"
+list has ended. The critical path (longest chain by duration, whose
+length is the makespan) and the DAG depth in steps are reported next to
+the number of sequential steps.
+
+    python -m warehouse.schedule S4 S4/dataset/gold/s4_case001.json -o timeline.json
+"""
+import argparse
+import json
+import sys
+
+from warehouse.concurrency import footprint, split_by_agent
+from warehouse.simulation import _dependencies, simulate
+
+
+def compile_schedule(validator, world, plan, actions=None, constraints=None, goal=None, durations=None):
+    """
+    Returns {"ok", "failure", "makespan", "sequential", "steps", "depth",
+    "parallelism", "critical_path", "timelines", "barriers"}.
+    sequential is the makespan of running the steps one at a time, depth
+    the most steps on one dependency chain, parallelism steps / depth;
+    critical_path lists plan indices. A plan that does not validate gives
+    ok=False with its failure (as a dict) and no timelines.
+    """
+    actions = validator.ACTIONS if actions is None else actions
+    constraints = constraints or {}
+    result = validator.validate(world, plan, actions, constraints, goal)
+    if not result["logic_ok"]:
+        return {"ok": False, "failure": result["failure"].as_dict(), "makespan": None, "sequential": None,
+                "steps": len(plan.get("steps") or []) if isinstance(plan, dict) else 0, "depth": None,
+                "parallelism": None, "critical_path": [], "timelines": {}, "barriers": []}
+
+    steps = plan["steps"]
+    resources = getattr(validator.init_symbolic_state(world), "resources", None)
+    sim = simulate(validator, world, plan, actions, constraints, durations)
+    start, end, agent = {}, {}, {}
+    for i, name, t0, t1 in sim["schedule"]:
+        start[i], end[i], agent[i] = t0, t1, name
+
+    # same-agent chains plus cross-agent conflicts; plan order is a topological order
+    names, seqs = split_by_agent(world, plan)
+    prev = {}
+    for seq in seqs:
+        for (j, _), (i, _) in zip(seq, seq[1:]):
+            prev[i] = j
+    conflicts = _dependencies(steps, actions, resources)
+    ancestors = [0] * len(steps)   # bitset of the steps each step transitively depends on
+    depth = [0] * len(steps)
+    waits = {}                     # step -> cross-agent predecessors not implied by other edges
+    for i in range(len(steps)):
+        preds = set(conflicts[i])
+        if i in prev:
+            preds.add(prev[i])
+        for j in preds:
+            ancestors[i] |= ancestors[j] | (1 << j)
+        depth[i] = 1 + max((depth[j] for j in preds), default=0)
+        cross = [j for j in sorted(preds) if agent[j] != agent[i]]
+        cross = [j for j in cross if not any(ancestors[k] >> j & 1 for k in preds if k != j)]
+        if cross:
+            waits[i] = cross
+
+    barriers, wait_of, signal_of = [], {}, {}
+    for i in sorted(waits, key=lambda i: (start[i], i)):
+        bid = f"b{len(barriers)}"
+        r_i, w_i = footprint(steps[i], actions, resources)
+        shared = set()
+        for j in waits[i]:
+            r_j, w_j = footprint(steps[j], actions, resources)
+            shared |= (r_i | w_i) & (r_j | w_j)
+            signal_of.setdefault(j, []).append(bid)
+        barriers.append({"id": bid, "robot": agent[i], "index": i, "after": waits[i], "symbols": sorted(shared)})
+        wait_of[i] = [bid]
+
+    timelines = {}
+    for name, seq in zip(names, seqs):
+        timelines[name] = [{"index": i, "step": step, "start": start[i], "end": end[i],
+                            "wait": wait_of.get(i, []), "signal": signal_of.get(i, [])} for i, step in seq]
+
+    # critical path: back from the last step to end, through a predecessor ending at its start
+    path = []
+    i = max(end, key=lambda k: (end[k], -k)) if end else None
+    while i is not None:
+        path.append(i)
+        preds = set(conflicts[i]) | ({prev[i]} if i in prev else set())
+        i = next((j for j in sorted(preds, reverse=True) if end[j] == start[i]), None)
+    dag_depth = max(depth, default=0)
+    return {"ok": True, "failure": result["failure"].as_dict() if result["failure"] else None,
+            "makespan": sim["makespan"], "sequential": sum(end[i] - start[i] for i in end),
+            "steps": len(steps), "depth": dag_depth,
+            "parallelism": len(steps) / dag_depth if dag_depth else 0.0,
+            "critical_path": path[::-1], "timelines": timelines, "barriers": barriers}
+
+
+def main():
+    from warehouse.stages import STAGES, load_stage
+
+    parser = argparse.ArgumentParser(description="Compile a validated plan into per-robot timelines (JSON).")
+    parser.add_argument("stage", choices=STAGES)
+    parser.add_argument("plan", help="plan JSON ({'steps': [...]}, a gold file's goal is used if present)")
+    parser.add_argument("-o", "--output", help="write the schedule here instead of stdout")
+    args = parser.parse_args()
+
+    s = load_stage(args.stage)
+    with open(args.plan, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    goal = {obj: slot for slot, obj in plan["goal"].items()} if isinstance(plan.get("goal"), dict) else None
+    schedule = compile_schedule(s.validator, s.world, plan, s.ACTIONS, goal=goal)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(schedule, f, indent=2)
+    else:
+        json.dump(schedule, sys.stdout, indent=2)
+        print()
+    if not schedule["ok"]:
+        sys.exit(1)
+    print(f"{schedule['steps']} steps -> depth {schedule['depth']} ({schedule['parallelism']:.2f}x); "
+          f"makespan {schedule['makespan']:.2f}s vs {schedule['sequential']:.2f}s sequential; "
+          f"{len(schedule['barriers'])} barriers", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Long-running validation service.
+
+Validating a plan from a script means putting a stage directory on
+sys.path, importing its `validation.validator` and calling make_world(),
+which connects to PyBullet. `ValidatorService` holds the stage profiles
+of warehouse.stages instead (validator, action spec and symbolic world,
+loaded once per process). Batches of plans then go straight to
+warehouse.batch.validate_batch, one trie per (goal, constraints) group, so
+shared prefixes are executed once.
+
+`make_server` exposes it over localhost HTTP (stdlib, one thread per
+connection):
+
+    GET  /stages     {"stages": {"S1": {"agents": [...], "actions": [...]}, ...}}
+    POST /validate   {"stage": "S4", "plans": [{"steps": [...]}, ...],
+                      "goal": {object: slot},            optional, for all plans
+                      "goals": [{object: slot}, ...],    optional, one per plan
+                      "constraints": {...}}              optional
+                  -> {"results": [{"logic_ok", "goal_ok", "failure", "message"}, ...],
+                      "stats": {"plans", "executed_steps", "skipped_fraction", "ms"}}
+
+`failure` is Failure.as_dict() and `message` its describe() text. A bad
+request gets {"error": {"code", "message"}} with status 400 (bad_json,
+bad_request, unknown_stage), 404 (not_found) or 413 (too_large); an
+unexpected exception gets code internal_error with status 500, and a plan
+the validator raises on gets {"error": {"code": "internal_error", ...}}
+in its own result while the other plans are validated normally.
+
+Usage:
+    python -m warehouse.service [--port 8765] [--stages S1 S2 S3 S4]
+and from a client, `validate_remote(url, stage, plans, goal=...)`.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from warehouse.batch import validate_batch
+from warehouse.stages import load_stage, STAGES
+
+PORT = 8765
+MAX_BODY = 64 * 1024 * 1024   # bytes per request
+
+
+class ServiceError(Exception):
+    """Request error reported to the client as {"error": {"code", "message"}}."""
+
+    def __init__(self, code, message, status=400):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+def _group_key(goal, constraints):
+    return json.dumps([goal, constraints], sort_keys=True, default=str)
+
+
+class ValidatorService:
+    """Preloaded stages and the batch entry point behind the HTTP handler."""
+
+    def __init__(self, stages=STAGES):
+        self.stages = {s: load_stage(s) for s in stages}
+
+    def describe(self):
+        return {"stages": {name: {"agents": s.agents,
+                                  "actions": sorted(s.ACTIONS)} for name, s in self.stages.items()}}
+
+    def validate(self, stage, plans, goal=None, goals=None, constraints=None):
+        """
+        Per-plan results (as validator.validate, failures as dicts) and
+        batch stats. Plans sharing a goal and constraints are validated
+        together with prefix sharing.
+        """
+        if not isinstance(stage, str) or stage not in self.stages:
+            raise ServiceError("unknown_stage", f"unknown stage '{stage}', expected one of {sorted(self.stages)}")
+        if not isinstance(plans, list):
+            raise ServiceError("bad_request", "'plans' must be a list")
+        if goals is not None and (not isinstance(goals, list) or len(goals) != len(plans)):
+            raise ServiceError("bad_request", "'goals' must be a list with one goal per plan")
+        for g in ([goal] if goals is None else goals):
+            if g is not None and (not isinstance(g, dict) or not all(isinstance(v, str) for v in g.values())):
+                raise ServiceError("bad_request", "a goal must be an object {object: slot}")
+        if constraints is not None and not isinstance(constraints, dict):
+            raise ServiceError("bad_request", "'constraints' must be an object")
+        s = self.stages[stage]
+        constraints = constraints or {}
+        t0 = time.perf_counter()
+
+        groups = {}
+        for k, plan in enumerate(plans):
+            g = goal if goals is None else goals[k]
+            groups.setdefault(_group_key(g, constraints), (g, []))[1].append(k)
+        results = [None] * len(plans)
+        executed = sequential = 0
+        for g, idxs in groups.values():
+            batch = [plans[k] for k in idxs]
+            try:
+                out, stats = validate_batch(s.validator, s.world, batch, s.ACTIONS, constraints, g)
+            except Exception:   # one bad plan must not fail its group: validate them one by one
+                out = [self._validate_one(s, plan, constraints, g) for plan in batch]
+                stats = {"executed_steps": 0, "sequential_steps": 0}
+            executed += stats["executed_steps"]
+            sequential += stats["sequential_steps"]
+            for k, r in zip(idxs, out):
+                if "error" in r:
+                    results[k] = r
+                    continue
+                failure = r["failure"]
+                results[k] = {"logic_ok": r["logic_ok"], "goal_ok": r["goal_ok"],
+                              "failure": failure.as_dict() if failure else None,
+                              "message": failure.describe() if failure else None}
+        return {"results": results,
+                "stats": {"plans": len(plans), "executed_steps": executed,
+                          "skipped_fraction": (1 - executed / sequential) if sequential else 0.0,
+                          "ms": (time.perf_counter() - t0) * 1e3}}
+
+    @staticmethod
+    def _validate_one(s, plan, constraints, goal):
+        """validator.validate of one plan; an exception becomes {"error": {"code": "internal_error", ...}}."""
+        try:
+            return s.validator.validate(s.world, plan, s.ACTIONS, constraints or {}, goal)
+        except Exception as e:
+            message = f"validator raised {type(e).__name__}: {e}"
+            return {"logic_ok": False, "goal_ok": False, "failure": None, "message": message,
+                    "error": {"code": "internal_error", "message": message}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None   # set by make_server
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, err):
+        self._reply(err.status, {"error": {"code": err.code, "message": str(err)}})
+
+    def do_GET(self):
+        if self.path == "/stages":
+            self._reply(200, self.service.describe())
+        else:
+            self._error(ServiceError("not_found", f"no such path '{self.path}'", 404))
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length > MAX_BODY:
+                self.close_connection = True   # the body is left unread
+                raise ServiceError("too_large", f"request body over {MAX_BODY} bytes", 413)
+            raw = self.rfile.read(length)
+            if self.path != "/validate":
+                raise ServiceError("not_found", f"no such path '{self.path}'", 404)
+            try:
+                req = json.loads(raw)
+            except ValueError as e:
+                raise ServiceError("bad_json", f"request body is not JSON: {e}")
+            if not isinstance(req, dict):
+                raise ServiceError("bad_request", "request body must be an object")
+            self._reply(200, self.service.validate(req.get("stage"), req.get("plans"), req.get("goal"),
+                                                   req.get("goals"), req.get("constraints")))
+        except ServiceError as err:
+            self._error(err)
+        except Exception as e:   # reply instead of dropping the connection
+            self._error(ServiceError("internal_error", f"{type(e).__name__}: {e}", 500))
+
+    def log_message(self, fmt, *args):
+        pass   # one line per request would dominate a batch pipeline's output
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # listen backlog; the default 5 resets bursts of clients
+
+
+def make_server(service, host="127.0.0.1", port=PORT):
+    """ThreadingHTTPServer bound to host:port (0 picks a free port) serving `service`."""
+    handler = type("Handler", (_Handler,), {"service": service})
+    return _Server((host, port), handler)
+
+
+def serve_in_thread(service, host="127.0.0.1", port=0):
+    """Start a server on a background thread; returns (server, url). Stop with server.shutdown()."""
+    server = make_server(service, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def validate_remote(url, stage, plans, goal=None, goals=None, constraints=None, timeout=60):
+    """POST a batch to a running service; returns the response body (raises ServiceError on 4xx)."""
+    body = {"stage": stage, "plans": plans}
+    for key, value in (("goal", goal), ("goals", goals), ("constraints", constraints)):
+        if value is not None:
+            body[key] = value
+    req = urllib.request.Request(url.rstrip("/") + "/validate", data=json.dumps(body).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        err = json.loads(e.read()).get("error", {})
+        raise ServiceError(err.get("code", "http_error"), err.get("message", str(e)), e.code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve S1-S4 plan validation over localhost HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    service = ValidatorService(args.stages)
+    server = make_server(service, args.host, args.port)
+    print(f"Loaded {', '.join(args.stages)} in {time.perf_counter() - t0:.2f}s; "
+          f"serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
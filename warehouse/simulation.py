@@ -0,0 +1,212 @@
+"""
+Discrete-event timing of multi-robot plans.
+
+The validators treat every step as instantaneous. `simulate` gives each
+step a duration and runs the robots concurrently:
+
+- base.goto takes GOTO_BASE plus the dock-to-dock distance over SPEED
+  (travel_time, or a given travel_table); docks sit at the centroid of
+  the slots they reach.
+- arm.pick / arm.place take DURATIONS seconds; wait_until_free takes none
+  but blocks, see below.
+
+A robot executes its own steps in plan order. A step touching a shared
+slot or resource (concurrency.footprint) also waits until every earlier
+plan step in conflict with it has finished, so a wait_until_free (or a
+pick from a handover slot) holds its robot until the step that frees (or
+fills) the slot is done. Any execution obeying these dependencies reaches
+the same states as the literal plan, so the robots never deadlock and each
+step is checked by the stage validator's execute_step at its start time.
+The verdict is that of validate(); on an invalid plan the failure reported
+is the first one in simulated time, which need not be the first in plan
+order.
+
+Events are step completions on a heap; at every event the robots whose
+next step has no pending dependency are started. Reports the makespan, the
+busy and idle time of each robot and the utilization of every resource in
+world["resources"] (share of capacity occupied or being loaded/unloaded
+over the makespan).
+"""
+import heapq
+import math
+
+from warehouse.concurrency import footprint, split_by_agent
+from warehouse.constraints import compile_constraints
+
+SPEED = 0.5        # m/s, base travel
+GOTO_BASE = 1.0    # s, undock/dock overhead of every goto
+DURATIONS = {"arm.pick": 2.0, "arm.place": 2.0, "wait_until_free": 0.0}
+
+_ANY = "*"
+
+
+def dock_positions(world):
+    """Planar position of every pose: centroid of the slots reachable from it."""
+    acc = {}
+    for slot, dock in world.get("reachability_map", {}).items():
+        xyz = world["slots"].get(slot)
+        if xyz is not None:
+            acc.setdefault(dock, []).append(xyz[:2])
+    return {dock: (sum(p[0] for p in pts) / len(pts), sum(p[1] for p in pts) / len(pts))
+            for dock, pts in acc.items()}
+
+
+def travel_time(pos, src, dst, speed=SPEED, base=GOTO_BASE):
+    """Seconds to drive from pose `src` to `dst` given dock_positions(); base only if either is unknown."""
+    if src == dst:
+        return 0.0
+    if src in pos and dst in pos:
+        return base + math.dist(pos[src], pos[dst]) / speed
+    return base
+
+
+def travel_table(world, speed=SPEED, base=GOTO_BASE):
+    """{(from pose, to pose): seconds} for every pair of poses."""
+    pos = dock_positions(world)
+    return {(a, b): travel_time(pos, a, b, speed, base) for a in world["poses"] for b in world["poses"]}
+
+
+def _start_pose(world, robot):
+    """Initial pose of `robot`: its declared dock, matched to a pose by prefix (Shelf.dock -> Shelf.*)."""
+    spec = world.get("robots", {}).get(robot)
+    dock = spec.get("dock") if isinstance(spec, dict) else None
+    if dock is None or dock in world["poses"]:
+        return dock
+    prefix = dock.split(".")[0] + "."
+    return next((p for p in sorted(world["poses"]) if p.startswith(prefix)), None)
+
+
+def _dependencies(steps, actions, resources):
+    """preds[i]: earlier plan steps that step i conflicts with on a shared symbol."""
+    preds, last_write, reads_since = [], {}, {}
+    fence, seen = None, []
+    for i, step in enumerate(steps):
+        reads, writes = footprint(step, actions, resources) if isinstance(step, dict) else ({_ANY}, {_ANY})
+        if _ANY in reads:
+            deps = set(seen)
+            last_write, reads_since, fence = {}, {}, i
+        else:
+            deps = {fence} if fence is not None else set()
+            for s in reads | writes:
+                if s in last_write:
+                    deps.add(last_write[s])
+            for s in writes:
+                deps.update(reads_since.get(s, ()))
+            for s in reads:
+                reads_since.setdefault(s, []).append(i)
+            for s in writes:
+                last_write[s] = i
+                reads_since[s] = []
+        preds.append(deps)
+        seen.append(i)
+    return preds
+
+
+def simulate(validator, world, plan, actions=None, constraints=None, durations=None, travel=None, debug=False):
+    """
+    Run `plan` in simulated time. Returns
+    {"logic_ok", "failure", "makespan", "busy", "idle", "utilization", "schedule"}
+    with busy/idle per robot (s), utilization per resource (0..1) and
+    schedule = [(plan index, agent, start, end), ...] in start order.
+    Timing is reported up to the first failing step.
+    """
+    actions = validator.ACTIONS if actions is None else actions
+    constraints = compile_constraints(constraints)
+    durations = {**DURATIONS, **(durations or {})}
+    pos = dock_positions(world)
+    travel = dict(travel or {})   # travel-cost table, filled on demand
+    steps = plan.get("steps", None)
+    if not isinstance(steps, list):
+        return {"logic_ok": False, "failure": validator.Failure("malformed_plan"), "makespan": 0.0,
+                "busy": {}, "idle": {}, "utilization": {}, "schedule": []}
+
+    st = validator.init_symbolic_state(world)
+    names, seqs = split_by_agent(world, plan)
+    preds = _dependencies(steps, actions, getattr(st, "resources", None))
+    pending = [len(p) for p in preds]
+    succs = [[] for _ in steps]
+    for i, deps in enumerate(preds):
+        for j in deps:
+            succs[j].append(i)
+
+    station_slots = {r: spec["slots"] for r, spec in world.get("resources", {}).items()}
+    capacity = {r: spec.get("capacity", len(spec["slots"])) for r, spec in world.get("resources", {}).items()}
+    station_of = {s: r for r, slots in station_slots.items() for s in slots}
+    area = {r: 0.0 for r in station_slots}    # unit-seconds in use, integrated lazily
+    units = {r: 0 for r in station_slots}     # units in use since since[r]
+    since = {r: 0.0 for r in station_slots}
+    loading = {}   # slot -> number of running steps placing into / picking from it
+
+    pcs = [0] * len(seqs)
+    pose = [_start_pose(world, n) for n in names]
+    busy = [0.0] * len(seqs)
+    idle_robot = set(range(len(seqs)))
+    events, schedule = [], []
+    now, failure = 0.0, None
+
+    def touch(slots):
+        """Integrate the stations of `slots` up to now and recount their units."""
+        for r in {station_of[s] for s in slots if s in station_of}:
+            area[r] += units[r] * (now - since[r])
+            used = sum(1 for s in station_slots[r] if st.occ_of(s) is not None or loading.get(s))
+            units[r], since[r] = min(used, capacity[r]), now
+
+    def step_slots(step):
+        return [step[k] for k in ("from", "to") if k in step]
+
+    def dispatch():
+        for a in sorted(idle_robot, key=lambda a: seqs[a][pcs[a]][0] if pcs[a] < len(seqs[a]) else len(steps)):
+            if pcs[a] >= len(seqs[a]):
+                continue
+            i, step = seqs[a][pcs[a]]
+            if pending[i]:
+                continue
+            fail = validator.execute_step(st, i, step, world, actions, constraints, debug)
+            if fail:
+                return fail
+            action = step["action"]
+            if action == "base.goto":
+                key = (pose[a], step["target"])
+                dur = travel.get(key)
+                if dur is None:
+                    dur = travel[key] = travel_time(pos, *key)
+                pose[a] = step["target"]
+            else:
+                dur = durations.get(action, 0.0)
+            for s in step_slots(step):
+                loading[s] = loading.get(s, 0) + 1
+            touch(step_slots(step))
+            busy[a] += dur
+            idle_robot.discard(a)
+            schedule.append((i, names[a], now, now + dur))
+            heapq.heappush(events, (now + dur, i, a))
+        return None
+
+    touch(station_of)
+    failure = dispatch()
+    while events and failure is None:
+        now = events[0][0]
+        while events and events[0][0] == now:
+            _, i, a = heapq.heappop(events)
+            slots = step_slots(seqs[a][pcs[a]][1])
+            for s in slots:
+                loading[s] -= 1
+            touch(slots)
+            for j in succs[i]:
+                pending[j] -= 1
+            pcs[a] += 1
+            idle_robot.add(a)
+        failure = dispatch()
+
+    makespan = max((end for *_, end in schedule), default=0.0)
+    for r in area:
+        area[r] += units[r] * (makespan - since[r])
+    return {
+        "logic_ok": failure is None,
+        "failure": failure,
+        "makespan": makespan,
+        "busy": {names[a]: busy[a] for a in range(len(seqs))},
+        "idle": {names[a]: makespan - busy[a] for a in range(len(seqs))},
+        "utilization": {r: area[r] / (capacity[r] * makespan) if makespan else 0.0 for r in area},
+        "schedule": schedule,
+    }
@@ -0,0 +1,95 @@
+"""
+Stage profiles: the S1-S4 validators side by side in one process.
+
+Each stage has its own validator module and action spec (S2-S4 bind the
+shared multi-robot validator of warehouse/validator.py to their action
+schema; S1 keeps its single-robot one), imported as the packages
+S1.validation.validator, S2.env.actions_spec, ... from the repository
+root instead of as `validation.validator` with the stage directory on
+sys.path, so all four can be loaded at once and nothing is imported
+twice. The world comes from the stage's symbolic_world(), which
+is make_world() without the PyBullet scene.
+
+`load_stage` builds a StageProfile once per stage and caches it (thread
+safe); the profile's world and grounded steps are shared by every caller
+and must be treated as read-only.
+
+    from warehouse.stages import load_stage
+    s4 = load_stage("S4")
+    s4.validate({"steps": [...]}, goal={"redbox": "RedBin.slot"})
+    s4.find_plan({"redbox": "RedBin.slot"})["steps"]
+"""
+import importlib
+import os
+import sys
+import threading
+
+from warehouse.grounding import ground_steps
+from warehouse.planner import find_plan
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+STAGES = ("S1", "S2", "S3", "S4")
+
+_PROFILES = {}
+_LOCK = threading.Lock()
+
+
+class StageProfile:
+    """Validator module, action spec and symbolic world of one stage."""
+    __slots__ = ("name", "validator", "ACTIONS", "ACTION_SCHEMA", "world", "agents", "_make_world", "_candidates")
+
+    def __init__(self, name):
+        self.name = name
+        self.validator = importlib.import_module(f"{name}.validation.validator")
+        spec = importlib.import_module(f"{name}.env.actions_spec")
+        self.ACTIONS, self.ACTION_SCHEMA = spec.ACTIONS, spec.ACTION_SCHEMA
+        scene = importlib.import_module(f"{name}.env.make_world")
+        self._make_world = scene.make_world
+        self.world = scene.symbolic_world()
+        self.agents = list(self.world.get("robots", {}))   # empty for the single-robot stage
+        self._candidates = None
+        self.validator.init_symbolic_state(self.world)      # builds and caches the world index
+
+    @property
+    def candidates(self):
+        """Grounded steps of the world (warehouse.grounding), computed on first use."""
+        if self._candidates is None:
+            self._candidates = ground_steps(self.world, self.ACTIONS, self.ACTION_SCHEMA)
+        return self._candidates
+
+    def validate(self, plan, constraints=None, goal=None, debug=False):
+        """validator.validate on the stage world and action spec."""
+        return self.validator.validate(self.world, plan, self.ACTIONS, constraints or {}, goal, debug)
+
+    def find_plan(self, goal, constraints=None, **options):
+        """warehouse.planner.find_plan on the stage world, reusing the grounded steps."""
+        return find_plan(self.validator, self.world, self.ACTIONS, goal, constraints,
+                         candidates=self.candidates, **options)
+
+    def make_world(self, gui=False):
+        """The stage's PyBullet scene (connects to PyBullet); for visualization only."""
+        return self._make_world(gui)
+
+    def __repr__(self):
+        return f"StageProfile({self.name!r}, agents={self.agents})"
+
+
+def load_stage(name):
+    """Cached StageProfile of stage `name` (S1-S4)."""
+    profile = _PROFILES.get(name)
+    if profile is None:
+        if name not in STAGES:
+            raise ValueError(f"unknown stage '{name}', expected one of {list(STAGES)}")
+        with _LOCK:
+            profile = _PROFILES.get(name)
+            if profile is None:
+                profile = _PROFILES[name] = StageProfile(name)
+    return profile
+
+
+def load_stages(names=STAGES):
+    """{name: StageProfile} for `names`."""
+    return {name: load_stage(name) for name in names}
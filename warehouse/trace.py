@@ -0,0 +1,92 @@
+"""
+Lazy execution traces.
+
+`trace` runs a plan through a stage validator one step at a time and
+yields one immutable StepDelta per executed step: the slots whose content
+changed, the agents whose holding or position changed and the resources
+whose usage changed, each as a tuple of (symbol, new value) pairs. Deltas
+are read off the state's undo log (SymbolicState.snapshot), so no state
+copies are made, and consumers (replays, visualizers, metrics) can stop
+iterating at any point.
+
+Symbols are interned, and identical (symbol, value) pairs within a trace
+share one tuple, so long traces stay small when kept in memory.
+
+The initial state is world["state"]["occupancy"] (slots not listed there
+are empty) with empty hands and no positions. When the generator finishes
+it returns the validate() result ({"logic_ok", "goal_ok", "failure"}),
+available as StopIteration.value or through `yield from`.
+"""
+import sys
+from collections import namedtuple
+
+from warehouse.constraints import compile_constraints
+
+StepDelta = namedtuple("StepDelta", "index step agent occ holding at resources failure")
+StepDelta.__doc__ = """\
+Changes made by plan step `index`. occ/holding/at/resources are tuples of
+(slot | agent | resource, new value); `failure` is the Failure record when
+the step failed (its partial changes are still reported)."""
+
+
+def _symbol(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def trace(validator, world, plan, actions=None, constraints=None, goal=None, debug=False):
+    """
+    Yield a StepDelta for every executed step of `plan`; stops after the
+    first failing step. Returns the validate() result dict.
+    """
+    actions = validator.ACTIONS if actions is None else actions
+    constraints = compile_constraints(constraints)
+    steps = plan.get("steps", None) if isinstance(plan, dict) else None
+    if not isinstance(steps, list):
+        return {"logic_ok": False, "goal_ok": False, "failure": validator.Failure("malformed_plan")}
+
+    st = validator.init_symbolic_state(world)
+    st.snapshot()
+    log = st.log
+    index = st.index
+    agents = getattr(index, "agents", None)
+    resources = getattr(st, "resources", None)
+    pairs = {}
+
+    def pair(symbol, value):
+        key = (symbol, value)
+        p = pairs.get(key)
+        if p is None:
+            p = pairs[key] = (_symbol(symbol), _symbol(value))
+        return p
+
+    for i, step in enumerate(steps):
+        failure = validator.execute_step(st, i, step, world, actions, constraints, debug)
+
+        occ, holding, at, res = {}, {}, {}, {}
+        for target, key, _ in log:
+            if target is st.occ:
+                occ[key] = st.occ[key]
+            elif target is st and key in ("holding", "agent_at"):   # single-robot stage
+                (holding if key == "holding" else at)[None] = getattr(st, key)
+            elif agents is not None and target is st.holding:
+                holding[key] = st.holding[key]
+            elif agents is not None and target is st.agent_at:
+                at[key] = st.agent_at[key]
+            elif resources is not None and target is resources.in_use:
+                res[key] = resources.in_use[key]
+        del log[:]
+
+        agent = step.get("agent", agents[0] if agents else None) if agents and isinstance(step, dict) else None
+        yield StepDelta(
+            i, step, _symbol(agent),
+            tuple(pair(index.slots[s], v) for s, v in occ.items()),
+            tuple(pair(agents[a] if agents else a, v) for a, v in holding.items()),
+            tuple(pair(agents[a] if agents else a, v) for a, v in at.items()),
+            tuple(pair(resources.spec.names[r], n) for r, n in res.items()),
+            failure,
+        )
+        if failure:
+            return {"logic_ok": False, "goal_ok": False, "failure": failure}
+
+    failure = validator.goal_failure(st, goal, len(steps))
+    return {"logic_ok": True, "goal_ok": failure is None, "failure": failure}
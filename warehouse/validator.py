@@ -0,0 +1,497 @@
+"""
+Multi-robot symbolic validator shared by S2-S4.
+
+The three multi-robot stages differ only in their data: the robots, slots
+and shared resources of the world (world["robots"], world["resources"])
+and the action spec and schema in env/actions_spec.py. The checks are the
+same, so they live here once; each stage's validation/validator.py binds
+its ACTION_SCHEMA (`schema=`) and re-exports the rest, and stays
+importable as validation.validator (stage scripts) and as
+S*.validation.validator (warehouse/stages.py). S1 keeps its own
+single-robot implementation (one robot plus a visited record).
+"""
+from warehouse.constraints import compile_constraints, place_allowed
+from warehouse.failures import Failure
+from warehouse.resources import ResourceSpec, ResourceTable
+from warehouse.zobrist import ZobristKeys
+
+
+def index_world(world):
+    """
+    Intern the agents declared in world["robots"] to integer ids.
+    Ids follow definition order, so the first declared robot is agent 0.
+    """
+    agents = list(world.get("robots", {}))
+    return agents, {a: i for i, a in enumerate(agents)}
+
+
+class _WorldIndex:
+    """Integer ids for the slots, objects and agents of one world, plus its resources."""
+    __slots__ = ("slots", "slot_id", "objects", "object_id", "agents", "agent_id", "resources", "zobrist")
+
+    def __init__(self, world):
+        occupancy = world["state"].get("occupancy", {})
+        self.slots = list(dict.fromkeys([*world["slots"], *occupancy]))
+        self.slot_id = {s: i for i, s in enumerate(self.slots)}
+        self.objects = list(dict.fromkeys([*world["objects"], *(o for o in occupancy.values() if o)]))
+        self.object_id = {o: i for i, o in enumerate(self.objects)}
+        self.agents, self.agent_id = index_world(world)
+        self.resources = ResourceSpec(world)
+        self.zobrist = ZobristKeys(self.slots, self.agents)
+
+    def covers(self, world):
+        """False once slots, objects, robots or resources were added to the world."""
+        return (all(s in self.slot_id for s in world["state"].get("occupancy", {}))
+                and all(o in self.object_id for o in world["objects"])
+                and len(world.get("robots", {})) == len(self.agents)
+                and len(world.get("resources", {})) == len(self.resources))
+
+
+_WORLD_INDEX = {}  # id(world) → (world, _WorldIndex)
+
+
+def _world_index(world):
+    """Return the index of `world`, building it on first use."""
+    cached = _WORLD_INDEX.get(id(world))
+    if cached is None or cached[0] is not world or not cached[1].covers(world):
+        if len(_WORLD_INDEX) >= 64:
+            _WORLD_INDEX.clear()
+        cached = _WORLD_INDEX[id(world)] = (world, _WorldIndex(world))
+    return cached[1]
+
+
+class SymbolicState:
+    """
+    Compact symbolic state of one plan execution.
+
+    Occupancy and the object index are lists indexed by the slot and object
+    ids of the world's cached _WorldIndex; holding and position are indexed
+    by agent id, and shared stations are counted in a ResourceTable built
+    from world["resources"]. Mutations go through _set/_set_attr (and the
+    table's acquire/release), which record the old value in an undo log
+    once snapshot() has been called, so search code can branch with
+    snapshot()/rollback(mark) instead of deep copies. zhash is the Zobrist
+    hash of occupancy, holding and positions (warehouse/zobrist.py), kept
+    up to date by the effects through _set_hashed.
+
+    st["occ"], st["holding"], ... return read-only dict/list views for
+    callers written against the former dictionary state.
+    """
+    __slots__ = ("index", "occ", "holding", "agent_at", "resources",
+                 "obj_loc", "obj_count", "dup_count", "zhash", "log")
+
+    _VIEW_KEYS = ("occ", "agents", "agent_id", "holding", "agent_at", "resources",
+                  "obj_loc", "obj_count", "dup_count")
+
+    def __init__(self, world):
+        index = self.index = _world_index(world)
+        self.occ = [None] * len(index.slots)               # slot id → object
+        self.holding = [None] * len(index.agents)          # indexed by agent id
+        self.agent_at = [None] * len(index.agents)         # indexed by agent id
+        self.resources = ResourceTable(index.resources)    # units in use per shared resource
+        self.obj_loc = [None] * len(index.objects)         # object id → slot, or id of the holding agent
+        self.obj_count = [0] * len(index.objects)          # object id → number of places it appears in
+        self.dup_count = 0                                 # objects currently appearing in more than one place
+        self.log = None                                    # undo log, started by snapshot()
+        for slot, obj in world["state"].get("occupancy", {}).items():
+            self.occ[index.slot_id[slot]] = obj
+            if obj:
+                _index_add(self, obj, slot)
+                rid = self.resources.resource_of(slot)
+                if rid is not None:
+                    self.resources.acquire(rid, force=True)
+        self.zhash = index.zobrist.initial_hash(self.occ)
+
+    @property
+    def agents(self):
+        return self.index.agents
+
+    @property
+    def agent_id(self):
+        return self.index.agent_id
+
+    def occ_of(self, slot):
+        """Object in `slot`, or None (also for slots the world does not have)."""
+        i = self.index.slot_id.get(slot)
+        return None if i is None else self.occ[i]
+
+    def _set(self, array, i, value):
+        if self.log is not None:
+            self.log.append((array, i, array[i]))
+        array[i] = value
+
+    def _set_attr(self, name, value):
+        if self.log is not None:
+            self.log.append((self, name, getattr(self, name)))
+        setattr(self, name, value)
+
+    def _set_hashed(self, component, array, i, value):
+        """_set for occupancy/holding/position, also updating zhash (undone by rollback like any change)."""
+        old, keys = array[i], self.index.zobrist.tables[component][i]
+        if self.log is not None:
+            self.log.append((self, "zhash", self.zhash))
+            self.log.append((array, i, old))
+        self.zhash ^= keys[old] ^ keys[value]
+        array[i] = value
+
+    def snapshot(self):
+        """Start (or continue) recording changes; returns a mark for rollback()."""
+        if self.log is None:
+            self.log = self.resources.log = []
+        return len(self.log)
+
+    def rollback(self, mark):
+        """Undo every change recorded since snapshot() returned `mark`."""
+        log = self.log
+        while len(log) > mark:
+            target, key, old = log.pop()
+            if type(key) is str:
+                setattr(target, key, old)
+            else:
+                target[key] = old
+
+    def __deepcopy__(self, memo):
+        """Copy the per-plan lists (all flat); the world index is shared."""
+        new = SymbolicState.__new__(SymbolicState)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(new, name, value[:] if type(value) is list else value)
+        new.resources = self.resources.copy()
+        new.log = None
+        return new
+
+    def __getitem__(self, key):
+        index = self.index
+        if key == "occ":
+            return dict(zip(index.slots, self.occ))
+        if key in ("holding", "agent_at"):
+            return list(getattr(self, key))
+        if key == "resources":
+            return dict(zip(index.resources.names, self.resources.in_use))
+        if key in ("obj_loc", "obj_count"):
+            return dict(zip(index.objects, getattr(self, key)))
+        if key in self._VIEW_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def keys(self):
+        return self._VIEW_KEYS
+
+    def as_dict(self):
+        return {k: self[k] for k in self._VIEW_KEYS}
+
+
+def _index_add(st, obj, where):
+    """Record that `obj` now also appears at `where` (a slot or a holder)."""
+    o = st.index.object_id[obj]
+    n = st.obj_count[o] + 1
+    st._set(st.obj_count, o, n)
+    st._set(st.obj_loc, o, where)
+    if n == 2:
+        st._set_attr("dup_count", st.dup_count + 1)
+
+
+def _index_remove(st, obj):
+    """Record that `obj` left one of the places it appeared in."""
+    o = st.index.object_id[obj]
+    n = st.obj_count[o] - 1
+    st._set(st.obj_count, o, n)
+    if n == 0:
+        st._set(st.obj_loc, o, None)
+    elif n == 1:
+        st._set_attr("dup_count", st.dup_count - 1)
+
+
+def state_hash(st):
+    """64-bit hash of occupancy, holding and position(s), maintained incrementally; O(1)."""
+    return st.zhash
+
+
+def init_symbolic_state(world):
+    """
+    Initialize symbolic state for the cooperative agents in world["robots"].
+    Each agent maintains its own position and holding status, stored in
+    arrays indexed by agent id.
+    Shared stations (e.g. the inspection area) are capacity-limited resources
+    declared in world["resources"].
+    """
+    return SymbolicState(world)
+
+
+def check_step_schema(action, step, schema):
+    """Missing and unknown fields of `step` against the stage's ACTION_SCHEMA entry for `action`."""
+    sch = schema[action]
+    missing = [k for k in sch["required"] if k not in step]
+    extra = [k for k in step.keys() if k not in sch["allowed"] and k != "agent"]
+    errs = []
+    if missing:
+        errs.append(f"missing fields {missing}")
+    if extra:
+        errs.append(f"unknown fields {extra}")
+    return errs
+
+
+def check_step_names_and_types(action, step, world):
+    """Validate object/slot/pose references against the world definition."""
+    errs = [f"field '{k}' is not a string: {v!r}" for k, v in step.items() if not isinstance(v, str)]
+    if errs:   # names index sets and dicts below; lists/objects from LLM output would raise
+        return errs
+    if action == "base.goto":
+        if step["target"] not in world["poses"]:
+            errs.append(f"unknown pose '{step['target']}'")
+    elif action == "arm.pick":
+        if step["object"] not in world["objects"]:
+            errs.append(f"unknown object '{step['object']}'")
+        if step["from"] not in world["slots"]:
+            errs.append(f"unknown slot '{step['from']}'")
+    elif action == "arm.place":
+        if step["object"] not in world["objects"]:
+            errs.append(f"unknown object '{step['object']}'")
+        if step["to"] not in world["slots"]:
+            errs.append(f"unknown slot '{step['to']}'")
+    return errs
+
+
+def check_predicate(pred, args, st, world, agent):
+    """Verify logical preconditions before executing an action."""
+    if pred == "is_pose":
+        return args["target"] in world["poses"]
+
+    if pred == "holding_is":
+        return st.holding[agent] == args.get("value", args.get("object", None))
+
+    if pred == "slot_has":
+        slot = args["slot"]
+        return slot in world["slots"] and st.occ_of(slot) == args["object"]
+
+    if pred == "slot_free":
+        slot = args["slot"]
+        if slot not in world["slots"]:
+            return False
+        rid = st.resources.resource_of(slot)
+        if rid is not None and st.resources.available(rid) <= 0:
+            return False
+        return st.occ_of(slot) in (None, "")
+
+    if pred == "at_reach":
+        return st.agent_at[agent] == world["reachability_map"][args["slot"]]
+
+    return False
+
+
+def _observe(pred, args, st, world, agent):
+    """State values behind a failed predicate, kept in the Failure record."""
+    slot = args.get("slot")
+    if pred in ("slot_has", "slot_free") and slot not in world["slots"]:
+        return {"unknown_slot": slot}
+    if pred == "holding_is":
+        return {"holding": st.holding[agent]}
+    if pred == "slot_free":
+        rid = st.resources.resource_of(slot)
+        if rid is not None and st.resources.available(rid) <= 0:
+            spec = st.resources.spec
+            return {"resource": spec.names[rid], "in_use": st.resources.in_use[rid], "capacity": spec.capacity[rid]}
+    if pred in ("slot_has", "slot_free"):
+        return {"found": st.occ_of(slot)}
+    if pred == "at_reach":
+        return {"dock": world["reachability_map"][slot], "at": st.agent_at[agent]}
+    if pred != "is_pose":
+        return {"reason": f"unknown predicate '{pred}'"}
+    return {}
+
+
+def apply_effect(eff, args, st, world, agent):
+    """Apply symbolic effects of an action."""
+    if eff == "set_at":
+        st._set_hashed("agent_at", st.agent_at, agent, args["target"])
+        return
+    if eff == "holding_set":
+        val = args.get("value", args.get("object", None))
+        if st.holding[agent]:
+            _index_remove(st, st.holding[agent])
+        st._set_hashed("holding", st.holding, agent, val)
+        if val:
+            _index_add(st, val, agent)
+        return
+    if eff == "slot_set":
+        slot = args["slot"]
+        val = args.get("value", args.get("object", None))
+        s = st.index.slot_id[slot]
+        rid = st.resources.resource_of(slot)
+        if st.occ[s]:
+            _index_remove(st, st.occ[s])
+            if rid is not None:
+                st.resources.release(rid)
+        st._set_hashed("occ", st.occ, s, val)
+        if val:
+            _index_add(st, val, slot)
+            if rid is not None:
+                st.resources.acquire(rid, force=True)  # capacity is a precondition (slot_free)
+        return
+    raise ValueError(f"unknown effect '{eff}'")
+
+
+def _materialize(spec_entry, step):
+    """Extract parameters for predicates or effects from step definitions."""
+    name, *keys = spec_entry
+    args = {}
+    if name in ("is_pose", "set_at"):
+        args["target"] = step["target"]
+    elif name == "at_reach":
+        args["slot"] = step[keys[0]]
+    elif name == "slot_has":
+        args["slot"] = step[keys[0]]
+        args["object"] = step[keys[1]]
+    elif name == "slot_free":
+        args["slot"] = step[keys[0]]
+    elif name == "holding_is":
+        v = keys[0]
+        args["value"] = None if v is None else step[v]
+    elif name == "holding_set":
+        v = keys[0]
+        args["value"] = None if v is None else step[v]
+    elif name == "slot_set":
+        args["slot"] = step[keys[0]]
+        v = keys[1]
+        args["value"] = None if v is None else step[v]
+    else:
+        raise ValueError(f"unknown spec {spec_entry}")
+    return name, args
+
+
+def _recount(st):
+    """Count object appearances from scratch (debug cross-check of the index)."""
+    counts = {}
+    for v in st.occ:
+        if v:
+            counts[v] = counts.get(v, 0) + 1
+    for held in st.holding:
+        if held:
+            counts[held] = counts.get(held, 0) + 1
+    return counts
+
+
+def _recount_resources(st):
+    """Units in use per resource, counted from occupancy (debug cross-check)."""
+    used = [0] * len(st.index.resources)
+    for slot, rid in st.index.resources.slot_resource.items():
+        if st.occ_of(slot):
+            used[rid] += 1
+    return used
+
+
+def check_invariants(st, debug=False):
+    """
+    Ensure each object appears exactly once and shared resources stay within capacity.
+    Uses the object index maintained by apply_effect, so the check is O(1)
+    per step; with debug=True the index is cross-checked by a full recount.
+    """
+    objects = st.index.objects
+    if st.dup_count:
+        dup = [objects[o] for o, c in enumerate(st.obj_count) if c > 1]
+        return False, f"duplicate object(s): {dup}"
+    if st.resources.over:
+        return False, f"resource(s) over capacity: {st.resources.over_capacity()}"
+    if debug:
+        indexed = {objects[o]: c for o, c in enumerate(st.obj_count) if c}
+        if _recount(st) != indexed:
+            return False, f"object index out of sync with state: {indexed}"
+        if _recount_resources(st) != st.resources.in_use:
+            return False, f"resource usage out of sync with state: {st['resources']}"
+        if st.zhash != st.index.zobrist.hash_state(st.occ, st.holding, st.agent_at):
+            return False, "state hash out of sync with state"
+    return True, ""
+
+
+def check_goal(st, goal):
+    """Check if final state matches goal configuration."""
+    if not goal:
+        return True, ""
+    for obj, slot in goal.items():
+        if st.occ_of(slot) != obj:
+            return False, f"{obj} not in {slot} (in={st.occ_of(slot)})"
+    return True, ""
+
+
+def goal_failure(st, goal, n_steps):
+    """Failure record for an unsatisfied goal after `n_steps` steps, or None."""
+    ok, why = check_goal(st, goal)
+    return None if ok else Failure("goal_unsatisfied", n_steps, predicate="goal", observed={"reason": why})
+
+
+def execute_step(st, i, step, world, actions, constraints, debug=False, *, schema):
+    """
+    Check and apply plan step `i` on the symbolic state `st`; `schema` is
+    the stage's ACTION_SCHEMA.
+    Returns a Failure record on failure (the state is then left partially
+    updated), or None once the step's effects are applied and invariants hold.
+    """
+    if not isinstance(step, dict):
+        return Failure("schema_error", i, observed={"errors": ["step is not an object"]})
+    agent = step.get("agent", st.agents[0] if st.agents else None)
+    a = step.get("action")
+    if not isinstance(a, str) or a not in actions:
+        return Failure("unknown_action", i, agent, args={"action": a})
+
+    errs = check_step_schema(a, step, schema) or check_step_names_and_types(a, step, world)
+    if errs:
+        return Failure("schema_error", i, agent, observed={"errors": errs})
+
+    ai = st.agent_id.get(agent)
+    if ai is None:
+        return Failure("unknown_agent", i, agent)
+
+    # --- Preconditions ---
+    for pre in actions[a].get("pre", []):
+        pred, args = _materialize(pre, step)
+        if not check_predicate(pred, args, st, world, ai):
+            return Failure("precondition_failed", i, agent, pred, args, _observe(pred, args, st, world, ai))
+
+    # --- Effects ---
+    for eff in actions[a].get("eff", []):
+        name, args = _materialize(eff, step)
+        apply_effect(name, args, st, world, ai)
+
+    # --- Constraint Check ---
+    if a == "arm.place":
+        slot, obj = step["to"], step["object"]
+        allowed = constraints.get("allowed_targets")
+        if allowed and not place_allowed(allowed, slot, obj):
+            return Failure("constraint_violation", i, agent, "allowed_targets", {"object": obj, "slot": slot})
+
+    # --- Invariant Check ---
+    ok_inv, why_inv = check_invariants(st, debug)
+    if not ok_inv:
+        return Failure("invariant_broken", i, agent, "invariants", observed={"reason": why_inv})
+
+    return None
+
+
+def validate(world, plan, actions, constraints, goal=None, debug=False, *, schema):
+    """
+    Validate a symbolic plan by checking preconditions, effects,
+    resource constraints, and goal satisfaction.
+    Steps without an "agent" field are executed by the first declared robot.
+    Returns {"logic_ok", "goal_ok", "failure"}, where "failure" is the
+    first Failure record (see warehouse/failures.py) or None.
+    """
+    st = init_symbolic_state(world)
+    steps = plan.get("steps", None) if isinstance(plan, dict) else None
+
+    if not isinstance(steps, list):
+        return {"logic_ok": False, "goal_ok": False, "failure": Failure("malformed_plan")}
+
+    constraints = compile_constraints(constraints)
+    for i, step in enumerate(steps):
+        failure = execute_step(st, i, step, world, actions, constraints, debug, schema=schema)
+        if failure:
+            return {"logic_ok": False, "goal_ok": False, "failure": failure}
+
+    # --- All steps executed: logic is valid, then separately check the goal ---
+    failure = goal_failure(st, goal, len(steps))
+
+    return {
+        "logic_ok": True,
+        "goal_ok": failure is None,
+        "failure": failure,
+    }
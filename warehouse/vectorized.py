@@ -0,0 +1,247 @@
+"""
+NumPy lockstep validator for large plan batches.
+
+Slots, objects, poses and agents of the world are integer-encoded, plans are
+padded into (plans x steps) arrays and every plan's symbolic state advances
+one step at a time under NumPy masks. Results match `validator.validate`
+(logic_ok / goal_ok) for the stage validator module passed in; see
+benchmarks/bench_vectorized.py for the differential check.
+
+Encoding reuses the stage validator's own schema and name checks, so only
+the predicate/effect logic of the action spec is re-implemented here:
+
+- occupancy is an int array (object id + 1, 0 = free); units in use per
+  shared resource (world["resources"]) are a second array, with one extra
+  unlimited column for slots outside any resource.
+- no valid step changes how many places an object appears in, and every
+  place into a slot is guarded by slot_free (which checks capacity), so the
+  duplicate-object and over-capacity invariants fail on the first
+  successful step exactly when the initial occupancy already violates them.
+"""
+
+import numpy as np
+
+from warehouse.batch import canonical_step
+from warehouse.constraints import compile_targets
+
+PAD = -1        # past the end of a plan
+INVALID = -2    # unknown action, schema/name error or unknown agent
+
+
+class EncodedWorld:
+    """Integer encoding of a world for one stage's action spec."""
+
+    def __init__(self, world, actions, constraints):
+        self.world = world
+        self.multi_agent = "robots" in world
+        self.agents = list(world["robots"]) if self.multi_agent else [None]
+        self.agent_id = {a: i for i, a in enumerate(self.agents)}
+        self.slots = list(world["slots"])
+        self.slot_id = {s: i for i, s in enumerate(self.slots)}
+        self.poses = sorted(world["poses"])
+        self.pose_id = {p: i for i, p in enumerate(self.poses)}
+
+        occupancy = world["state"].get("occupancy", {})
+        self.objects = list(world["objects"])
+        for obj in occupancy.values():
+            if obj and obj not in self.objects:
+                self.objects.append(obj)
+        self.object_id = {o: i for i, o in enumerate(self.objects)}
+
+        reach = world["reachability_map"]
+        self.reach = np.array([self.pose_id[reach[s]] + 1 if reach.get(s) in self.pose_id else -1
+                               for s in self.slots], dtype=np.int32)
+        self.occ0 = np.zeros(len(self.slots), dtype=np.int32)
+        counts = {}
+        for slot, obj in occupancy.items():
+            if obj:
+                counts[obj] = counts.get(obj, 0) + 1
+                if slot in self.slot_id:
+                    self.occ0[self.slot_id[slot]] = self.object_id[obj] + 1
+        self.init_dup = any(c > 1 for c in counts.values())
+
+        # res[s] is the resource of slot s; column len(resources) is unlimited
+        spec = world.get("resources", {})
+        self.res = np.full(len(self.slots), len(spec), dtype=np.int32)
+        self.cap = np.array([d.get("capacity", len(d.get("slots", []))) for d in spec.values()]
+                            + [np.iinfo(np.int32).max], dtype=np.int32)
+        for r, decl in enumerate(spec.values()):
+            for slot in decl.get("slots", []):
+                self.res[self.slot_id[slot]] = r
+        self.use0 = np.zeros(len(spec) + 1, dtype=np.int32)
+        np.add.at(self.use0, self.res[self.occ0 > 0], 1)
+        self.init_over = bool((self.use0 > self.cap).any())
+
+        # allowed[s, o] is False where placing object o into slot s violates allowed_targets
+        self.allowed = np.ones((len(self.slots), len(self.objects)), dtype=bool)
+        targets = compile_targets(constraints.get("allowed_targets") or {})
+        rows = {}   # one row per distinct rule: zone/aisle rules cover many slots
+        for s, slot in enumerate(self.slots if len(targets) else ()):
+            rule = targets.rule_of(slot)
+            if rule is not None:
+                if id(rule) not in rows:
+                    rows[id(rule)] = [rule.matches(obj) for obj in self.objects]
+                self.allowed[s] = rows[id(rule)]
+
+        self.action_names = list(actions)
+        self.action_code = {a: k for k, a in enumerate(self.action_names)}
+        self.domains = {a: _field_domains(actions[a]) for a in self.action_names}
+        self.compiled = [(list(actions[a].get("pre", [])), list(actions[a].get("eff", [])))
+                         for a in self.action_names]
+
+    def table(self, domain):
+        return {"slot": self.slot_id, "object": self.object_id, "pose": self.pose_id}[domain]
+
+
+def _field_domains(spec):
+    """Map each plan-step field used by an action spec to its symbol domain."""
+    domains = {}
+    for name, *keys in spec.get("pre", []) + spec.get("eff", []):
+        if name in ("is_pose", "set_at"):
+            domains["target"] = "pose"
+        elif name in ("at_reach", "slot_free"):
+            domains[keys[0]] = "slot"
+        elif name in ("slot_has", "mark_visited"):
+            slot_key, obj_key = (keys[0], keys[1]) if name == "slot_has" else (keys[1], keys[0])
+            domains[slot_key], domains[obj_key] = "slot", "object"
+        elif name in ("holding_is", "holding_set") and keys[0] is not None:
+            domains[keys[0]] = "object"
+        elif name == "slot_set":
+            domains[keys[0]] = "slot"
+            if keys[1] is not None:
+                domains[keys[1]] = "object"
+    return domains
+
+
+def _encode_step(validator, enc, actions, step):
+    """Return (action code, agent id, {field: id}) for one plan step."""
+    if not isinstance(step, dict):   # the validators' schema_error cases, in their order
+        return INVALID, 0, {}
+    a = step.get("action")
+    if not isinstance(a, str) or a not in actions:
+        return INVALID, 0, {}
+    if validator.check_step_schema(a, step):  # name checks index the required fields
+        return INVALID, 0, {}
+    if validator.check_step_names_and_types(a, step, enc.world):   # also rejects non-string fields
+        return INVALID, 0, {}
+    if enc.multi_agent:
+        ai = enc.agent_id.get(step.get("agent", enc.agents[0] if enc.agents else None))
+        if ai is None:
+            return INVALID, 0, {}
+    else:
+        ai = 0
+    fields = {f: enc.table(d).get(step[f], -1) for f, d in enc.domains[a].items()}
+    return enc.action_code[a], ai, fields
+
+
+def encode_plans(validator, enc, plans, actions):
+    """Pad plans into int arrays: op/agent of shape (P, T) plus one array per field."""
+    steps = [p.get("steps") if isinstance(p, dict) else None for p in plans]
+    n_steps = [len(s) if isinstance(s, list) else 0 for s in steps]
+    T = max(n_steps, default=0)
+    op = np.full((len(plans), T), PAD, dtype=np.int32)
+    agent = np.zeros((len(plans), T), dtype=np.int32)
+    names = sorted({f for d in enc.domains.values() for f in d})
+    fields = {f: np.full((len(plans), T), -1, dtype=np.int32) for f in names}
+    malformed = np.array([not isinstance(s, list) for s in steps], dtype=bool)
+
+    cache = {}
+    for p in range(len(plans)):
+        for t in range(n_steps[p]):
+            step = steps[p][t]
+            key = canonical_step(step)
+            code = cache.get(key)
+            if code is None:
+                code = cache[key] = _encode_step(validator, enc, actions, step)
+            op[p, t], agent[p, t] = code[0], code[1]
+            for f, v in code[2].items():
+                fields[f][p, t] = v
+    return op, agent, fields, malformed
+
+
+def _check(pred, keys, rows, ag, t, F, occ, use, hold, at, enc):
+    """Evaluate one precondition for the given plan rows at step t."""
+    if pred == "is_pose":
+        return F["target"][rows, t] >= 0
+    if pred == "holding_is":
+        want = 0 if keys[0] is None else F[keys[0]][rows, t] + 1
+        return hold[rows, ag] == want
+    if pred in ("slot_has", "slot_free", "at_reach"):
+        s = F[keys[0]][rows, t]
+        known = s >= 0
+        s = np.where(known, s, 0)
+        if pred == "slot_has":
+            return known & (occ[rows, s] == F[keys[1]][rows, t] + 1)
+        if pred == "slot_free":
+            r = enc.res[s]
+            return known & (occ[rows, s] == 0) & (use[rows, r] < enc.cap[r])
+        return known & (at[rows, ag] == enc.reach[s])
+    return np.zeros(rows.size, dtype=bool)
+
+
+def _apply(eff, keys, rows, ag, t, F, occ, use, hold, at, enc):
+    """Apply one effect for the given plan rows at step t."""
+    if eff == "set_at":
+        at[rows, ag] = F["target"][rows, t] + 1
+    elif eff == "holding_set":
+        hold[rows, ag] = 0 if keys[0] is None else F[keys[0]][rows, t] + 1
+    elif eff == "slot_set":
+        s = F[keys[0]][rows, t]
+        new = np.zeros(rows.size, dtype=np.int32) if keys[1] is None else F[keys[1]][rows, t] + 1
+        use[rows, enc.res[s]] += (new != 0).astype(np.int32) - (occ[rows, s] != 0)
+        occ[rows, s] = new
+    elif eff != "mark_visited":  # visited slots never feed a precondition
+        raise ValueError(f"unknown effect '{eff}'")
+
+
+def _run_chunk(validator, enc, plans, actions, goal):
+    op, agent, F, malformed = encode_plans(validator, enc, plans, actions)
+    P, T = op.shape
+    occ = np.tile(enc.occ0, (P, 1))
+    use = np.tile(enc.use0, (P, 1))
+    hold = np.zeros((P, len(enc.agents)), dtype=np.int32)
+    at = np.zeros((P, len(enc.agents)), dtype=np.int32)
+    alive = ~malformed
+
+    for t in range(T):
+        alive &= op[:, t] != INVALID
+        for code, (pres, effs) in enumerate(enc.compiled):
+            rows = np.nonzero(alive & (op[:, t] == code))[0]
+            if not rows.size:
+                continue
+            ag = agent[rows, t]
+            ok = np.ones(rows.size, dtype=bool)
+            for pred, *keys in pres:
+                ok &= _check(pred, keys, rows, ag, t, F, occ, use, hold, at, enc)
+            alive[rows[~ok]] = False
+            rows, ag = rows[ok], ag[ok]
+            for eff, *keys in effs:
+                _apply(eff, keys, rows, ag, t, F, occ, use, hold, at, enc)
+            if enc.action_names[code] == "arm.place":
+                alive[rows[~enc.allowed[F["to"][rows, t], F["object"][rows, t]]]] = False
+            if enc.init_dup or enc.init_over:
+                alive[rows] = False
+
+    goal_ok = alive.copy()
+    for obj, slot in (goal or {}).items():
+        if slot in enc.slot_id and obj in enc.object_id:
+            goal_ok &= occ[:, enc.slot_id[slot]] == enc.object_id[obj] + 1
+        else:
+            goal_ok[:] = False
+    return alive, goal_ok
+
+
+def validate_many(validator, world, plans, actions, constraints, goal=None, chunk_size=65536):
+    """
+    Validate many plans against one world and goal.
+    Returns two boolean arrays (logic_ok, goal_ok), one entry per plan.
+    """
+    enc = EncodedWorld(world, actions, constraints)
+    logic, goal_ok = [], []
+    for start in range(0, len(plans), chunk_size):
+        lo, go = _run_chunk(validator, enc, plans[start:start + chunk_size], actions, goal)
+        logic.append(lo)
+        goal_ok.append(go)
+    if not logic:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+    return np.concatenate(logic), np.concatenate(goal_ok)
@@ -0,0 +1,124 @@
+"""
+Incremental state hashing and a bounded transposition table.
+
+A symbolic state is hashed Zobrist-style: every (component, position,
+value) entry gets a 64-bit key and the state hash is the XOR of the keys
+of its non-empty entries, over
+
+    "occ"        slot -> object in it
+    "holding"    agent -> object held
+    "agent_at"   agent -> pose
+
+(everything the preconditions and the goal read; resource usage follows
+from occupancy, S1's visited record is read by no check). Changing one
+entry XORs its old key out and its new key in, so the validators keep
+SymbolicState.zhash up to date in O(1) per effect instead of rehashing
+the state. Keys are derived from the slot, agent and value names with
+blake2b, so equal states hash equally across worlds and processes.
+
+`TranspositionTable` is the shared memo for search code keyed by such
+hashes: a dict with LRU eviction beyond `capacity` entries and hit/miss
+counters. Evicting an entry only costs a recomputation, so callers use it
+where an unbounded dict would be a correctness-neutral cache.
+"""
+import hashlib
+from collections import OrderedDict
+
+CAPACITY = 1 << 20   # entries
+
+
+def _derive(component, where, value):
+    text = f"{component}\0{where}\0{value!r}"
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class _KeyTable(dict):
+    """value -> key for one position; keys are derived on first lookup, None maps to 0."""
+    __slots__ = ("component", "where")
+
+    def __init__(self, component, where):
+        super().__init__({None: 0})
+        self.component, self.where = component, where
+
+    def __missing__(self, value):
+        z = self[value] = _derive(self.component, self.where, value)
+        return z
+
+
+class ZobristKeys:
+    """64-bit keys for the (component, position id, value) entries of one world index."""
+    __slots__ = ("tables", "_initial")
+
+    def __init__(self, slots, agents):
+        self._initial = {}
+        self.tables = {"occ": [_KeyTable("occ", s) for s in slots],
+                       "holding": [_KeyTable("holding", a) for a in agents],
+                       "agent_at": [_KeyTable("agent_at", a) for a in agents]}
+
+    def __call__(self, component, i, value):
+        """Key of `value` at position `i` of `component`; 0 for an empty entry (None)."""
+        return self.tables[component][i][value]
+
+    def hash_state(self, occ, holding, agent_at):
+        """Hash of a state from scratch (O(state size)); the validators keep it incrementally."""
+        h = 0
+        for component, values in (("occ", occ), ("holding", holding), ("agent_at", agent_at)):
+            for table, value in zip(self.tables[component], values):
+                h ^= table[value]
+        return h
+
+    def initial_hash(self, occ):
+        """Hash of a state with only occupancy set (nothing held, no positions), cached per occupancy."""
+        key = tuple(occ)
+        h = self._initial.get(key)
+        if h is None:
+            h = self._initial[key] = self.hash_state(occ, (), ())
+        return h
+
+
+class TranspositionTable:
+    """Bounded map from state keys to values with LRU eviction and hit-rate statistics."""
+    __slots__ = ("capacity", "_data", "hits", "misses", "evictions")
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self._data = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, default=None):
+        """Stored value (counted as a hit and refreshed) or `default` (a miss)."""
+        value = self._data.get(key, self)
+        if value is self:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def seen(self, key):
+        """True if `key` was stored before; stores it otherwise (visited-set use)."""
+        if self.get(key) is not None:
+            return True
+        self.put(key, True)
+        return False
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"size": len(self._data), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}